@@ -0,0 +1,109 @@
+"""
+Bounded LRU cache of /ai/ask answers.
+
+Keys are built by `app.assistant.answer_key` from the normalized question,
+its language and the asking student's profile attributes. Any committed
+catalog change, in this worker or another one, clears the cache, since a
+new or edited record can change which records a question retrieves. Changes
+are detected through the shared "catalog" version in `app.cache`. A
+generation that started before the change is not stored when it finishes.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.cache import CATALOG, Cache, cache
+from app.search import SearchHit
+
+ANSWER_CACHE_MAX_ENTRIES = 5_000
+ANSWER_CACHE_TTL_SECONDS = 6 * 60 * 60
+
+
+@dataclass
+class CachedAnswer:
+    sources: list[SearchHit]
+    tokens: list[str]
+    expires_at: float
+
+
+@dataclass
+class AnswerCacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return round(self.hits / lookups, 4) if lookups else 0.0
+
+
+class AnswerCache:
+    def __init__(self, shared: Cache, max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+                 ttl: float = ANSWER_CACHE_TTL_SECONDS):
+        self.shared = shared
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = AnswerCacheStats()
+        self._version: int | None = None  # read on first use, not at import
+        self._entries: OrderedDict[tuple, CachedAnswer] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def version(self) -> int:
+        """The catalog version answers are currently stored under."""
+        return self._sync()
+
+    def _sync(self) -> int:
+        """Drop entries from an older catalog version; returns the current one."""
+        version = self.shared.version(CATALOG)
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    if self._version is not None:
+                        self.stats.invalidations += 1
+                    self._version = version
+                    self._entries.clear()
+        return version
+
+    def get(self, key: tuple) -> CachedAnswer | None:
+        self._sync()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= now:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry
+
+    def put(self, key: tuple, sources: list[SearchHit], tokens: list[str], version: int) -> None:
+        """Store an answer generated while the catalog was at `version`."""
+        current = self._sync()
+        with self._lock:
+            if version != current:
+                return  # the catalog changed while it was being generated
+            self._entries[key] = CachedAnswer(sources, tokens, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            self.stats.stores += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def invalidate(self) -> None:
+        """Drop every answer, here and in the other workers."""
+        self.shared.invalidate(CATALOG)
+        self._sync()
+
+
+answer_cache = AnswerCache(cache)
@@ -0,0 +1,193 @@
+"""
+Archival of old test attempts.
+
+Every test taken adds an attempt row plus an answer row per question, and
+the history is never pruned. `archive_attempts` moves graded attempts
+started before a cutoff into `archived_attempts`, ARCHIVE_BATCH_SIZE at a
+time, one transaction per batch:
+
+- the summary columns (test, student, times, score) are copied unchanged,
+  so listings, results and leaderboards still query them;
+- the answers are packed into one zlib-compressed JSON blob on that row;
+- the live answers, grading jobs and attempts are deleted set-based.
+
+Reads do not need to know where an attempt lives. `union_attempts` runs the
+same select against both tables with UNION ALL, and `attempt_answers`
+unpacks an archived blob or reads test_answers.
+
+In the background, attempts older than GYANDARSHAK_ARCHIVE_AFTER_DAYS
+(default 365; 0 turns the archiver off) are archived every
+ARCHIVE_INTERVAL_SECONDS. scripts_archive_attempts.py runs it by hand.
+"""
+import json
+import logging
+import os
+import threading
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable
+
+from sqlalchemy import LargeBinary, Select, cast, delete, insert, null, select, union_all
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import models
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("GYANDARSHAK_ARCHIVE_AFTER_DAYS", "365"))
+ARCHIVE_BATCH_SIZE = 1000
+ARCHIVE_INTERVAL_SECONDS = 6 * 3600
+
+AttemptTable = type[models.TestAttempt] | type[models.ArchivedAttempt]
+
+
+def union_attempts(build: Callable[[AttemptTable], Select]):
+    """
+    `build(table)` for live and archived attempts, combined with UNION ALL.
+
+    `build` must select the same columns from either table. An ORDER BY on
+    the result is applied by merging the two branches, so each branch can
+    still read in index order.
+    """
+    return union_all(build(models.TestAttempt), build(models.ArchivedAttempt))
+
+
+def packed_answers(attempts: AttemptTable):
+    """The archived answers blob, or a NULL of the same type for live attempts."""
+    if attempts is models.ArchivedAttempt:
+        return attempts.answers_zlib.label("answers_zlib")
+    return cast(null(), LargeBinary).label("answers_zlib")
+
+
+def pack_answers(answers: dict[int, str]) -> bytes:
+    return zlib.compress(json.dumps(answers, separators=(",", ":")).encode())
+
+
+def unpack_answers(blob: bytes) -> dict[int, str]:
+    return {int(qid): option for qid, option in json.loads(zlib.decompress(blob)).items()}
+
+
+def attempt_answers(db: Session, attempt_id: int, answers_zlib: bytes | None) -> dict[int, str]:
+    """
+    {question_id: option} for an attempt. Pass the `packed_answers` value
+    selected with it: archived answers are unpacked without a query.
+    """
+    if answers_zlib is not None:
+        return unpack_answers(answers_zlib)
+    return dict(
+        db.query(models.TestAnswer.question_id, models.TestAnswer.selected_option)
+        .filter(models.TestAnswer.attempt_id == attempt_id)
+        .all()
+    )
+
+
+@dataclass
+class ArchiveReport:
+    attempts: int = 0
+    answers: int = 0
+    packed_bytes: int = 0
+
+
+def _archive_batch(db: Session, cutoff: datetime, batch_size: int, report: ArchiveReport) -> int:
+    attempt = models.TestAttempt
+    # in id order old attempts come first, so the scan stops early
+    rows = db.execute(
+        select(attempt.id, attempt.test_id, attempt.student_id, attempt.started_at,
+               attempt.finished_at, attempt.score)
+        .where(attempt.started_at < cutoff, attempt.score.is_not(None))
+        .order_by(attempt.id)
+        .limit(batch_size)
+    ).all()
+    if not rows:
+        return 0
+    ids = [row.id for row in rows]
+
+    answers: dict[int, dict[int, str]] = defaultdict(dict)
+    for attempt_id, question_id, option in db.query(
+        models.TestAnswer.attempt_id,
+        models.TestAnswer.question_id,
+        models.TestAnswer.selected_option,
+    ).filter(models.TestAnswer.attempt_id.in_(ids)):
+        answers[attempt_id][question_id] = option
+
+    now = datetime.utcnow()
+    archived = [
+        {**row._asdict(), "answers_zlib": pack_answers(answers.get(row.id, {})), "archived_at": now}
+        for row in rows
+    ]
+    db.execute(insert(models.ArchivedAttempt), archived)
+    db.execute(delete(models.TestAnswer).where(models.TestAnswer.attempt_id.in_(ids)))
+    db.execute(delete(models.GradingJob).where(models.GradingJob.attempt_id.in_(ids)))
+    db.execute(delete(attempt).where(attempt.id.in_(ids)))
+    db.commit()
+
+    report.attempts += len(rows)
+    report.answers += sum(len(a) for a in answers.values())
+    report.packed_bytes += sum(len(row["answers_zlib"]) for row in archived)
+    return len(rows)
+
+
+def archive_attempts(db: Session, cutoff: datetime, batch_size: int = ARCHIVE_BATCH_SIZE) -> ArchiveReport:
+    """Archive every graded attempt started before `cutoff`; commits once per batch."""
+    report = ArchiveReport()
+    while _archive_batch(db, cutoff, batch_size, report) == batch_size:
+        pass
+    return report
+
+
+class AttemptArchiver:
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        after_days: int = ARCHIVE_AFTER_DAYS,
+        interval: float = ARCHIVE_INTERVAL_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.after_days = after_days
+        self.interval = interval
+        self.archived = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def run(self, now: datetime | None = None) -> ArchiveReport:
+        cutoff = (now or datetime.utcnow()) - timedelta(days=self.after_days)
+        db = self.session_factory()
+        try:
+            report = archive_attempts(db, cutoff)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        self.archived += report.attempts
+        if report.attempts:
+            logger.info("archived %s attempts (%s answers) started before %s",
+                        report.attempts, report.answers, cutoff.date())
+        return report
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.run()
+            except Exception:
+                # e.g. another worker archived the same batch first
+                logger.exception("attempt archival failed")
+
+    def start(self) -> None:
+        if self._thread is not None or self.after_days <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="attempt-archiver", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=30)
+            self._thread = None
+
+
+attempt_archiver = AttemptArchiver()
@@ -0,0 +1,276 @@
+"""
+Answer generation for /ai/ask.
+
+A question is answered by retrieving matching catalog records and handing
+them to the configured LLM backend. Generations are:
+
+- limited: at most LLM_MAX_CONCURRENCY run at once, with a bounded queue
+  behind them (see `app.limits`);
+- coalesced: while a question is being answered, anyone asking the same
+  question (after normalization) attaches to that generation instead of
+  starting another, and receives the same tokens from the beginning;
+- cached: finished answers are kept in `app.answer_cache`.
+
+Questions are keyed by `answer_key`: the normalized question, its language
+and the asker's profile attributes (state, class, stream), which are used
+to rank records from the student's own state and stream first.
+
+Each generation runs on its own thread, so a client that disconnects does
+not cut the answer short for the others following it. Everything else
+happens on the event loop: waiting for a model slot, waiting for another
+request's generation to start and reading tokens hold no threadpool
+thread; only the cache lookup and retrieval borrow one briefly.
+"""
+import asyncio
+import logging
+import threading
+import unicodedata
+from typing import AsyncIterator, Callable
+
+from starlette.concurrency import run_in_threadpool
+
+from app.answer_cache import AnswerCache, answer_cache
+from app.limits import Overloaded, RouteLimiter
+from app.llm import AskProfile, Prompt, get_llm_backend
+from app.search import SearchHit, get_search_index, is_hindi, tokenize
+
+logger = logging.getLogger(__name__)
+
+ASK_MAX_SOURCES = 3
+LLM_MAX_CONCURRENCY = 4
+LLM_MAX_WAITING = 64
+LLM_QUEUE_TIMEOUT_SECONDS = 30.0
+# candidates retrieved per source slot before profile re-ranking
+PROFILE_CANDIDATE_FACTOR = 3
+PROFILE_MATCH_BOOST = 0.25
+
+DEVANAGARI_DIGITS = str.maketrans("०१२३४५६७८९", "0123456789")
+# Hindi and plural forms folded onto one key term
+QUESTION_SYNONYMS = {
+    "छात्रवृत्ति": "scholarship",
+    "scholarships": "scholarship",
+    "परीक्षा": "exam",
+    "exams": "exam",
+    "कॉलेज": "college",
+    "colleges": "college",
+    "तारीख": "date",
+    "तिथि": "date",
+    "dates": "date",
+    "courses": "course",
+}
+
+
+def fold_question(question: str) -> str:
+    """Unicode-normalize and use ASCII digits, so १२ and 12 match alike."""
+    return unicodedata.normalize("NFKC", question).translate(DEVANAGARI_DIGITS).strip()
+
+
+def normalize_question(question: str) -> str:
+    """Case, punctuation, whitespace and common-term folding of a folded question."""
+    return " ".join(QUESTION_SYNONYMS.get(t, t) for t in tokenize(question))
+
+
+def answer_key(question: str, profile: AskProfile | None) -> tuple:
+    return (normalize_question(question), is_hindi(question), profile)
+
+
+def personalize(hits: list[SearchHit], profile: AskProfile | None, limit: int) -> list[SearchHit]:
+    """Boost records that mention the student's state or stream."""
+    terms = set(profile.terms()) if profile else set()
+    if not terms:
+        return hits[:limit]
+    ranked = []
+    for hit in hits:
+        doc = hit.document
+        doc_terms = set(tokenize(doc.title))
+        for text in doc.text:
+            doc_terms.update(tokenize(text))
+        boost = 1 + PROFILE_MATCH_BOOST * len(terms & doc_terms)
+        ranked.append(SearchHit(score=round(hit.score * boost, 4), document=doc))
+    ranked.sort(key=lambda hit: hit.score, reverse=True)
+    return ranked[:limit]
+
+
+class Generation:
+    """One answer being produced; any number of readers can follow it."""
+
+    def __init__(self):
+        self.sources: list[SearchHit] = []
+        self.tokens: list[str] = []
+        self.done = False
+        self.error: Exception | None = None
+        # set on the event loop once the answer is running or has failed to start
+        self.started = asyncio.Event()
+        self._state_lock = threading.Lock()
+        self._waiters: list[Callable[[], None]] = []
+
+    @classmethod
+    def finished(cls, sources: list[SearchHit], tokens: list[str]) -> "Generation":
+        generation = cls()
+        generation.sources = sources
+        generation.tokens = tokens
+        generation._finish()
+        generation.started.set()
+        return generation
+
+    def _notify(self) -> None:
+        for notify in self._waiters:
+            notify()
+
+    def _append(self, token: str) -> None:
+        with self._state_lock:
+            self.tokens.append(token)
+            self._notify()
+
+    def _finish(self, error: Exception | None = None) -> None:
+        with self._state_lock:
+            self.error = error
+            self.done = True
+            self._notify()
+
+    async def astream(self) -> AsyncIterator[str]:
+        """Yield every token from the start; raises if generation failed."""
+        loop = asyncio.get_running_loop()
+        wake = asyncio.Event()
+
+        def notify() -> None:
+            loop.call_soon_threadsafe(wake.set)
+
+        with self._state_lock:
+            self._waiters.append(notify)
+        sent = 0
+        try:
+            while True:
+                wake.clear()
+                with self._state_lock:
+                    pending = self.tokens[sent:]
+                    finished = self.done
+                for token in pending:
+                    yield token
+                sent += len(pending)
+                if finished:
+                    break
+                if not pending:
+                    await wake.wait()
+        finally:
+            with self._state_lock:
+                self._waiters.remove(notify)
+        if self.error is not None:
+            raise self.error
+
+    async def text(self) -> str:
+        return "".join([token async for token in self.astream()])
+
+
+class Assistant:
+    """
+    All state is touched on the event loop only; generation threads hand
+    their completion back with `call_soon_threadsafe`.
+    """
+
+    def __init__(self, limiter: RouteLimiter, cache: AnswerCache):
+        self.limiter = limiter
+        self.cache = cache
+        self.generations = 0
+        self.coalesced = 0
+        self._inflight: dict[tuple, Generation] = {}
+        self._starting: set[asyncio.Task] = set()
+
+    async def ask(self, question: str, profile: AskProfile | None = None) -> Generation:
+        """Start or join the generation for `question`; raises `Overloaded`."""
+        question = fold_question(question)
+        key = answer_key(question, profile)
+        cached = await run_in_threadpool(self.cache.get, key)
+        if cached is not None:
+            return Generation.finished(cached.sources, cached.tokens)
+        generation = self._inflight.get(key)
+        if generation is None:
+            generation = self._inflight[key] = Generation()
+            # a task of its own: the asker going away must not strand its followers
+            task = asyncio.create_task(self._start(key, generation, question, profile))
+            self._starting.add(task)
+            task.add_done_callback(self._starting.discard)
+        else:
+            self.coalesced += 1
+        await generation.started.wait()
+        if generation.error is not None and not generation.tokens:
+            raise generation.error
+        return generation
+
+    def _retrieve(self, question: str, profile: AskProfile | None) -> tuple[int, list[SearchHit]]:
+        version = self.cache.version
+        hits = get_search_index().search(
+            question, limit=ASK_MAX_SOURCES * (PROFILE_CANDIDATE_FACTOR if profile else 1)
+        )
+        return version, personalize(hits, profile, ASK_MAX_SOURCES)
+
+    async def _start(self, key: tuple, generation: Generation, question: str, profile: AskProfile | None) -> None:
+        try:
+            await self.limiter.acquire()
+        except Overloaded as exc:
+            self._forget(key)
+            generation._finish(exc)
+            generation.started.set()
+            return
+        try:
+            version, hits = await run_in_threadpool(self._retrieve, question, profile)
+            prompt = Prompt(
+                question=question,
+                hindi=is_hindi(question),
+                context=[h.document for h in hits],
+                profile=profile,
+            )
+            generation.sources = hits
+            thread = threading.Thread(
+                target=self._run,
+                args=(asyncio.get_running_loop(), key, generation, prompt, version),
+                name="llm-generation",
+                daemon=True,
+            )
+            thread.start()
+        except Exception as exc:
+            self._done(key)
+            generation._finish(exc)
+            generation.started.set()
+            return
+        self.generations += 1
+        generation.started.set()
+
+    def _run(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        key: tuple,
+        generation: Generation,
+        prompt: Prompt,
+        version: int,
+    ) -> None:
+        error = None
+        try:
+            for token in get_llm_backend().generate(prompt):
+                generation._append(token)
+            self.cache.put(key, generation.sources, list(generation.tokens), version)
+        except Exception as exc:
+            logger.exception("answer generation failed")
+            error = exc
+        finally:
+            generation._finish(error)
+            loop.call_soon_threadsafe(self._done, key)
+
+    def _done(self, key: tuple) -> None:
+        self.limiter.release()
+        self._forget(key)
+
+    def _forget(self, key: tuple) -> None:
+        self._inflight.pop(key, None)
+
+
+assistant = Assistant(
+    RouteLimiter(
+        "assistant",
+        limit=LLM_MAX_CONCURRENCY,
+        max_waiting=LLM_MAX_WAITING,
+        timeout=LLM_QUEUE_TIMEOUT_SECONDS,
+        retry_after=5,
+    ),
+    answer_cache,
+)
@@ -0,0 +1,266 @@
+"""
+Write-behind buffer for in-progress test answers.
+
+Autosaves land in an in-memory dict keyed by attempt and question, so a
+client saving after every click only overwrites a dict entry. A background
+thread flushes everything buffered since the last flush to `test_answers`
+in one transaction. Submitting an attempt takes its buffered answers out
+first, and the buffer is flushed once more on shutdown (and at exit).
+
+The buffer lives in one process: a submit or expiry sweep handled by
+another worker would grade the attempt without the answers buffered here,
+and the later flush skips them because the attempt is finished. So
+buffering is opt-in (GYANDARSHAK_AUTOSAVE_WRITE_BEHIND=1) and only for
+single-worker deployments; `start` then takes an exclusive lock file and
+refuses to start a second buffering worker. By default every autosave is
+written to the database before the request returns.
+"""
+import atexit
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import models
+from app.database import SQLALCHEMY_DATABASE_URL, SessionLocal
+
+logger = logging.getLogger(__name__)
+
+AUTOSAVE_FLUSH_INTERVAL_SECONDS = 2.0
+# once this many answers are buffered, the saving request flushes inline
+AUTOSAVE_MAX_PENDING_ANSWERS = 50_000
+AUTOSAVE_WRITE_BEHIND = os.getenv("GYANDARSHAK_AUTOSAVE_WRITE_BEHIND", "0") == "1"
+# one lock per database, so two buffering workers on the same data cannot both start
+AUTOSAVE_LOCK_PATH = os.getenv(
+    "GYANDARSHAK_AUTOSAVE_LOCK",
+    os.path.join(
+        tempfile.gettempdir(),
+        f"gyandarshak-autosave-{hashlib.sha1(SQLALCHEMY_DATABASE_URL.encode()).hexdigest()[:12]}.lock",
+    ),
+)
+
+
+def _lock_exclusively(lock_file) -> bool:
+    """Non-blocking exclusive lock on an open file; False if another process holds it."""
+    try:
+        if os.name == "nt":
+            import msvcrt
+
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+@dataclass
+class AutosaveStats:
+    saves: int = 0
+    flushes: int = 0
+    rows_written: int = 0
+    forced_flushes: int = 0
+
+
+class AutosaveBuffer:
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        flush_interval: float = AUTOSAVE_FLUSH_INTERVAL_SECONDS,
+        max_pending: int = AUTOSAVE_MAX_PENDING_ANSWERS,
+        write_behind: bool = AUTOSAVE_WRITE_BEHIND,
+        lock_path: str = AUTOSAVE_LOCK_PATH,
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.write_behind = write_behind
+        self.lock_path = lock_path
+        self._lock_file = None
+        self.stats = AutosaveStats()
+        self._pending: dict[int, dict[int, str]] = {}
+        self._count = 0
+        self._lock = threading.Lock()
+        # held for the whole of a flush so take() never races a write
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # ---- buffer ----
+
+    def put(self, attempt_id: int, answers: dict[int, str]) -> int:
+        """Buffer answers for an attempt; returns how many are pending for it."""
+        if not self.write_behind:
+            self._write_through(attempt_id, answers)
+            return 0
+        with self._lock:
+            current = self._pending.setdefault(attempt_id, {})
+            before = len(current)
+            current.update(answers)
+            self._count += len(current) - before
+            self.stats.saves += 1
+            pending = len(current)
+            over_limit = self._count >= self.max_pending
+
+        if over_limit:
+            # back-pressure: the writer pays for the flush instead of growing memory
+            self.stats.forced_flushes += 1
+            self.flush()
+        return pending
+
+    def peek(self, attempt_id: int) -> dict[int, str]:
+        with self._lock:
+            return dict(self._pending.get(attempt_id, {}))
+
+    def take(self, attempt_id: int) -> dict[int, str]:
+        """Remove and return buffered answers, waiting for any in-flight flush."""
+        with self._flush_lock, self._lock:
+            answers = self._pending.pop(attempt_id, {})
+            self._count -= len(answers)
+            return answers
+
+    def give_back(self, attempt_id: int, answers: dict[int, str]) -> None:
+        """Return answers from `take` when the submit failed; newer saves win."""
+        if answers:
+            self._requeue({attempt_id: answers})
+
+    def take_many(self, attempt_ids: list[int]) -> dict[int, dict[int, str]]:
+        with self._flush_lock, self._lock:
+            taken = {}
+            for attempt_id in attempt_ids:
+                answers = self._pending.pop(attempt_id, None)
+                if answers:
+                    self._count -= len(answers)
+                    taken[attempt_id] = answers
+            return taken
+
+    @property
+    def pending_answers(self) -> int:
+        return self._count
+
+    # ---- flushing ----
+
+    def flush(self) -> int:
+        """Write all buffered answers in one transaction; returns rows written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._count = 0
+            if not batch:
+                return 0
+            db = self.session_factory()
+            try:
+                written = write_answers(db, batch)
+                db.commit()
+            except Exception:
+                db.rollback()
+                self._requeue(batch)
+                raise
+            finally:
+                db.close()
+            self.stats.flushes += 1
+            self.stats.rows_written += written
+            return written
+
+    def _write_through(self, attempt_id: int, answers: dict[int, str]) -> None:
+        db = self.session_factory()
+        try:
+            written = write_answers(db, {attempt_id: answers})
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        self.stats.saves += 1
+        self.stats.rows_written += written
+
+    def _requeue(self, batch: dict[int, dict[int, str]]) -> None:
+        with self._lock:
+            for attempt_id, answers in batch.items():
+                current = self._pending.setdefault(attempt_id, {})
+                for qid, option in answers.items():
+                    if qid not in current:
+                        current[qid] = option
+                        self._count += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("autosave flush failed; will retry")
+
+    def start(self) -> None:
+        if self._thread is not None or not self.write_behind:
+            return
+        if self._lock_file is None:
+            lock_file = open(self.lock_path, "a+")
+            if not _lock_exclusively(lock_file):
+                lock_file.close()
+                raise RuntimeError(
+                    "another worker is already buffering autosaves for this database; "
+                    "GYANDARSHAK_AUTOSAVE_WRITE_BEHIND=1 needs a single-worker deployment"
+                )
+            self._lock_file = lock_file
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="autosave-flusher", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+            self._thread = None
+        self.flush()
+        if self._lock_file is not None:
+            self._lock_file.close()  # releases the lock
+            self._lock_file = None
+
+
+def write_answers(db: Session, batch: dict[int, dict[int, str]]) -> int:
+    """Upsert answers for still-open attempts; finished attempts are skipped."""
+    open_ids = {
+        attempt_id
+        for (attempt_id,) in db.query(models.TestAttempt.id).filter(
+            models.TestAttempt.id.in_(list(batch)),
+            models.TestAttempt.finished_at.is_(None),
+        )
+    }
+    rows = []
+    for attempt_id, answers in batch.items():
+        if attempt_id not in open_ids or not answers:
+            continue
+        db.query(models.TestAnswer).filter(
+            models.TestAnswer.attempt_id == attempt_id,
+            models.TestAnswer.question_id.in_(list(answers)),
+        ).delete(synchronize_session=False)
+        rows.extend(
+            {"attempt_id": attempt_id, "question_id": qid, "selected_option": option}
+            for qid, option in answers.items()
+        )
+    if rows:
+        db.execute(insert(models.TestAnswer), rows)
+    return len(rows)
+
+
+def saved_answers(db: Session, attempt_id: int) -> dict[int, str]:
+    """Answers for an attempt: flushed rows overlaid with anything still buffered."""
+    answers = dict(
+        db.query(models.TestAnswer.question_id, models.TestAnswer.selected_option)
+        .filter(models.TestAnswer.attempt_id == attempt_id)
+        .all()
+    )
+    answers.update(autosave_buffer.peek(attempt_id))
+    return answers
+
+
+autosave_buffer = AutosaveBuffer()
@@ -0,0 +1,420 @@
+"""
+Shared cache with version-based invalidation across workers.
+
+Values live in a pluggable backend chosen by GYANDARSHAK_CACHE_URL:
+
+- "memory://" (default): a per-process LRU. Fine for one worker; other
+  workers never see its entries or invalidations.
+- "sqlite:///path/to/file.db": a small SQLite file shared by every worker
+  on the host. "sqlite://" puts it in /dev/shm when that exists.
+- "redis://host:port/db": any server speaking the Redis protocol (RESP).
+  scripts_resp_server.py is a local stand-in for development.
+
+Keys are grouped into namespaces, and every namespace has a version counter
+in the backend. Entries are stored under "<namespace>:<version>:<key>", so
+`invalidate(namespace)` makes all existing entries unreachable in every
+worker at once; they then age out through TTL/LRU. Workers re-read a
+namespace version at most every VERSION_POLL_SECONDS, which bounds how long
+another worker can serve stale data.
+
+In-process state derived from the same data (the search index, the answer
+cache) uses `VersionWatch` to notice bumps made by other workers.
+
+Values are bytes (response bodies, stored as is) or JSON-serializable data;
+they come back from JSON, so tuples read as lists and dates as ISO strings.
+Nothing is ever unpickled: whoever can write to a shared backend must not
+be able to run code in the workers.
+
+Backend failures are logged and treated as misses; the cache never fails a
+request.
+"""
+import json
+import logging
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Protocol
+from urllib.parse import urlparse
+
+from app.catalog_events import subscribe
+
+logger = logging.getLogger(__name__)
+
+CACHE_URL = os.getenv("GYANDARSHAK_CACHE_URL", "memory://")
+VERSION_POLL_SECONDS = 1.0
+DEFAULT_TTL_SECONDS = 300
+MEMORY_MAX_ENTRIES = 1_024
+SQLITE_PURGE_EVERY = 500
+# versions this worker produced itself, remembered so VersionWatch can tell them apart
+LOCAL_VERSIONS_KEPT = 1_000
+
+CATALOG = "catalog"
+
+
+class CacheError(Exception):
+    pass
+
+
+# one-byte tag in front of every stored value
+RAW_VALUE = b"b"
+JSON_VALUE = b"j"
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def encode_value(value: Any) -> bytes:
+    if isinstance(value, bytes):
+        return RAW_VALUE + value
+    return JSON_VALUE + json.dumps(value, separators=(",", ":"), default=_json_default).encode()
+
+
+def decode_value(raw: bytes) -> Any:
+    tag, body = raw[:1], raw[1:]
+    if tag == RAW_VALUE:
+        return body
+    if tag == JSON_VALUE:
+        return json.loads(body)
+    raise CacheError("value in an unknown format")
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> bytes | None: ...
+
+    def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+    def incr(self, key: str) -> int:
+        """Atomically add one to a counter that never expires; returns the new value."""
+        ...
+
+    def counter(self, key: str) -> int:
+        """Current value of an `incr` counter, 0 if it was never incremented."""
+        ...
+
+
+class MemoryBackend:
+    def __init__(self, max_entries: int = MEMORY_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        self._counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+
+class SQLiteBackend:
+    """Entries in a WAL-mode SQLite file; one connection per thread."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._sets = 0
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries "
+            "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE TABLE IF NOT EXISTS cache_counters (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")  # a lost cache write is only a miss
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> bytes | None:
+        row = self._conn().execute(
+            "SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, time.time() + ttl),
+        )
+        self._sets += 1
+        if self._sets % SQLITE_PURGE_EVERY == 0:
+            conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+
+    def delete(self, key: str) -> None:
+        self._conn().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def incr(self, key: str) -> int:
+        (value,) = self._conn().execute(
+            "INSERT INTO cache_counters (key, value) VALUES (?, 1) "
+            "ON CONFLICT(key) DO UPDATE SET value = value + 1 RETURNING value",
+            (key,),
+        ).fetchone()
+        return value
+
+    def counter(self, key: str) -> int:
+        row = self._conn().execute("SELECT value FROM cache_counters WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+
+class RedisBackend:
+    """Minimal RESP2 client (GET/SET PX/DEL/INCR); one connection per thread."""
+
+    def __init__(self, host: str = "localhost", port: int = 6379, db: int = 0, timeout: float = 1.0):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn = (sock, sock.makefile("rb"))
+        self._local.conn = conn
+        if self.db:
+            self._command("SELECT", self.db)
+        return conn
+
+    def _read_reply(self, reader) -> Any:
+        line = reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise CacheError("connection closed")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            raise CacheError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(payload)
+            return None if count < 0 else [self._read_reply(reader) for _ in range(count)]
+        raise CacheError(f"unexpected reply {line!r}")
+
+    def _command(self, *args) -> Any:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        conn = getattr(self._local, "conn", None) or self._connect()
+        sock, reader = conn
+        try:
+            sock.sendall(b"".join(parts))
+            return self._read_reply(reader)
+        except (OSError, CacheError):
+            # drop the connection; the next command reconnects
+            self._local.conn = None
+            sock.close()
+            raise
+
+    def get(self, key: str) -> bytes | None:
+        return self._command("GET", key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._command("SET", key, value, "PX", max(1, int(ttl * 1000)))
+
+    def delete(self, key: str) -> None:
+        self._command("DEL", key)
+
+    def incr(self, key: str) -> int:
+        return self._command("INCR", key)
+
+    def counter(self, key: str) -> int:
+        return int(self._command("GET", key) or 0)
+
+
+def backend_from_url(url: str) -> CacheBackend:
+    parsed = urlparse(url)
+    if parsed.scheme == "memory":
+        return MemoryBackend()
+    if parsed.scheme == "sqlite":
+        # sqlite:///relative.db, sqlite:////absolute.db, or sqlite:// for the default
+        path = url[len("sqlite:///"):] if url.startswith("sqlite:///") else ""
+        if not path:
+            shm = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+            path = os.path.join(shm, "gyandarshak-cache.db")
+        return SQLiteBackend(path)
+    if parsed.scheme == "redis":
+        db = int(parsed.path.lstrip("/") or 0)
+        return RedisBackend(parsed.hostname or "localhost", parsed.port or 6379, db)
+    raise ValueError(f"unsupported cache URL {url!r}")
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    sets: int = 0
+    invalidations: int = 0
+    errors: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return round(self.hits / lookups, 4) if lookups else 0.0
+
+
+class Cache:
+    def __init__(self, backend: CacheBackend, version_poll: float = VERSION_POLL_SECONDS):
+        self.backend = backend
+        self.version_poll = version_poll
+        self.stats = CacheStats()
+        self._versions: dict[str, tuple[int, float]] = {}
+        self._local_versions: dict[str, deque[int]] = {}
+        self._lock = threading.Lock()
+
+    def _failed(self, action: str, exc: Exception) -> None:
+        self.stats.errors += 1
+        logger.warning("cache %s failed: %s", action, exc)
+
+    def version(self, namespace: str) -> int:
+        now = time.monotonic()
+        known = self._versions.get(namespace)
+        if known is not None and now - known[1] < self.version_poll:
+            return known[0]
+        try:
+            version = self.backend.counter(f"version:{namespace}")
+        except (OSError, CacheError, sqlite3.Error) as exc:
+            self._failed("version read", exc)
+            return known[0] if known else 0
+        with self._lock:
+            previous = self._versions.get(namespace)
+            # never go backwards because of a slow read racing a local bump
+            if previous is None or version >= previous[0]:
+                self._versions[namespace] = (version, now)
+            else:
+                version = previous[0]
+        return version
+
+    def invalidate(self, namespace: str) -> int:
+        """Bump the namespace version; every worker stops seeing its entries."""
+        try:
+            version = self.backend.incr(f"version:{namespace}")
+        except (OSError, CacheError, sqlite3.Error) as exc:
+            self._failed("invalidate", exc)
+            return self.version(namespace)
+        with self._lock:
+            self._versions[namespace] = (version, time.monotonic())
+            self._local_versions.setdefault(namespace, deque(maxlen=LOCAL_VERSIONS_KEPT)).append(version)
+            self.stats.invalidations += 1
+        return version
+
+    def produced_locally(self, namespace: str, first: int, last: int) -> bool:
+        """Whether this worker made every bump in versions first..last."""
+        local = set(self._local_versions.get(namespace, ()))
+        return all(v in local for v in range(first, last + 1))
+
+    def get(self, namespace: str, key: str) -> Any | None:
+        try:
+            raw = self.backend.get(f"{namespace}:{self.version(namespace)}:{key}")
+        except (OSError, CacheError, sqlite3.Error) as exc:
+            self._failed("get", exc)
+            raw = None
+        if raw is not None:
+            try:
+                value = decode_value(raw)
+            except (CacheError, ValueError) as exc:  # e.g. an entry written by an older release
+                self._failed("decode", exc)
+                raw = None
+        if raw is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return value
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float = DEFAULT_TTL_SECONDS,
+            version: int | None = None) -> None:
+        """Store `value`; pass the `version` read before computing it to avoid caching stale data."""
+        current = self.version(namespace)
+        if version is not None and version != current:
+            return
+        try:
+            self.backend.set(f"{namespace}:{current}:{key}", encode_value(value), ttl)
+            self.stats.sets += 1
+        except (OSError, CacheError, sqlite3.Error) as exc:
+            self._failed("set", exc)
+
+    def get_or_set(self, namespace: str, key: str, compute: Callable[[], Any],
+                   ttl: float = DEFAULT_TTL_SECONDS) -> Any:
+        value = self.get(namespace, key)
+        if value is None:
+            version = self.version(namespace)
+            value = compute()
+            self.set(namespace, key, value, ttl, version=version)
+        return value
+
+
+class VersionWatch:
+    """Notices namespace bumps made by other workers."""
+
+    def __init__(self, cache: Cache, namespace: str):
+        self.cache = cache
+        self.namespace = namespace
+        self.seen: int | None = None
+
+    def reset(self) -> None:
+        """Mark the current version as reflected in local state."""
+        self.seen = self.cache.version(self.namespace)
+
+    def changed_elsewhere(self) -> bool:
+        current = self.cache.version(self.namespace)
+        seen, self.seen = self.seen, current
+        if seen is None or current == seen:
+            return False
+        return not self.cache.produced_locally(self.namespace, seen + 1, current)
+
+
+cache = Cache(backend_from_url(CACHE_URL))
+
+
+def _on_catalog_change(kind: str, entity_id: int, deleted: bool) -> None:
+    cache.invalidate(CATALOG)
+
+
+subscribe(_on_catalog_change)
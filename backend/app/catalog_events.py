@@ -0,0 +1,51 @@
+"""
+Change notifications for the public catalog (colleges, exams, scholarships).
+
+Admin write paths call `catalog_changed(db, kind, entity_id)` before they
+commit. That appends a `CatalogChange` row in the same transaction (the
+change log behind /sync), and listeners run only after the transaction
+commits, so in-process derived data (search index, caches) never sees a
+rolled-back write.
+"""
+import logging
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import models
+
+logger = logging.getLogger(__name__)
+
+CatalogListener = Callable[[str, int, bool], None]
+
+_listeners: list[CatalogListener] = []
+_PENDING_KEY = "catalog_changes"
+
+
+def subscribe(listener: CatalogListener) -> None:
+    """Register `listener(kind, entity_id, deleted)` for committed changes."""
+    _listeners.append(listener)
+
+
+def catalog_changed(db: Session, kind: str, entity_id: int, deleted: bool = False) -> None:
+    db.add(models.CatalogChange(kind=kind, entity_id=entity_id, deleted=deleted))
+    db.info.setdefault(_PENDING_KEY, []).append((kind, entity_id, deleted))
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    changes = session.info.pop(_PENDING_KEY, None)
+    if not changes:
+        return
+    for kind, entity_id, deleted in changes:
+        for listener in _listeners:
+            try:
+                listener(kind, entity_id, deleted)
+            except Exception:
+                logger.exception("catalog listener failed for %s %s", kind, entity_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
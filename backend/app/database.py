@@ -1,13 +1,27 @@
-from sqlalchemy import create_engine
+import os
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./gyandarshak.db"
+SQLALCHEMY_DATABASE_URL = os.getenv(
+    "GYANDARSHAK_DATABASE_URL", "sqlite:///./gyandarshak.db"
+)
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
 )
 
+if engine.dialect.name == "sqlite":
+
+    @event.listens_for(engine, "connect")
+    def _enable_foreign_keys(dbapi_connection, connection_record):
+        # SQLite ignores REFERENCES / ON DELETE unless enabled per connection
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
@@ -0,0 +1,371 @@
+"""
+Grading of test attempts.
+
+`grade_attempts` scores any number of attempts with a fixed number of
+queries and is shared by the synchronous submit path and the queued one.
+
+In queued mode `/submit` only records a `GradingJob` (and stamps the
+attempt's `finished_at`) and returns; concurrent submissions share one
+commit. A small pool of worker threads drains
+the job queue in batches, grading each batch in a single transaction, which
+keeps exam-deadline bursts from piling up behind SQLite's single writer.
+Jobs are durable: anything still pending in the table is re-queued when the
+pool starts, and workers poll the table when their in-memory queue is idle.
+"""
+import json
+import logging
+import queue
+import threading
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import models
+from app.database import SessionLocal
+from app.leaderboard import leaderboard
+
+logger = logging.getLogger(__name__)
+
+GRADING_WORKERS = 2
+GRADING_BATCH_SIZE = 200
+GRADING_QUEUE_SIZE = 10_000
+GRADING_IDLE_POLL_SECONDS = 5.0
+GRADING_ENQUEUE_TIMEOUT_SECONDS = 10.0
+
+
+def grade_attempts(
+    db: Session,
+    overrides: dict[int, dict[int, str]],
+    finished_at: dict[int, datetime] | None = None,
+) -> dict[int, int]:
+    """
+    Score attempts and replace their stored answers.
+
+    Each attempt's answers are whatever is already saved for it (autosaves),
+    overlaid with `overrides[attempt_id]`. Unknown question ids are ignored.
+    Nothing is committed; returns {attempt_id: score}.
+    """
+    if not overrides:
+        return {}
+    attempt_ids = list(overrides)
+    finished_at = finished_at or {}
+
+    attempts = (
+        db.query(models.TestAttempt)
+        .filter(models.TestAttempt.id.in_(attempt_ids))
+        .all()
+    )
+    questions: dict[int, dict[int, tuple[str, int]]] = defaultdict(dict)
+    for qid, test_id, correct, marks in db.query(
+        models.TestQuestion.id,
+        models.TestQuestionLink.test_id,
+        models.TestQuestion.correct_option,
+        models.TestQuestion.marks,
+    ).join(
+        models.TestQuestionLink, models.TestQuestionLink.question_id == models.TestQuestion.id
+    ).filter(models.TestQuestionLink.test_id.in_({a.test_id for a in attempts})):
+        questions[test_id][qid] = (correct, marks)
+
+    saved: dict[int, dict[int, str]] = defaultdict(dict)
+    for attempt_id, qid, option in db.query(
+        models.TestAnswer.attempt_id,
+        models.TestAnswer.question_id,
+        models.TestAnswer.selected_option,
+    ).filter(models.TestAnswer.attempt_id.in_(attempt_ids)):
+        saved[attempt_id][qid] = option
+
+    db.query(models.TestAnswer).filter(
+        models.TestAnswer.attempt_id.in_(attempt_ids)
+    ).delete(synchronize_session=False)
+
+    now = datetime.utcnow()
+    rows = []
+    scores: dict[int, int] = {}
+    for attempt in attempts:
+        selections = saved[attempt.id]
+        selections.update(overrides[attempt.id])
+        by_id = questions[attempt.test_id]
+        score = 0
+        for qid, option in selections.items():
+            question = by_id.get(qid)
+            if question is None:
+                continue
+            selected = option.upper()
+            rows.append(
+                {"attempt_id": attempt.id, "question_id": qid, "selected_option": selected}
+            )
+            if selected == question[0]:
+                score += question[1]
+        attempt.score = score
+        attempt.finished_at = finished_at.get(attempt.id) or attempt.finished_at or now
+        scores[attempt.id] = score
+
+    if rows:
+        db.execute(insert(models.TestAnswer), rows)
+    return scores
+
+
+class _Ticket:
+    __slots__ = ("attempt_id", "answers", "done", "error")
+
+    def __init__(self, attempt_id: int, answers: dict[int, str]):
+        self.attempt_id = attempt_id
+        self.answers = answers
+        self.done = threading.Event()
+        self.error: Exception | None = None
+
+
+class GradingQueue:
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        workers: int = GRADING_WORKERS,
+        batch_size: int = GRADING_BATCH_SIZE,
+        max_queued: int = GRADING_QUEUE_SIZE,
+    ):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.batch_size = batch_size
+        self._queue: queue.Queue[int] = queue.Queue(maxsize=max_queued)
+        self._known: set[int] = set()
+        self._known_lock = threading.Lock()
+        self._pending: list[_Ticket] = []
+        self._pending_cond = threading.Condition()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def enqueue(self, attempt_id: int, answers: dict[int, str]) -> None:
+        """
+        Durably record a submission. Returns once its job row is committed.
+
+        Concurrent submissions are group-committed by one writer thread, so
+        a burst costs a handful of transactions rather than one per student.
+        Raises RuntimeError if the pool is not running (nothing would grade
+        the job), TimeoutError if the submission was not recorded in time
+        and LookupError if the attempt no longer exists.
+        """
+        ticket = _Ticket(attempt_id, answers)
+        with self._pending_cond:
+            if not self._threads:
+                raise RuntimeError("grading pool is not running")
+            self._pending.append(ticket)
+            self._pending_cond.notify()
+        if not ticket.done.wait(GRADING_ENQUEUE_TIMEOUT_SECONDS):
+            # the committer holds the lock while writing, so once we have it
+            # the ticket is either still waiting or already committed
+            with self._pending_cond:
+                if ticket in self._pending:
+                    self._pending.remove(ticket)
+                    raise TimeoutError("grading queue did not accept the submission in time")
+        if ticket.error is not None:
+            raise ticket.error
+
+    def _commit_pending(self) -> None:
+        """Write every waiting submission in one transaction (caller holds the lock)."""
+        tickets, self._pending = self._pending, []
+        if not tickets:
+            return
+        db = self.session_factory()
+        try:
+            # a test deleted meanwhile takes its attempts with it; with foreign keys
+            # enforced one such job would fail the whole group commit
+            existing = {
+                attempt_id
+                for (attempt_id,) in db.query(models.TestAttempt.id).filter(
+                    models.TestAttempt.id.in_({t.attempt_id for t in tickets})
+                )
+            }
+            for t in tickets:
+                if t.attempt_id not in existing:
+                    t.error = LookupError(f"attempt {t.attempt_id} no longer exists")
+                    t.done.set()
+            tickets = [t for t in tickets if t.attempt_id in existing]
+            now = datetime.utcnow()
+            jobs = [
+                models.GradingJob(
+                    attempt_id=t.attempt_id,
+                    answers_json=json.dumps(t.answers),
+                    created_at=now,
+                )
+                for t in tickets
+            ]
+            db.add_all(jobs)
+            db.query(models.TestAttempt).filter(
+                models.TestAttempt.id.in_({t.attempt_id for t in tickets}),
+                models.TestAttempt.finished_at.is_(None),
+            ).update({"finished_at": now}, synchronize_session=False)
+            db.commit()
+            job_ids = [job.id for job in jobs]
+        except Exception as exc:
+            db.rollback()
+            for t in tickets:
+                t.error = exc
+                t.done.set()
+            return
+        finally:
+            db.close()
+        for t in tickets:
+            t.done.set()
+        for job_id in job_ids:
+            self._offer(job_id)
+
+    def _run_committer(self) -> None:
+        while True:
+            with self._pending_cond:
+                while not self._pending and not self._stop.is_set():
+                    self._pending_cond.wait()
+                if not self._pending and self._stop.is_set():
+                    return
+                self._commit_pending()
+
+    def _offer(self, job_id: int) -> None:
+        with self._known_lock:
+            if job_id in self._known:
+                return
+            self._known.add(job_id)
+        try:
+            self._queue.put_nowait(job_id)
+        except queue.Full:
+            # still durable; an idle worker will pick it up from the table
+            with self._known_lock:
+                self._known.discard(job_id)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._threads)
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    # ---- workers ----
+
+    def _load_pending(self) -> None:
+        db = self.session_factory()
+        try:
+            job_ids = [
+                job_id
+                for (job_id,) in db.query(models.GradingJob.id)
+                .filter(models.GradingJob.status == "pending")
+                .order_by(models.GradingJob.id)
+                .limit(self._queue.maxsize)
+            ]
+        finally:
+            db.close()
+        for job_id in job_ids:
+            self._offer(job_id)
+
+    def _next_batch(self) -> list[int]:
+        try:
+            batch = [self._queue.get(timeout=GRADING_IDLE_POLL_SECONDS)]
+        except queue.Empty:
+            if not self._stop.is_set():
+                self._load_pending()
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def process(self, job_ids: list[int]) -> int:
+        """Grade a batch of jobs in one transaction; returns jobs graded."""
+        db = self.session_factory()
+        try:
+            jobs = (
+                db.query(models.GradingJob)
+                .filter(
+                    models.GradingJob.id.in_(job_ids),
+                    models.GradingJob.status == "pending",
+                )
+                .order_by(models.GradingJob.id)
+                .all()
+            )
+            overrides: dict[int, dict[int, str]] = {}
+            for job in jobs:
+                # later jobs for the same attempt win, like a resubmit would
+                overrides[job.attempt_id] = {
+                    int(qid): option for qid, option in json.loads(job.answers_json).items()
+                }
+            scores = grade_attempts(db, overrides)
+            now = datetime.utcnow()
+            for job in jobs:
+                job.status = "done"
+                job.graded_at = now
+            graded = [
+                (a.test_id, a.student_id, scores[a.id])
+                for a in db.query(models.TestAttempt).filter(
+                    models.TestAttempt.id.in_(list(scores))
+                )
+            ]
+            db.commit()
+            for test_id, student_id, score in graded:
+                leaderboard.record(db, test_id, student_id, score)
+            return len(jobs)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+            with self._known_lock:
+                self._known.difference_update(job_ids)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch = self._next_batch()
+            if not batch:
+                continue
+            try:
+                self.process(batch)
+            except Exception:
+                logger.exception("grading batch failed; retrying jobs one by one")
+                for job_id in batch:
+                    try:
+                        self.process([job_id])
+                    except Exception:
+                        logger.exception("grading job %s failed", job_id)
+                        self._mark_failed(job_id)
+
+    def _mark_failed(self, job_id: int) -> None:
+        db = self.session_factory()
+        try:
+            db.query(models.GradingJob).filter(models.GradingJob.id == job_id).update(
+                {"status": "failed"}, synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stop.clear()
+        self._load_pending()
+        committer = threading.Thread(
+            target=self._run_committer, name="grading-committer", daemon=True
+        )
+        with self._pending_cond:
+            self._threads.append(committer)
+        committer.start()
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"grading-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        """Stop the workers; jobs not yet graded stay pending in the table."""
+        with self._pending_cond:
+            self._stop.set()
+            self._pending_cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=GRADING_IDLE_POLL_SECONDS + 5)
+        with self._pending_cond:
+            self._threads = []
+            # anything that slipped in while stopping is still written
+            self._commit_pending()
+
+
+grading_queue = GradingQueue()
@@ -0,0 +1,78 @@
+"""
+Rows broken before foreign keys were enforced.
+
+Older databases ran with SQLite's foreign keys off, so deleting a college
+could leave its courses behind. `find_orphans` lists such rows with
+PRAGMA foreign_key_check; `remove_orphans` resolves them the way the
+models' ON DELETE says: CASCADE rows are deleted, SET NULL columns
+cleared. Anything else is left for a manual fix.
+
+This scans every table, so it is not part of the startup schema check;
+scripts_clean_orphans.py runs it by hand, reporting before it deletes.
+"""
+from dataclasses import dataclass
+
+from sqlalchemy.engine import Connection
+
+from app import models  # noqa: F401  (registers the tables on Base.metadata)
+from app.database import Base
+
+
+@dataclass
+class Orphans:
+    table: str
+    column: str
+    parent: str
+    on_delete: str  # "CASCADE", "SET NULL", or what would need a manual fix
+    rowids: list[int]
+
+    @property
+    def fixable(self) -> bool:
+        return self.on_delete in ("CASCADE", "SET NULL")
+
+    def __str__(self) -> str:
+        return f"{self.table}.{self.column} -> {self.parent}: {len(self.rowids)} rows ({self.on_delete})"
+
+
+def _model_on_delete(table_name: str, column_name: str) -> str | None:
+    table = Base.metadata.tables.get(table_name)
+    if table is None or column_name not in table.columns:
+        return None
+    for fk in table.columns[column_name].foreign_keys:
+        return (fk.ondelete or "").upper() or None
+    return None
+
+
+def find_orphans(conn: Connection) -> list[Orphans]:
+    """Rows whose foreign key points at a missing parent, per (table, key)."""
+    found: dict[tuple[str, int], list[int]] = {}
+    for table_name, rowid, _parent, fk_id in conn.exec_driver_sql("PRAGMA foreign_key_check"):
+        if rowid is not None:
+            found.setdefault((table_name, fk_id), []).append(rowid)
+    orphans = []
+    for (table_name, fk_id), rowids in found.items():
+        fk = [row for row in conn.exec_driver_sql(f'PRAGMA foreign_key_list("{table_name}")') if row[0] == fk_id]
+        column, parent = fk[0][3], fk[0][2]
+        on_delete = _model_on_delete(table_name, column) or fk[0][6].upper()
+        orphans.append(Orphans(table_name, column, parent, on_delete, rowids))
+    return orphans
+
+
+def remove_orphans(conn: Connection) -> list[Orphans]:
+    """
+    Resolve every fixable orphan; returns what was resolved. Repeats until
+    nothing more can be, since deleting a row can orphan its own children.
+    Does not commit.
+    """
+    removed = []
+    while True:
+        orphans = [o for o in find_orphans(conn) if o.fixable]
+        if not orphans:
+            return removed
+        for o in orphans:
+            ids = ",".join(str(int(r)) for r in o.rowids)
+            if o.on_delete == "CASCADE":
+                conn.exec_driver_sql(f'DELETE FROM "{o.table}" WHERE rowid IN ({ids})')
+            else:
+                conn.exec_driver_sql(f'UPDATE "{o.table}" SET "{o.column}" = NULL WHERE rowid IN ({ids})')
+        removed += orphans
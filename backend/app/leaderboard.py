@@ -0,0 +1,175 @@
+"""
+In-memory per-test leaderboard.
+
+Each test keeps a histogram of every student's best score plus a Fenwick
+tree over that histogram, so rank and percentile lookups are O(log S) where
+S is the test's total marks, independent of how many attempts exist.
+Top-N walks the histogram from the highest score downwards.
+
+The index is rebuilt lazily per test from live and archived attempts the
+first time the test is touched in this process, and kept up to date on
+every graded submit.
+"""
+import threading
+from dataclasses import dataclass
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.archive import union_attempts
+
+
+class FenwickTree:
+    """Prefix sums over integer buckets 0..size-1."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._tree = [0] * (size + 1)
+
+    def add(self, index: int, delta: int) -> None:
+        i = index + 1
+        while i <= self.size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, index: int) -> int:
+        """Sum of buckets 0..index (inclusive)."""
+        i = min(index, self.size - 1) + 1
+        total = 0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+
+@dataclass
+class RankInfo:
+    rank: int
+    percentile: float
+    total_students: int
+    best_score: int
+
+
+class TestLeaderboard:
+    def __init__(self, max_score: int):
+        self.max_score = max(max_score, 0)
+        self.tree = FenwickTree(self.max_score + 1)
+        self.buckets: dict[int, set[int]] = {}
+        self.best: dict[int, int] = {}
+
+    def _grow(self, score: int) -> None:
+        self.max_score = score
+        self.tree = FenwickTree(score + 1)
+        for s, students in self.buckets.items():
+            self.tree.add(s, len(students))
+
+    def record(self, student_id: int, score: int) -> None:
+        score = max(score, 0)
+        previous = self.best.get(student_id)
+        if previous is not None and previous >= score:
+            return
+        if score > self.max_score:
+            self._grow(score)
+        if previous is not None:
+            self.buckets[previous].discard(student_id)
+            if not self.buckets[previous]:
+                del self.buckets[previous]
+            self.tree.add(previous, -1)
+        self.best[student_id] = score
+        self.buckets.setdefault(score, set()).add(student_id)
+        self.tree.add(score, 1)
+
+    def rank_of(self, student_id: int) -> RankInfo | None:
+        score = self.best.get(student_id)
+        if score is None:
+            return None
+        total = len(self.best)
+        at_or_below = self.tree.prefix_sum(score)
+        return RankInfo(
+            rank=total - at_or_below + 1,
+            percentile=round(100.0 * at_or_below / total, 2),
+            total_students=total,
+            best_score=score,
+        )
+
+    def top(self, limit: int) -> list[tuple[int, int, int]]:
+        """(rank, student_id, score) for the best `limit` students."""
+        items: list[tuple[int, int, int]] = []
+        rank = 1
+        for score in range(self.max_score, -1, -1):
+            students = self.buckets.get(score)
+            if not students:
+                continue
+            for student_id in sorted(students):
+                if len(items) >= limit:
+                    return items
+                items.append((rank, student_id, score))
+            rank += len(students)
+        return items
+
+
+class LeaderboardService:
+    def __init__(self):
+        self._boards: dict[int, TestLeaderboard] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, db: Session, test_id: int) -> TestLeaderboard:
+        test = db.query(models.Test.total_marks).filter(models.Test.id == test_id).first()
+        board = TestLeaderboard(test.total_marks if test else 0)
+        scores = union_attempts(
+            lambda attempts: select(attempts.student_id, attempts.score).where(
+                attempts.test_id == test_id,
+                attempts.score.is_not(None),
+            )
+        ).subquery()
+        rows = (
+            db.query(scores.c.student_id, func.max(scores.c.score))
+            .group_by(scores.c.student_id)
+            .all()
+        )
+        for student_id, score in rows:
+            board.record(student_id, score)
+        return board
+
+    def board(self, db: Session, test_id: int) -> TestLeaderboard:
+        with self._lock:
+            board = self._boards.get(test_id)
+        if board is not None:
+            return board
+        loaded = self._load(db, test_id)
+        with self._lock:
+            return self._boards.setdefault(test_id, loaded)
+
+    def record(self, db: Session, test_id: int, student_id: int, score: int) -> None:
+        board = self.board(db, test_id)
+        with self._lock:
+            board.record(student_id, score)
+
+    def rank_of(self, db: Session, test_id: int, student_id: int) -> RankInfo | None:
+        board = self.board(db, test_id)
+        with self._lock:
+            return board.rank_of(student_id)
+
+    def top(self, db: Session, test_id: int, limit: int) -> tuple[list[tuple[int, int, int]], int]:
+        board = self.board(db, test_id)
+        with self._lock:
+            return board.top(limit), len(board.best)
+
+    def rebuild(self, db: Session, test_id: int | None = None) -> None:
+        """Drop cached boards so they are reloaded from `test_attempts`."""
+        with self._lock:
+            if test_id is None:
+                self._boards.clear()
+            else:
+                self._boards.pop(test_id, None)
+        if test_id is not None:
+            self.board(db, test_id)
+
+    def discard(self, test_id: int) -> None:
+        """Forget a deleted test's board."""
+        with self._lock:
+            self._boards.pop(test_id, None)
+
+
+leaderboard = LeaderboardService()
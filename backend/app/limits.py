@@ -0,0 +1,189 @@
+"""
+Concurrency limits with a bounded wait queue.
+
+A limiter admits at most `limit` callers at once. Up to
+`max_waiting` more may wait, each for at most `timeout` seconds; anyone
+beyond that is refused straight away with `Overloaded`, which routers turn
+into 503 + Retry-After instead of letting requests pile up.
+
+`RouteLimiter` waits on the event loop, so a queued request holds no
+threadpool thread. The assistant uses one for model slots; whole routes are
+limited with the `limit_concurrency` dependency:
+
+    @router.post("/login", dependencies=[limit_concurrency("auth")])
+
+Each route class has its own limiter (ROUTE_LIMITS, overridable with
+GYANDARSHAK_ROUTE_LIMITS="auth=4:16,submit=32:128"). Every limited request
+also passes the shared `work_gate`, which keeps some threadpool threads for
+unlimited cheap routes. Both queues admit by priority: test submissions
+first, then requests with a valid token, then anonymous ones (a missing,
+forged or expired token ranks anonymous). When a queue is
+full, a newcomer evicts the lowest-priority waiter if it outranks it and is
+refused otherwise.
+"""
+import asyncio
+import heapq
+import itertools
+import os
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security.utils import get_authorization_scheme_param
+
+from app.security import token_is_valid
+
+
+class Overloaded(Exception):
+    def __init__(self, name: str, retry_after: int):
+        super().__init__(f"{name} is at capacity")
+        self.name = name
+        self.retry_after = retry_after
+
+
+PRIORITY_SUBMISSION = 0
+PRIORITY_AUTHENTICATED = 1
+PRIORITY_ANONYMOUS = 2
+
+# name -> (concurrent requests, waiting requests)
+ROUTE_LIMITS = {
+    "auth": (4, 16),  # password hashing is CPU bound
+    "submit": (16, 64),
+    "ai": (8, 32),
+    "catalog": (8, 32),  # unpaginated lists
+    "import": (1, 2),  # bulk onboarding, hashes on its own process pool
+}
+# limited requests running at once across all routes; anyio's threadpool has 40 threads
+WORK_GATE_LIMIT = int(os.getenv("GYANDARSHAK_WORK_GATE_LIMIT", "24"))
+WORK_GATE_WAITING = 128
+ROUTE_QUEUE_TIMEOUT_SECONDS = 5.0
+ROUTE_RETRY_AFTER_SECONDS = 2
+
+
+def parse_route_limits(setting: str) -> dict[str, tuple[int, int]]:
+    """"auth=4:16,submit=32" -> {"auth": (4, 16), "submit": (32, 4 * 32)}"""
+    limits = {}
+    for part in filter(None, (p.strip() for p in setting.split(","))):
+        name, _, value = part.partition("=")
+        limit, _, waiting = value.partition(":")
+        limits[name.strip()] = (int(limit), int(waiting) if waiting else 4 * int(limit))
+    return limits
+
+
+class RouteLimiter:
+    """Priority-ordered admission on the event loop; not thread-safe by design."""
+
+    def __init__(self, name: str, limit: int, max_waiting: int,
+                 timeout: float = ROUTE_QUEUE_TIMEOUT_SECONDS, retry_after: int = ROUTE_RETRY_AFTER_SECONDS):
+        self.name = name
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.active = 0
+        self.rejected = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def _refuse(self) -> Overloaded:
+        self.rejected += 1
+        return Overloaded(self.name, self.retry_after)
+
+    def _remove(self, entry: tuple) -> None:
+        try:
+            self._waiters.remove(entry)
+        except ValueError:
+            return
+        heapq.heapify(self._waiters)
+
+    async def acquire(self, priority: int = PRIORITY_ANONYMOUS) -> None:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+        if len(self._waiters) >= self.max_waiting:
+            worst = max(self._waiters, default=None)  # lowest priority, newest
+            if worst is None or worst[0] <= priority:
+                raise self._refuse()
+            self._remove(worst)
+            worst[2].set_exception(self._refuse())
+
+        entry = (priority, next(self._order), asyncio.get_running_loop().create_future())
+        heapq.heappush(self._waiters, entry)
+        future = entry[2]
+        try:
+            done, _ = await asyncio.wait({future}, timeout=self.timeout)
+        except asyncio.CancelledError:
+            self._abandon(entry)
+            raise
+        if not done:
+            self._abandon(entry)
+            raise self._refuse()
+        future.result()  # raises Overloaded if a higher priority evicted us
+
+    def _abandon(self, entry: tuple) -> None:
+        future = entry[2]
+        if future.done() and not future.cancelled() and future.exception() is None:
+            self.release()  # the slot was handed over just as we gave up
+            return
+        future.cancel()
+        self._remove(entry)
+
+    def release(self) -> None:
+        # hand the slot straight to the best waiter; `active` stays the same
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+
+route_limiters = {
+    name: RouteLimiter(name, limit, waiting)
+    for name, (limit, waiting) in {
+        **ROUTE_LIMITS, **parse_route_limits(os.getenv("GYANDARSHAK_ROUTE_LIMITS", ""))
+    }.items()
+}
+work_gate = RouteLimiter("work", WORK_GATE_LIMIT, WORK_GATE_WAITING)
+
+
+def request_priority(request: Request) -> int:
+    """Authenticated only for a bearer token we signed; any header at all would be easy to fake."""
+    scheme, token = get_authorization_scheme_param(request.headers.get("authorization"))
+    if scheme.lower() == "bearer" and token and token_is_valid(token):
+        return PRIORITY_AUTHENTICATED
+    return PRIORITY_ANONYMOUS
+
+
+def limit_concurrency(name: str, priority: int | None = None):
+    """Route dependency: hold a `name` slot and a work-gate slot while the endpoint runs.
+
+    Without an explicit priority, the request is ranked by `request_priority`.
+    """
+    limiter = route_limiters[name]
+
+    async def hold_slot(request: Request):
+        level = request_priority(request) if priority is None else priority
+        try:
+            await limiter.acquire(level)
+            try:
+                await work_gate.acquire(level)
+            except BaseException:
+                limiter.release()
+                raise
+        except Overloaded as exc:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please try again shortly",
+                headers={"Retry-After": str(exc.retry_after)},
+            )
+        try:
+            yield
+        finally:
+            work_gate.release()
+            limiter.release()
+
+    # "function": the slot is freed when the endpoint returns, not after a streamed body
+    return Depends(hold_slot, scope="function")
@@ -0,0 +1,129 @@
+"""
+Language model backends for the /ai/ask assistant.
+
+A backend turns a `Prompt` (the student's question plus the catalog records
+retrieved for it) into a stream of text tokens. The default `StubBackend`
+is deterministic and needs no network: it quotes the retrieved records
+back, token by token, so streaming, coalescing and caching behave the same
+as they will with a hosted model.
+
+Select a backend with GYANDARSHAK_LLM_BACKEND: "stub" (default) or a
+"package.module:ClassName" path to a class implementing `LLMBackend`.
+"""
+import importlib
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Iterator, Protocol
+
+from app.search import Document, tokenize
+
+LLM_BACKEND_SETTING = os.getenv("GYANDARSHAK_LLM_BACKEND", "stub")
+# seconds between stub tokens; lets load tests simulate a slow model
+STUB_TOKEN_DELAY_SECONDS = float(os.getenv("GYANDARSHAK_LLM_STUB_TOKEN_DELAY", "0"))
+
+TOKEN_RE = re.compile(r"\S+\s*|\s+")
+
+
+@dataclass(frozen=True)
+class AskProfile:
+    """Profile attributes that can change an answer; part of its cache key."""
+
+    state: str | None = None
+    class_level: str | None = None
+    stream_interest: str | None = None
+
+    def terms(self) -> list[str]:
+        return tokenize(" ".join(v for v in (self.state, self.stream_interest) if v))
+
+    def describe(self) -> str:
+        parts = [
+            f"class {self.class_level}" if self.class_level else None,
+            f"from {self.state}" if self.state else None,
+            f"interested in {self.stream_interest}" if self.stream_interest else None,
+        ]
+        return ", ".join(p for p in parts if p)
+
+
+@dataclass
+class Prompt:
+    question: str
+    hindi: bool
+    context: list[Document] = field(default_factory=list)
+    profile: AskProfile | None = None
+
+    def render(self) -> str:
+        """Plain-text prompt for hosted models."""
+        language = "Hindi" if self.hindi else "English"
+        records = "\n".join(
+            f"[{n}] ({doc.kind}) {doc.summary(self.hindi)}"
+            for n, doc in enumerate(self.context, start=1)
+        )
+        student = self.profile.describe() if self.profile else ""
+        return (
+            "You are Gyandarshak, a career guidance assistant for Indian students. "
+            f"Answer in {language} using only the records below and cite them by number. "
+            "If they do not answer the question, say so.\n\n"
+            f"Records:\n{records or '(none)'}\n\n"
+            + (f"Student: {student}\n" if student else "")
+            + f"Question: {self.question}"
+        )
+
+
+class LLMBackend(Protocol):
+    def generate(self, prompt: Prompt) -> Iterator[str]:
+        """Yield the answer as text chunks, in order."""
+        ...
+
+
+class StubBackend:
+    def __init__(self, token_delay: float = STUB_TOKEN_DELAY_SECONDS):
+        self.token_delay = token_delay
+
+    def answer(self, prompt: Prompt) -> str:
+        if not prompt.context:
+            if prompt.hindi:
+                return (
+                    "माफ़ कीजिए, इस सवाल से जुड़ी कोई परीक्षा, छात्रवृत्ति या कॉलेज नहीं मिला। "
+                    "कृपया परीक्षा, छात्रवृत्ति या कॉलेज का नाम लिखकर पूछें।"
+                )
+            return (
+                "I could not find exams, scholarships or colleges matching your question. "
+                "Try asking with the name of an exam, scholarship, college or course."
+            )
+        intro = "मुझे यह जानकारी मिली:" if prompt.hindi else "Here is what I found:"
+        lines = [
+            f"{n}. {doc.summary(prompt.hindi)}" for n, doc in enumerate(prompt.context, start=1)
+        ]
+        return "\n".join([intro, *lines])
+
+    def generate(self, prompt: Prompt) -> Iterator[str]:
+        for token in TOKEN_RE.findall(self.answer(prompt)):
+            if self.token_delay:
+                time.sleep(self.token_delay)
+            yield token
+
+
+_backend: LLMBackend | None = None
+_backend_lock = threading.Lock()
+
+
+def load_backend(setting: str) -> LLMBackend:
+    if setting == "stub":
+        return StubBackend()
+    module_name, _, class_name = setting.partition(":")
+    if not class_name:
+        raise ValueError(f"GYANDARSHAK_LLM_BACKEND must be 'stub' or 'module:Class', got {setting!r}")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+def get_llm_backend() -> LLMBackend:
+    """The configured backend, created on first use."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = load_backend(LLM_BACKEND_SETTING)
+    return _backend
@@ -0,0 +1,217 @@
+"""
+Request and database metrics.
+
+`MetricsMiddleware` times every HTTP request and records, per route
+template (e.g. "/tests/{test_id}"), a latency histogram, status code counts
+and the number of requests in flight. SQLAlchemy cursor events add the
+number of queries and the time spent in the database to the request being
+served; worker threads see the same per-request counters because the
+threadpool copies the request's context.
+
+Everything is exported in Prometheus text format by `render_prometheus()`
+(served at /metrics), and each response carries a Server-Timing header with
+its total and database time.
+"""
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "unmatched"
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+_request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> RequestStats | None:
+    """Counters of the request being served, or None outside a request."""
+    return _request_stats.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - started
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+
+@dataclass
+class RouteDbStats:
+    queries: int = 0
+    seconds: float = 0.0
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.responses: dict[tuple[str, str, int], int] = {}
+        self.db: dict[tuple[str, str], RouteDbStats] = {}
+        self.in_flight = 0
+        self._gauges: list[tuple[str, str, Callable[[], float], str]] = []
+        self._lock = threading.Lock()
+
+    def add_gauge(self, name: str, help_text: str, read: Callable[[], float],
+                  labels: dict[str, str] | None = None) -> None:
+        """Export `read()` as a gauge, sampled whenever metrics are scraped.
+
+        Register a name several times with different `labels` for one series each.
+        """
+        label_text = ",".join(f'{key}="{value}"' for key, value in (labels or {}).items())
+        self._gauges.append((name, help_text, read, f"{{{label_text}}}" if label_text else ""))
+
+    def observe(self, method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+        key = (method, route)
+        with self._lock:
+            self.latency.setdefault(key, Histogram()).observe(seconds)
+            self.responses[(method, route, status)] = self.responses.get((method, route, status), 0) + 1
+            db = self.db.setdefault(key, RouteDbStats())
+            db.queries += stats.queries
+            db.seconds += stats.db_seconds
+
+    def render_prometheus(self) -> str:
+        lines: list[str] = []
+
+        def header(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            header("gyandarshak_http_requests_total", "counter", "HTTP responses by route and status.")
+            for (method, route, status), n in sorted(self.responses.items()):
+                lines.append(
+                    f'gyandarshak_http_requests_total{{method="{method}",route="{route}",status="{status}"}} {n}'
+                )
+
+            name = "gyandarshak_http_request_duration_seconds"
+            header(name, "histogram", "HTTP request latency by route.")
+            for (method, route), hist in sorted(self.latency.items()):
+                labels = f'method="{method}",route="{route}"'
+                cumulative = 0
+                for bound, n in zip(hist.buckets, hist.counts):
+                    cumulative += n
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {hist.count}')
+                lines.append(f"{name}_sum{{{labels}}} {hist.total:.6f}")
+                lines.append(f"{name}_count{{{labels}}} {hist.count}")
+
+            header("gyandarshak_http_requests_in_flight", "gauge", "HTTP requests being served.")
+            lines.append(f"gyandarshak_http_requests_in_flight {self.in_flight}")
+
+            header("gyandarshak_db_queries_total", "counter", "SQL statements executed by route.")
+            for (method, route), db in sorted(self.db.items()):
+                lines.append(f'gyandarshak_db_queries_total{{method="{method}",route="{route}"}} {db.queries}')
+            header("gyandarshak_db_query_seconds_total", "counter", "Time spent in SQL statements by route.")
+            for (method, route), db in sorted(self.db.items()):
+                lines.append(
+                    f'gyandarshak_db_query_seconds_total{{method="{method}",route="{route}"}} {db.seconds:.6f}'
+                )
+
+        described = set()
+        for name, help_text, read, labels in sorted(self._gauges, key=lambda gauge: gauge[0]):
+            if name not in described:
+                header(name, "gauge", help_text)
+                described.add(name)
+            lines.append(f"{name}{labels} {read()}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+def _server_timing(seconds: float, stats: RequestStats) -> bytes:
+    return (
+        f'app;dur={seconds * 1000:.1f}, '
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries"'
+    ).encode()
+
+
+def route_template(scope) -> str:
+    """The matched route's path template, e.g. "/tests/{test_id}"."""
+    route = scope.get("route")
+    if route is None:
+        return UNMATCHED_ROUTE
+    template = getattr(route, "path_format", route.path)
+    # routes of an included router may only know the part after its prefix
+    try:
+        suffix = template.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return template
+    path = scope["path"]
+    if suffix and path.endswith(suffix):
+        return path[: len(path) - len(suffix)] + template
+    return template
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streaming responses are not buffered."""
+
+    def __init__(self, app, registry: MetricsRegistry = metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", _server_timing(time.perf_counter() - started, stats)))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        self.registry.in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            self.registry.in_flight -= 1
+            _request_stats.reset(token)
+            self.registry.observe(
+                scope["method"],
+                route_template(scope),
+                status,
+                time.perf_counter() - started,
+                stats,
+            )
@@ -9,9 +9,13 @@ from sqlalchemy import (
     Enum,
     Float,
     ForeignKey,
+    Index,
     Integer,
+    LargeBinary,
     String,
     Text,
+    UniqueConstraint,
+    text,
 )
 from sqlalchemy.orm import relationship
 
@@ -77,7 +81,7 @@ class Course(Base):
     __tablename__ = "courses"
 
     id = Column(Integer, primary_key=True, index=True)
-    college_id = Column(Integer, ForeignKey("colleges.id", ondelete="CASCADE"), nullable=False)
+    college_id = Column(Integer, ForeignKey("colleges.id", ondelete="CASCADE"), nullable=False, index=True)
     name = Column(String, nullable=False)
     level = Column(String, nullable=True)  # UG / PG / Diploma
     duration_years = Column(Float, nullable=True)
@@ -105,6 +109,7 @@ class Exam(Base):
         "ExamDate",
         back_populates="exam",
         cascade="all, delete",
+        passive_deletes=True,
     )
 
 
@@ -112,7 +117,7 @@ class ExamDate(Base):
     __tablename__ = "exam_dates"
 
     id = Column(Integer, primary_key=True, index=True)
-    exam_id = Column(Integer, ForeignKey("exams.id"), nullable=False)
+    exam_id = Column(Integer, ForeignKey("exams.id", ondelete="CASCADE"), nullable=False, index=True)
     year = Column(Integer, nullable=False)
     event_type = Column(String, nullable=False)  # application_start, exam_date, result_date...
     date = Column(Date, nullable=False)
@@ -140,6 +145,7 @@ class Scholarship(Base):
         "StudentScholarshipStatus",
         back_populates="scholarship",
         cascade="all, delete",
+        passive_deletes=True,
     )
 
 
@@ -148,7 +154,9 @@ class StudentScholarshipStatus(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("student_profiles.id"), nullable=False)
-    scholarship_id = Column(Integer, ForeignKey("scholarships.id"), nullable=False)
+    scholarship_id = Column(
+        Integer, ForeignKey("scholarships.id", ondelete="CASCADE"), nullable=False, index=True
+    )
     status = Column(String, nullable=False, default="interested")  # interested/applied/approved/rejected
     notes = Column(Text, nullable=True)
 
@@ -166,23 +174,29 @@ class Test(Base):
     total_marks = Column(Integer, nullable=False, default=0)
     is_active = Column(Boolean, nullable=False, default=True)
 
+    # shared questions, through test_question_links; written with app.question_bank
     questions = relationship(
         "TestQuestion",
-        back_populates="test",
-        cascade="all, delete-orphan",
+        secondary="test_question_links",
+        order_by="TestQuestionLink.position",
+        viewonly=True,
     )
     attempts = relationship(
         "TestAttempt",
         back_populates="test",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
 
 class TestQuestion(Base):
+    """A question in the shared bank; tests use it through TestQuestionLink."""
+
     __tablename__ = "test_questions"
 
     id = Column(Integer, primary_key=True, index=True)
-    test_id = Column(Integer, ForeignKey("tests.id"), nullable=False)
+    # the test that added the question; another test using it takes over when it is deleted
+    test_id = Column(Integer, ForeignKey("tests.id", ondelete="CASCADE"), nullable=False, index=True)
     text = Column(Text, nullable=False)
     option_a = Column(String, nullable=False)
     option_b = Column(String, nullable=False)
@@ -190,15 +204,43 @@ class TestQuestion(Base):
     option_d = Column(String, nullable=False)
     correct_option = Column(String, nullable=False)  # "A" / "B" / "C" / "D"
     marks = Column(Integer, nullable=False, default=1)
+    # app.question_bank.content_hash; NULL until backfilled for older rows
+    content_hash = Column(String(64), nullable=True, index=True)
+
+    test = relationship("Test")
+
+
+class TestQuestionLink(Base):
+    __tablename__ = "test_question_links"
+    __table_args__ = (
+        Index("ix_test_question_links_question", "question_id"),
+    )
 
-    test = relationship("Test", back_populates="questions")
+    test_id = Column(Integer, ForeignKey("tests.id", ondelete="CASCADE"), primary_key=True)
+    question_id = Column(Integer, ForeignKey("test_questions.id", ondelete="CASCADE"), primary_key=True)
+    position = Column(Integer, nullable=False)  # order within the test
 
 
 class TestAttempt(Base):
     __tablename__ = "test_attempts"
+    __table_args__ = (
+        # leaderboard rebuild: best score per student for one test
+        Index("ix_test_attempts_test_student_score", "test_id", "student_id", "score"),
+        # admin listing: newest first within a test, keyset on (started_at, id)
+        Index("ix_test_attempts_test_started", "test_id", "started_at", "id"),
+        # only open attempts: lets the expiry sweeper ignore finished history
+        Index(
+            "ix_test_attempts_open",
+            "test_id",
+            "started_at",
+            sqlite_where=text("finished_at IS NULL"),
+        ),
+        # AUTOINCREMENT: archived attempts keep their ids, so ids are never reused
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    test_id = Column(Integer, ForeignKey("tests.id"), nullable=False)
+    test_id = Column(Integer, ForeignKey("tests.id", ondelete="CASCADE"), nullable=False)
     student_id = Column(Integer, ForeignKey("student_profiles.id"), nullable=False)
     started_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     finished_at = Column(DateTime, nullable=True)
@@ -210,23 +252,87 @@ class TestAttempt(Base):
         "TestAnswer",
         back_populates="attempt",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
 
 class TestAnswer(Base):
     __tablename__ = "test_answers"
+    __table_args__ = (
+        Index("ix_test_answers_attempt_question", "attempt_id", "question_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    attempt_id = Column(Integer, ForeignKey("test_attempts.id"), nullable=False)
-    question_id = Column(Integer, ForeignKey("test_questions.id"), nullable=False)
+    attempt_id = Column(Integer, ForeignKey("test_attempts.id", ondelete="CASCADE"), nullable=False)
+    question_id = Column(
+        Integer, ForeignKey("test_questions.id", ondelete="CASCADE"), nullable=False, index=True
+    )
     selected_option = Column(String, nullable=False)  # "A" / "B" / "C" / "D"
 
     attempt = relationship("TestAttempt", back_populates="answers")
     question = relationship("TestQuestion")
 
 
+class ArchivedAttempt(Base):
+    """
+    A finished attempt moved out of test_attempts by app.archive, keeping its
+    id and summary columns. Its answers are one compressed blob instead of a
+    test_answers row per question.
+    """
+
+    __tablename__ = "archived_attempts"
+    __table_args__ = (
+        Index("ix_archived_attempts_test_student_score", "test_id", "student_id", "score"),
+        Index("ix_archived_attempts_test_started", "test_id", "started_at", "id"),
+        Index("ix_archived_attempts_student_started", "student_id", "started_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)  # the original attempt id
+    test_id = Column(Integer, ForeignKey("tests.id", ondelete="CASCADE"), nullable=False)
+    student_id = Column(Integer, ForeignKey("student_profiles.id"), nullable=False)
+    started_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+    score = Column(Integer, nullable=True)
+    answers_zlib = Column(LargeBinary, nullable=False)  # zlib'd JSON {"question_id": "A", ...}
+    archived_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class GradingJob(Base):
+    __tablename__ = "grading_jobs"
+    __table_args__ = (
+        Index("ix_grading_jobs_status_id", "status", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    attempt_id = Column(
+        Integer, ForeignKey("test_attempts.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    answers_json = Column(Text, nullable=False)  # {"question_id": "A", ...}
+    status = Column(String, nullable=False, default="pending")  # pending/done/failed
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    graded_at = Column(DateTime, nullable=True)
+
+
+class CounsellingSlot(Base):
+    __tablename__ = "counselling_slots"
+    __table_args__ = (
+        UniqueConstraint("date", "time_band", name="uq_counselling_slots_date_band"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    date = Column(Date, nullable=False)
+    time_band = Column(String, nullable=False)  # "Morning" / "Afternoon" / "Evening"
+    capacity = Column(Integer, nullable=False, default=0)
+
+
 class SessionRequest(Base):
     __tablename__ = "session_requests"
+    __table_args__ = (
+        Index("ix_session_requests_date_status", "preferred_date", "status"),
+        # admin queue: newest first, optionally within one status
+        Index("ix_session_requests_created", "created_at", "id"),
+        Index("ix_session_requests_status_created", "status", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("student_profiles.id"), nullable=False)
@@ -236,5 +342,21 @@ class SessionRequest(Base):
     note = Column(Text, nullable=True)
     status = Column(String, nullable=False, default="pending")  # pending/approved/rejected/done
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    slot_id = Column(Integer, ForeignKey("counselling_slots.id"), nullable=True, index=True)
 
     student = relationship("StudentProfile")
+    slot = relationship("CounsellingSlot")
+
+
+class CatalogChange(Base):
+    """Append-only log of admin writes to colleges, exams and scholarships."""
+
+    __tablename__ = "catalog_changes"
+    # AUTOINCREMENT: versions are never reused, even after old rows are pruned
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    version = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)  # "college" / "exam" / "scholarship"
+    entity_id = Column(Integer, nullable=False)
+    deleted = Column(Boolean, nullable=False, default=False)
+    changed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
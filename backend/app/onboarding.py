@@ -0,0 +1,221 @@
+"""
+Bulk student onboarding from a school's spreadsheet, exported as CSV:
+
+    full_name,email,phone,password,state,district,class_level,stream_interest,target_field
+
+full_name, email and password are required; phone and the profile columns
+may be blank or left out. `import_students` reads the rows as they stream in
+and handles them ONBOARD_CHUNK_ROWS at a time:
+
+1. validate each row against `StudentImportRow`;
+2. drop emails and phones seen earlier in the file, then look the rest up
+   with a single query per chunk (`email IN (...) OR phone IN (...)`);
+3. hash the remaining passwords on a process pool (sha256_crypt is CPU
+   bound and holds the GIL, so threads would not help);
+4. insert the users with one multi-row INSERT, read their ids back by
+   email in one SELECT, insert the profiles with another multi-row INSERT
+   and commit, so a failure loses at most one chunk.
+
+Bad rows are skipped and reported by line number instead of failing the
+whole file. Used by POST /students/import and scripts_import_students.py.
+"""
+import csv
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Iterable, Iterator
+
+from pydantic import ValidationError
+from sqlalchemy import insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import models
+from app.schemas import StudentImportError, StudentImportRow
+from app.security import hash_password
+
+logger = logging.getLogger(__name__)
+
+ONBOARD_CHUNK_ROWS = 500
+HASH_WORKERS = int(os.getenv("GYANDARSHAK_HASH_WORKERS", str(os.cpu_count() or 1)))
+STUDENT_IMPORT_MAX_ERRORS = 1000
+REQUIRED_COLUMNS = ("full_name", "email", "password")
+PROFILE_FIELDS = ("state", "district", "class_level", "stream_interest", "target_field")
+
+
+class InvalidImportFile(ValueError):
+    pass
+
+
+class PasswordHasher:
+    """Hashes batches of passwords on worker processes, started on first use."""
+
+    def __init__(self, workers: int = HASH_WORKERS):
+        self.workers = workers
+        self._pool: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def hash_many(self, passwords: list[str]) -> list[str]:
+        if self.workers <= 1 or len(passwords) < 2:
+            return [hash_password(p) for p in passwords]
+        with self._lock:
+            if self._pool is None:
+                # "spawn": forking a process that runs threads can deadlock the child
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            pool = self._pool
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        return list(pool.map(hash_password, passwords, chunksize=chunksize))
+
+    def stop(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+
+@dataclass
+class ImportReport:
+    created: int = 0
+    skipped: int = 0
+    errors: list[StudentImportError] = field(default_factory=list)
+
+    def skip(self, line: int, email: str | None, reason: str) -> None:
+        self.skipped += 1
+        if len(self.errors) < STUDENT_IMPORT_MAX_ERRORS:
+            self.errors.append(StudentImportError(line=line, email=email, reason=reason))
+
+
+def read_csv(lines: Iterable[str]) -> Iterator[tuple[int, dict[str, str]]]:
+    """(line number, non-blank values) per data row; header names are case-insensitive."""
+    reader = csv.DictReader(lines)
+    if reader.fieldnames is None:
+        raise InvalidImportFile("The CSV file is empty")
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    missing = [name for name in REQUIRED_COLUMNS if name not in reader.fieldnames]
+    if missing:
+        raise InvalidImportFile(f"Missing CSV columns: {', '.join(missing)}")
+    for raw in reader:
+        values = {k: v.strip() for k, v in raw.items() if k and isinstance(v, str) and v.strip()}
+        if values:
+            yield reader.line_num, values
+
+
+def _parse(line: int, values: dict[str, str], report: ImportReport) -> StudentImportRow | None:
+    try:
+        return StudentImportRow(**values)
+    except ValidationError as exc:
+        error = exc.errors()[0]
+        where = ".".join(str(part) for part in error["loc"])
+        report.skip(line, values.get("email"), f"{where}: {error['msg']}")
+        return None
+
+
+def _import_chunk(
+    db: Session,
+    chunk: list[tuple[int, StudentImportRow]],
+    seen_emails: set[str],
+    seen_phones: set[str],
+    report: ImportReport,
+    hasher: PasswordHasher,
+) -> None:
+    rows = []
+    for line, row in chunk:
+        if row.email in seen_emails:
+            report.skip(line, row.email, "Duplicate email in file")
+        elif row.phone and row.phone in seen_phones:
+            report.skip(line, row.email, "Duplicate phone in file")
+        else:
+            seen_emails.add(row.email)
+            if row.phone:
+                seen_phones.add(row.phone)
+            rows.append((line, row))
+    if not rows:
+        return
+
+    # one lookup for the whole chunk
+    taken = models.User.email.in_([row.email for _, row in rows])
+    phones = [row.phone for _, row in rows if row.phone]
+    if phones:
+        taken = or_(taken, models.User.phone.in_(phones))
+    taken_emails, taken_phones = set(), set()
+    for email, phone in db.execute(select(models.User.email, models.User.phone).where(taken)):
+        taken_emails.add(email)
+        taken_phones.add(phone)
+
+    fresh = []
+    for line, row in rows:
+        if row.email in taken_emails:
+            report.skip(line, row.email, "Email already registered")
+        elif row.phone and row.phone in taken_phones:
+            report.skip(line, row.email, "Phone already registered")
+        else:
+            fresh.append((line, row))
+    if not fresh:
+        return
+
+    hashes = hasher.hash_many([row.password for _, row in fresh])
+    try:
+        # matched back by email: RETURNING in parameter order makes SQLite
+        # send one INSERT per row
+        db.execute(
+            insert(models.User),
+            [
+                {
+                    "full_name": row.full_name,
+                    "email": row.email,
+                    "phone": row.phone,
+                    "password_hash": password_hash,
+                    "role": models.UserRole.student,
+                }
+                for (_, row), password_hash in zip(fresh, hashes)
+            ],
+        )
+        user_ids = dict(
+            db.execute(
+                select(models.User.email, models.User.id).where(
+                    models.User.email.in_([row.email for _, row in fresh])
+                )
+            ).all()
+        )
+        db.execute(
+            insert(models.StudentProfile),
+            [
+                {"user_id": user_ids[row.email], **{name: getattr(row, name) for name in PROFILE_FIELDS}}
+                for _, row in fresh
+            ],
+        )
+        db.commit()
+    except IntegrityError:
+        # someone registered one of these addresses since the lookup
+        db.rollback()
+        logger.warning("student import chunk conflicted with a concurrent registration")
+        for line, row in fresh:
+            report.skip(line, row.email, "Conflicts with an account registered during the import")
+        return
+    report.created += len(fresh)
+
+
+def import_students(
+    db: Session,
+    lines: Iterable[str],
+    hasher: PasswordHasher | None = None,
+    chunk_rows: int = ONBOARD_CHUNK_ROWS,
+) -> ImportReport:
+    """Register every valid, new student in the CSV; commits once per chunk."""
+    hasher = hasher or password_hasher
+    report = ImportReport()
+    seen_emails: set[str] = set()
+    seen_phones: set[str] = set()
+    rows = read_csv(lines)
+    while chunk := list(islice(rows, chunk_rows)):
+        parsed = [(line, row) for line, values in chunk if (row := _parse(line, values, report))]
+        _import_chunk(db, parsed, seen_emails, seen_phones, report, hasher)
+    report.errors.sort(key=lambda error: error.line)
+    return report
+
+
+password_hasher = PasswordHasher()
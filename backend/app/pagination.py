@@ -0,0 +1,44 @@
+"""
+Keyset pagination helpers for newest-first listings.
+
+Pages are ordered by (timestamp desc, id desc). The cursor is the
+timestamp and id of the last row of the previous page, and the next cursor
+is returned in the X-Next-Cursor response header so list responses keep
+their shape.
+"""
+from datetime import datetime
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(ts: datetime, row_id: int) -> str:
+    return f"{ts.isoformat()}_{row_id}"
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        ts, row_id = cursor.rsplit("_", 1)
+        return datetime.fromisoformat(ts), int(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def before_cursor(ts_column, id_column, cursor: str):
+    """Filter clause selecting rows strictly after `cursor` in newest-first order."""
+    ts, row_id = decode_cursor(cursor)
+    return or_(ts_column < ts, and_(ts_column == ts, id_column < row_id))
+
+
+def trim_page(rows: list, limit: int, response: Response, ts_attr: str, id_attr: str = "id") -> list:
+    """Drop the look-ahead row (query with limit + 1) and set the next cursor header."""
+    if len(rows) <= limit:
+        return rows
+    rows = rows[:limit]
+    last = rows[-1]
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+        getattr(last, ts_attr), getattr(last, id_attr)
+    )
+    return rows
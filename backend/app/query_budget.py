@@ -0,0 +1,103 @@
+"""
+Per-endpoint SQL query budgets.
+
+Endpoints declare how many statements a request may run:
+
+    @router.get("/my-attempts")
+    @query_budget(3)
+    def list_my_attempts(...): ...
+
+`QueryBudgetMiddleware` compares that with the statements counted for the
+request by `app.metrics`. GYANDARSHAK_QUERY_BUDGET_MODE controls what happens
+when a request goes over:
+
+- "off" (default): budgets are not checked;
+- "warn": the request is logged with its statement count;
+- "strict": the response is replaced by a 500, so N+1 regressions fail
+  loudly in development and in the test suite (tests/test_query_budgets.py).
+
+Statements run after the response has started (streamed bodies) are only
+ever logged.
+"""
+import json
+import logging
+import os
+from typing import Callable
+
+from app.metrics import current_request_stats, route_template
+
+logger = logging.getLogger(__name__)
+
+QUERY_BUDGET_MODE = os.getenv("GYANDARSHAK_QUERY_BUDGET_MODE", "off")
+BUDGET_ATTR = "__query_budget__"
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_budget(max_queries: int) -> Callable:
+    """Declare the most SQL statements one request to the endpoint may run."""
+
+    def mark(endpoint: Callable) -> Callable:
+        setattr(endpoint, BUDGET_ATTR, max_queries)
+        return endpoint
+
+    return mark
+
+
+def budget_of(endpoint: Callable | None) -> int | None:
+    return getattr(endpoint, BUDGET_ATTR, None)
+
+
+class QueryBudgetMiddleware:
+    """Must sit inside `MetricsMiddleware`, which counts the statements."""
+
+    def __init__(self, app, mode: str = QUERY_BUDGET_MODE):
+        self.app = app
+        self.mode = mode
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.mode == "off":
+            await self.app(scope, receive, send)
+            return
+
+        stats = current_request_stats()
+        rejected = False
+
+        def over_budget() -> str | None:
+            budget = budget_of(scope.get("endpoint"))
+            if stats is None or budget is None or stats.queries <= budget:
+                return None
+            return (
+                f"{scope['method']} {route_template(scope)} ran {stats.queries} "
+                f"SQL statements, budget is {budget}"
+            )
+
+        async def send_checked(message):
+            nonlocal rejected
+            if rejected:
+                return
+            if message["type"] == "http.response.start":
+                problem = over_budget()
+                if problem and self.mode == "strict":
+                    rejected = True
+                    logger.error("query budget exceeded: %s", problem)
+                    body = json.dumps({"detail": f"Query budget exceeded: {problem}"}).encode()
+                    await send({
+                        "type": "http.response.start",
+                        "status": 500,
+                        "headers": [
+                            (b"content-type", b"application/json"),
+                            (b"content-length", str(len(body)).encode()),
+                        ],
+                    })
+                    await send({"type": "http.response.body", "body": body})
+                    return
+            await send(message)
+
+        await self.app(scope, receive, send_checked)
+        if not rejected:
+            problem = over_budget()
+            if problem:
+                logger.warning("query budget exceeded: %s", problem)
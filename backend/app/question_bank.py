@@ -0,0 +1,374 @@
+"""
+Shared question bank.
+
+A question is stored once in test_questions. Tests use it through
+test_question_links (test, question, position), so a question pasted into
+many tests is one row. `QuestionLinker` is how questions get into a test,
+both from create_test and from bulk imports:
+
+- every question gets a `content_hash` of its normalized content (Unicode
+  NFKC, whitespace collapsed, casefolded; answer key and marks included);
+- questions already in the bank are found by hash, one query per chunk,
+  and linked instead of copied;
+- new questions are inserted with one multi-row INSERT, then all the links
+  with another.
+
+`import_questions` streams CSV or JSON through a linker, QUESTION_IMPORT_CHUNK_ROWS
+rows at a time with one transaction per chunk. The JSON can be an array or
+one object per line. Bad rows are reported rather than failing the file.
+
+A question's `test_id` names the test that added it. When that test is
+deleted, `release_test_questions` hands the question to another test that
+uses it.
+
+Databases created before the link table are upgraded by
+`backfill_question_bank`: each question is linked to its own test and
+hashed. Questions only ever go in through a linker, hashed and linked at
+once, so a question without a hash marks an unfinished upgrade and one
+indexed lookup (`has_unhashed_questions`) tells whether there is work to
+do. At startup the schema check links them inside its transaction and the
+lifespan then hashes them (`hash_question_bank`); with the schema check
+off, run scripts_backfill_question_bank.py. Duplicate rows that already exist are
+left alone; only questions added from then on are deduplicated.
+"""
+import csv
+import hashlib
+import json
+import logging
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Iterator, TextIO
+
+from pydantic import ValidationError
+from sqlalchemy import Connection, delete, exists, func, insert, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import models
+from app.database import SessionLocal
+from app.schemas import QuestionImportError, TestQuestionCreate
+
+logger = logging.getLogger(__name__)
+
+QUESTION_IMPORT_CHUNK_ROWS = 500
+QUESTION_IMPORT_MAX_ERRORS = 1000
+HASH_BACKFILL_BATCH_SIZE = 5000
+CSV_COLUMNS = ("text", "option_a", "option_b", "option_c", "option_d", "correct_option")
+OPTIONS = "ABCD"
+JSON_READ_CHARS = 64 * 1024
+# between JSON objects: whitespace, commas and the brackets of an array
+_JSON_SEPARATORS = " \t\r\n,[]"
+_WHITESPACE = re.compile(r"\s+")
+
+
+class InvalidImportFile(ValueError):
+    pass
+
+
+def _normalize(value: str) -> str:
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", value)).strip().casefold()
+
+
+def content_hash(question) -> str:
+    """sha256 of a question's normalized text, options, answer key and marks."""
+    parts = [
+        _normalize(question.text),
+        *(_normalize(getattr(question, f"option_{o}")) for o in "abcd"),
+        question.correct_option.strip().upper(),
+        str(question.marks),
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+@dataclass
+class QuestionImportReport:
+    created: int = 0
+    reused: int = 0
+    skipped: int = 0
+    total_marks: int = 0
+    errors: list[QuestionImportError] = field(default_factory=list)
+
+    def skip(self, item: int, reason: str) -> None:
+        self.skipped += 1
+        if len(self.errors) < QUESTION_IMPORT_MAX_ERRORS:
+            self.errors.append(QuestionImportError(item=item, reason=reason))
+
+
+class QuestionLinker:
+    """Adds questions to one test, reusing identical questions from the bank."""
+
+    def __init__(self, db: Session, test_id: int, new_test: bool = False):
+        self.db = db
+        self.test_id = test_id
+        self.report = QuestionImportReport()
+        link = models.TestQuestionLink
+        rows = [] if new_test else db.execute(
+            select(link.question_id, link.position).where(link.test_id == test_id)
+        ).all()
+        self.linked = {question_id for question_id, _ in rows}
+        self.next_position = max((position for _, position in rows), default=-1) + 1
+
+    def add(self, questions: list[tuple[int, TestQuestionCreate]]) -> None:
+        """Link a chunk of (item number, question) to the test; does not commit."""
+        hashed: dict[str, tuple[int, TestQuestionCreate]] = {}
+        for item, question in questions:
+            digest = content_hash(question)
+            if digest in hashed:
+                self.report.skip(item, "Duplicate question in this test")
+            else:
+                hashed[digest] = (item, question)
+        if not hashed:
+            return
+
+        # one lookup per chunk; older duplicates may share a hash, the first one wins
+        existing = dict(
+            self.db.execute(
+                select(models.TestQuestion.content_hash, func.min(models.TestQuestion.id))
+                .where(models.TestQuestion.content_hash.in_(list(hashed)))
+                .group_by(models.TestQuestion.content_hash)
+            ).all()
+        )
+        reused, new = [], []
+        for digest, (item, question) in hashed.items():
+            question_id = existing.get(digest)
+            if question_id is None:
+                new.append((digest, question))
+            elif question_id in self.linked:
+                self.report.skip(item, "Duplicate question in this test")
+            else:
+                reused.append(question_id)
+
+        created = []
+        if new:
+            # matched back by hash: asking SQLite for RETURNING in parameter order
+            # would send one INSERT per row
+            ids = dict(self.db.execute(
+                insert(models.TestQuestion).returning(models.TestQuestion.content_hash, models.TestQuestion.id),
+                [
+                    {
+                        "test_id": self.test_id,
+                        "text": q.text,
+                        "option_a": q.option_a,
+                        "option_b": q.option_b,
+                        "option_c": q.option_c,
+                        "option_d": q.option_d,
+                        "correct_option": q.correct_option.strip().upper(),
+                        "marks": q.marks,
+                        "content_hash": digest,
+                    }
+                    for digest, q in new
+                ],
+            ).all())
+            created = [ids[digest] for digest, _ in new]
+        question_ids = reused + created
+        if not question_ids:
+            return
+
+        self.db.execute(
+            insert(models.TestQuestionLink),
+            [
+                {"test_id": self.test_id, "question_id": question_id, "position": self.next_position + n}
+                for n, question_id in enumerate(question_ids)
+            ],
+        )
+        self.next_position += len(question_ids)
+        self.linked.update(question_ids)
+        self.report.created += len(created)
+        self.report.reused += len(reused)
+        self.report.total_marks = update_total_marks(self.db, self.test_id)
+
+
+def update_total_marks(db: Session, test_id: int) -> int:
+    link = models.TestQuestionLink
+    total = (
+        select(func.coalesce(func.sum(models.TestQuestion.marks), 0))
+        .join(link, link.question_id == models.TestQuestion.id)
+        .where(link.test_id == test_id)
+        .scalar_subquery()
+    )
+    return db.execute(
+        update(models.Test)
+        .where(models.Test.id == test_id)
+        .values(total_marks=total)
+        .returning(models.Test.total_marks)
+    ).scalar_one()
+
+
+def release_test_questions(db: Session, test_id: int) -> None:
+    """
+    Before a test is deleted: questions it added that other tests still use
+    move to the lowest such test, and the test's links are removed. Its
+    remaining questions are then only its own and can be deleted by test_id.
+    """
+    link = models.TestQuestionLink
+    question = models.TestQuestion
+    other_test = (
+        select(func.min(link.test_id))
+        .where(link.question_id == question.id, link.test_id != test_id)
+        .scalar_subquery()
+    )
+    db.execute(
+        update(question)
+        .where(question.test_id == test_id, other_test.is_not(None))
+        .values(test_id=other_test)
+    )
+    db.execute(delete(link).where(link.test_id == test_id))
+
+
+# ---------- reading import files ----------
+
+def _clean(values: dict) -> dict:
+    return {
+        k: v.strip() if isinstance(v, str) else v
+        for k, v in values.items()
+        if k and v is not None and (not isinstance(v, str) or v.strip())
+    }
+
+
+def _read_csv(stream: TextIO) -> Iterator[tuple[int, dict]]:
+    reader = csv.DictReader(stream)
+    if reader.fieldnames is None:
+        raise InvalidImportFile("The file is empty")
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    missing = [name for name in CSV_COLUMNS if name not in reader.fieldnames]
+    if missing:
+        raise InvalidImportFile(f"Missing CSV columns: {', '.join(missing)}")
+    for raw in reader:
+        values = _clean(raw)
+        if values:
+            yield reader.line_num, values
+
+
+def _read_json(stream: TextIO) -> Iterator[tuple[int, dict]]:
+    """Objects of a JSON array or of JSON Lines, decoded as the text streams in."""
+    decoder = json.JSONDecoder()
+    buf, pos, eof, item = "", 0, False, 0
+    while True:
+        while pos < len(buf) and buf[pos] in _JSON_SEPARATORS:
+            pos += 1
+        if pos == len(buf):
+            if eof:
+                return
+            buf, pos = stream.read(JSON_READ_CHARS), 0
+            eof = not buf
+            continue
+        try:
+            value, pos = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError as exc:
+            if eof:
+                raise InvalidImportFile(f"Invalid JSON after item {item}: {exc.msg}")
+            # most likely an object cut off at the end of the buffer
+            more = stream.read(JSON_READ_CHARS)
+            buf, pos, eof = buf[pos:] + more, 0, not more
+            continue
+        item += 1
+        yield item, _clean(value) if isinstance(value, dict) else {}
+
+
+def read_questions(stream: TextIO) -> Iterator[tuple[int, dict]]:
+    """(item number, fields) per question; JSON if the file starts with [ or {, else CSV."""
+    start = stream.tell()
+    head = stream.read(JSON_READ_CHARS).lstrip()
+    stream.seek(start)
+    if head[:1] in ("[", "{"):
+        return _read_json(stream)
+    return _read_csv(stream)
+
+
+def _parse(item: int, values: dict, report: QuestionImportReport) -> TestQuestionCreate | None:
+    try:
+        question = TestQuestionCreate(**values)
+    except ValidationError as exc:
+        error = exc.errors()[0]
+        where = ".".join(str(part) for part in error["loc"])
+        report.skip(item, f"{where}: {error['msg']}" if where else error["msg"])
+        return None
+    if question.correct_option.strip().upper() not in OPTIONS:
+        report.skip(item, "correct_option: must be one of A, B, C, D")
+        return None
+    if question.marks < 1:
+        report.skip(item, "marks: must be at least 1")
+        return None
+    return question
+
+
+def import_questions(
+    db: Session,
+    test_id: int,
+    stream: TextIO,
+    chunk_rows: int = QUESTION_IMPORT_CHUNK_ROWS,
+) -> QuestionImportReport:
+    """Add every valid question in the file to the test; commits once per chunk."""
+    linker = QuestionLinker(db, test_id)
+    report = linker.report
+    report.total_marks = db.query(models.Test.total_marks).filter(models.Test.id == test_id).scalar() or 0
+    rows = read_questions(stream)
+    while chunk := list(islice(rows, chunk_rows)):
+        linker.add([(item, q) for item, values in chunk if (q := _parse(item, values, report))])
+        db.commit()
+    report.errors.sort(key=lambda error: error.item)
+    return report
+
+
+# ---------- upgrading older databases ----------
+
+def link_owned_questions(db: Session | Connection) -> int:
+    """Link every question no test uses yet to the test that owns it; returns how many."""
+    link = models.TestQuestionLink
+    question = models.TestQuestion
+    return db.execute(
+        insert(link).from_select(
+            ["test_id", "question_id", "position"],
+            select(question.test_id, question.id, question.id).where(
+                ~exists().where(link.question_id == question.id)
+            ),
+        )
+    ).rowcount
+
+
+def has_unhashed_questions(db: Session | Connection) -> bool:
+    """Whether the upgrade to the shared bank is unfinished (see the module docs)."""
+    question = models.TestQuestion
+    return db.execute(select(exists().where(question.content_hash.is_(None)))).scalar()
+
+
+def fill_content_hashes(db: Session, batch_size: int = HASH_BACKFILL_BATCH_SIZE) -> int:
+    """Hash questions stored without a content_hash; commits per batch."""
+    question = models.TestQuestion
+    hashed = 0
+    while True:
+        rows = db.execute(
+            select(question.id, question.text, question.option_a, question.option_b, question.option_c,
+                   question.option_d, question.correct_option, question.marks)
+            .where(question.content_hash.is_(None))
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return hashed
+        db.execute(update(question), [{"id": row.id, "content_hash": content_hash(row)} for row in rows])
+        db.commit()
+        hashed += len(rows)
+
+
+def backfill_question_bank(session_factory: sessionmaker = SessionLocal) -> tuple[int, int]:
+    """Link and hash questions from before the shared bank; returns (linked, hashed)."""
+    db = session_factory()
+    try:
+        linked = link_owned_questions(db) if has_unhashed_questions(db) else 0
+        db.commit()
+    finally:
+        db.close()
+    return linked, hash_question_bank(session_factory)
+
+
+def hash_question_bank(session_factory: sessionmaker = SessionLocal) -> int:
+    """Hash questions from before the shared bank; one indexed lookup when there are none."""
+    db = session_factory()
+    try:
+        hashed = fill_content_hashes(db) if has_unhashed_questions(db) else 0
+    finally:
+        db.close()
+    if hashed:
+        logger.info("question bank backfill: %s questions hashed", hashed)
+    return hashed
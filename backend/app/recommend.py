@@ -0,0 +1,238 @@
+"""
+Course recommendations from a student's profile.
+
+Each course is scored as a weighted sum of:
+
+- stream match: the course's stream contains the profile's `stream_interest`
+  (full weight) or `target_field` (partial weight); other courses are not
+  candidates at all;
+- state proximity: same state, else same region of India;
+- fee: cheaper scores higher, unknown fees score in the middle;
+- partner college (`is_partner`) and discount availability.
+
+The score is `base + stream term + state term`, where `base` (fee, partner,
+discount) does not depend on the student. `CourseIndex` therefore keeps
+every course in candidate lists per (stream, state), each pre-sorted by
+`base`. Within one list the stream and state terms are the same constant,
+so the list's order is already the final order. A request lazily merges
+the heads of the lists for its streams and stops after `limit` results.
+It never scans the courses, and needs no vectorized math.
+
+The index is built from one query in the background when the worker starts
+(a million courses take several seconds; until the first build finishes
+`recommend` returns None and the endpoint answers 503) and is tagged with
+the shared catalog version. When the catalog changes, it is rebuilt in the
+background while requests keep ranking with the previous one. Ranked results are
+cached per (index version, stream, field, state), so students with the same
+profile share them.
+"""
+import heapq
+import logging
+import threading
+from array import array
+from dataclasses import dataclass
+from itertools import groupby, islice
+from operator import itemgetter
+from typing import Iterator
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import models
+from app.cache import CATALOG, cache
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# score weights
+STREAM_WEIGHT = 3.0
+STATE_WEIGHT = 2.0
+FEE_WEIGHT = 1.5
+PARTNER_WEIGHT = 1.0
+DISCOUNT_WEIGHT = 0.5
+# how much a target_field match counts compared to a stream_interest match
+FIELD_MATCH = 0.6
+# same region, different state
+REGION_MATCH = 0.5
+# fees at or above this (₹, whole course) get no fee score
+FEE_REFERENCE = 1_000_000
+UNKNOWN_FEE_SCORE = 0.5
+# ranked results kept per profile; pages past this are empty
+RECOMMEND_MAX_RESULTS = 500
+RECOMMEND_CACHE_TTL_SECONDS = 600
+BUILD_FETCH_ROWS = 50_000
+
+REGIONS = {
+    "north": ["Delhi", "Haryana", "Punjab", "Himachal Pradesh", "Jammu and Kashmir", "Ladakh",
+              "Uttarakhand", "Uttar Pradesh", "Chandigarh", "Rajasthan"],
+    "east": ["Bihar", "Jharkhand", "West Bengal", "Odisha"],
+    "northeast": ["Assam", "Arunachal Pradesh", "Manipur", "Meghalaya", "Mizoram", "Nagaland",
+                  "Sikkim", "Tripura"],
+    "central": ["Madhya Pradesh", "Chhattisgarh"],
+    "west": ["Gujarat", "Maharashtra", "Goa"],
+    "south": ["Karnataka", "Kerala", "Tamil Nadu", "Andhra Pradesh", "Telangana", "Puducherry"],
+}
+_REGION_OF = {state.casefold(): region for region, states in REGIONS.items() for state in states}
+
+
+def _key(value: str | None) -> str:
+    return value.strip().casefold() if value else ""
+
+
+def fee_score(fee: float | None) -> float:
+    if fee is None:
+        return UNKNOWN_FEE_SCORE
+    return max(0.0, 1.0 - fee / FEE_REFERENCE)
+
+
+@dataclass
+class Candidates:
+    """Courses of one stream in one state, best `base` first (ties: lower id first)."""
+
+    ids: array
+    base: array  # fee + partner + discount part of the score
+
+    def scored(self, shift: float) -> Iterator[tuple[float, int]]:
+        """(-score, course_id) in ascending order, for heapq.merge."""
+        for base, course_id in zip(self.base, self.ids):
+            yield -(base + shift), course_id
+
+
+class CourseIndex:
+    def __init__(self, version: int):
+        self.version = version
+        self.size = 0
+        # stream key -> state key -> candidates
+        self.streams: dict[str, dict[str, Candidates]] = {}
+
+    @classmethod
+    def build(cls, db: Session, version: int) -> "CourseIndex":
+        index = cls(version)
+        # score and order in SQL, so Python only slices the result into lists
+        fee = models.Course.approx_fee_total
+        base = (
+            FEE_WEIGHT * case((fee.is_(None), UNKNOWN_FEE_SCORE),
+                              (fee >= FEE_REFERENCE, 0.0),
+                              else_=1.0 - fee / float(FEE_REFERENCE))
+            + PARTNER_WEIGHT * case((models.College.is_partner, 1.0), else_=0.0)
+            + DISCOUNT_WEIGHT * case((models.Course.discount_available, 1.0), else_=0.0)
+        ).label("base")
+        stream = func.lower(func.trim(func.coalesce(models.Course.stream, ""))).label("stream")
+        state = func.lower(func.trim(func.coalesce(models.College.state, ""))).label("state")
+        rows = db.connection().execute(
+            select(stream, state, base, models.Course.id)
+            .join(models.College, models.College.id == models.Course.college_id)
+            .order_by(stream, state, base.desc(), models.Course.id)
+            .execution_options(yield_per=BUILD_FETCH_ROWS)
+        )
+        for (stream_key, state_key), group in groupby(rows, key=itemgetter(0, 1)):
+            group = list(group)
+            index.streams.setdefault(stream_key, {})[state_key] = Candidates(
+                ids=array("q", [row[3] for row in group]),
+                base=array("d", [row[2] for row in group]),
+            )
+            index.size += len(group)
+        return index
+
+    def _matching_streams(self, stream_interest: str | None, target_field: str | None) -> dict[str, float]:
+        """Candidate stream key -> stream match, like the catalog's `ilike %stream%` filters."""
+        wanted = [(k, 1.0) for k in [_key(stream_interest)] if k]
+        wanted += [(k, FIELD_MATCH) for k in [_key(target_field)] if k]
+        if not wanted:
+            # nothing to go on: every course is a candidate, ranked on the other terms
+            return {stream: 0.0 for stream in self.streams}
+        matched: dict[str, float] = {}
+        for stream in self.streams:
+            for key, match in wanted:
+                if stream and key in stream:
+                    matched[stream] = max(matched.get(stream, 0.0), match)
+        return matched
+
+    def rank(self, stream_interest: str | None, target_field: str | None, state: str | None,
+             limit: int = RECOMMEND_MAX_RESULTS) -> list[tuple[int, float]]:
+        """The best `limit` (course_id, score) pairs, best first; ties go to the lower id."""
+        state = _key(state)
+        region = _REGION_OF.get(state)
+        lists = []
+        for stream, match in self._matching_streams(stream_interest, target_field).items():
+            for course_state, candidates in self.streams[stream].items():
+                if state and course_state == state:
+                    proximity = 1.0
+                elif region and _REGION_OF.get(course_state) == region:
+                    proximity = REGION_MATCH
+                else:
+                    proximity = 0.0
+                lists.append(candidates.scored(STREAM_WEIGHT * match + STATE_WEIGHT * proximity))
+        return [
+            (course_id, round(-neg_score, 4))
+            for neg_score, course_id in islice(heapq.merge(*lists), limit)
+        ]
+
+
+class Recommender:
+    def __init__(self, session_factory: sessionmaker = SessionLocal):
+        self.session_factory = session_factory
+        self.builds = 0
+        self._index: CourseIndex | None = None
+        self._lock = threading.Lock()
+        self._rebuilding = False
+        self.ready = threading.Event()  # set once the first index is in place
+
+    def _build(self, version: int) -> CourseIndex:
+        db = self.session_factory()
+        try:
+            index = CourseIndex.build(db, version)
+        finally:
+            db.close()
+        self.builds += 1
+        return index
+
+    def _rebuild_in_background(self, version: int) -> None:
+        try:
+            self._index = self._build(version)
+            self.ready.set()
+        except Exception:
+            logger.exception("recommendation index rebuild failed")
+        finally:
+            self._rebuilding = False
+
+    def _rebuild(self, version: int) -> None:
+        with self._lock:
+            if not self._rebuilding:
+                self._rebuilding = True
+                threading.Thread(
+                    target=self._rebuild_in_background, args=(version,),
+                    name="recommend-rebuild", daemon=True,
+                ).start()
+
+    def start(self) -> None:
+        """Build the first index in the background, so no request has to wait for it."""
+        if self._index is None:
+            self._rebuild(cache.version(CATALOG))
+
+    def index(self) -> CourseIndex | None:
+        """The current index, None until the first build finishes; rebuilt in the background."""
+        version = cache.version(CATALOG)
+        index = self._index
+        if index is None or index.version != version:
+            self._rebuild(version)
+        return index
+
+    def recommend(self, profile: models.StudentProfile) -> list[tuple[int, float]] | None:
+        """Ranked (course_id, score) pairs for the profile, shared through the catalog cache.
+
+        None while the first index is still being built.
+        """
+        index = self.index()
+        if index is None:
+            return None
+        key = ("recommended", index.version, _key(profile.stream_interest), _key(profile.target_field),
+               _key(profile.state))
+        return cache.get_or_set(
+            CATALOG, repr(key),
+            lambda: index.rank(profile.stream_interest, profile.target_field, profile.state),
+            RECOMMEND_CACHE_TTL_SECONDS,
+        )
+
+
+recommender = Recommender()
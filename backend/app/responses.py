@@ -0,0 +1,122 @@
+"""
+Fast JSON responses for trusted read paths.
+
+Endpoints with a `response_model` normally re-validate every returned ORM
+object against the Pydantic model before encoding it. For read-only catalog
+lists the rows come straight from our own tables, so that validation only
+costs time. `trusted_response(Model, rows)` instead copies the model's
+fields off the ORM objects (recursing into nested list models such as
+`CollegeOut.courses`) and encodes them with orjson:
+
+    @router.get("/", response_model=list[CollegeOut])
+    def list_colleges(...):
+        return trusted_response(CollegeOut, query.all())
+
+`response_model` stays on the route for the OpenAPI schema; FastAPI skips
+its own serialization when an endpoint returns a Response. Values are
+written as stored, so only use this for models whose fields map 1:1 onto
+columns and relationships.
+
+`cached_response` keeps such encoded bodies in the shared `app.cache`, so
+repeated list requests skip the database in every worker until the
+namespace is invalidated.
+
+orjson is optional; without it the stdlib encoder is used.
+"""
+import json
+from datetime import date, datetime
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Union, get_args, get_origin
+
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+from app.cache import cache
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+_NOTHING: dict = {}
+
+CACHED_RESPONSE_TTL_SECONDS = 600
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when it is installed."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _nested_model(annotation: Any) -> tuple[type[BaseModel], bool] | None:
+    """(model, is_list) for `Model`, `List[Model]` and their Optional forms."""
+    if get_origin(annotation) is Union:
+        args = [a for a in get_args(annotation) if a is not type(None)]
+        if len(args) != 1:
+            return None
+        annotation = args[0]
+    if get_origin(annotation) is list:
+        (item,) = get_args(annotation)
+        if isinstance(item, type) and issubclass(item, BaseModel):
+            return item, True
+        return None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    return None
+
+
+@lru_cache(maxsize=None)
+def trusted_encoder(model: type[BaseModel]) -> Callable[[Any], dict]:
+    """Build `obj -> dict` for `model`, reading attributes in field order."""
+    plan = []
+    for name, info in model.model_fields.items():
+        nested = _nested_model(info.annotation)
+        if nested is None:
+            plan.append((name, None, False))
+        else:
+            plan.append((name, trusted_encoder(nested[0]), nested[1]))
+
+    def encode(obj: Any) -> dict:
+        # loaded ORM attributes live in __dict__; reading them there skips the
+        # instrumented descriptor, which is most of the cost on large lists
+        loaded = getattr(obj, "__dict__", _NOTHING)
+        row = {}
+        for name, sub, many in plan:
+            value = loaded[name] if name in loaded else getattr(obj, name)
+            if sub is not None and value is not None:
+                value = [sub(item) for item in value] if many else sub(value)
+            row[name] = value
+        return row
+
+    return encode
+
+
+def trusted_response(model: type[BaseModel], rows: Iterable[Any], **kwargs: Any) -> FastJSONResponse:
+    encode = trusted_encoder(model)
+    return FastJSONResponse([encode(row) for row in rows], **kwargs)
+
+
+def cached_response(namespace: str, key: tuple, build: Callable[[], Response],
+                    ttl: float = CACHED_RESPONSE_TTL_SECONDS) -> Response:
+    """Serve `build()`'s JSON body from the shared cache, building it on a miss."""
+    body = cache.get_or_set(namespace, repr(key), lambda: build().body, ttl)
+    return Response(content=body, media_type="application/json")
@@ -1,5 +1,18 @@
-from fastapi import APIRouter
+import json
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app import models
+from app.assistant import Generation, assistant
+from app.deps import get_db
+from app.limits import Overloaded, limit_concurrency
+from app.llm import AskProfile
+from app.query_budget import query_budget
+from app.security import get_current_admin, get_optional_user
 
 router = APIRouter()
 
@@ -8,31 +21,150 @@ class AskRequest(BaseModel):
     question: str
 
 
+class AskSource(BaseModel):
+    kind: str  # exam / scholarship / college / course
+    id: int
+    title: str
+    score: float
+
+
 class AskResponse(BaseModel):
     answer: str
+    sources: List[AskSource] = []
 
 
-@router.post("/ask", response_model=AskResponse)
-def ask_gyandarshak(payload: AskRequest) -> AskResponse:
-    """
-    Demo AI endpoint. Later this can call a real LLM and use DB data.
-    """
-    q = payload.question.strip().lower()
+class AskStatsOut(BaseModel):
+    cache_entries: int
+    cache_hits: int
+    cache_misses: int
+    cache_hit_rate: float
+    cache_evictions: int
+    cache_invalidations: int
+    generations: int
+    coalesced: int
+    active_generations: int
+    waiting_generations: int
+    rejected: int
 
-    if "exam" in q:
-        text = (
-            "This is a demo answer. Gyandarshak will show you relevant exams and "
-            "dates based on your class, stream, and state."
-        )
-    elif "scholarship" in q:
-        text = (
-            "This is a demo answer. Gyandarshak will highlight scholarships from "
-            "government and trusts that match your profile."
+
+def _clean(value: str | None) -> str | None:
+    value = " ".join(value.casefold().split()) if value else ""
+    return value or None
+
+
+def get_ask_profile(
+    current_user: models.User | None = Depends(get_optional_user),
+    db: Session = Depends(get_db),
+) -> AskProfile | None:
+    if current_user is None or current_user.role != "student":
+        return None
+    profile = (
+        db.query(models.StudentProfile)
+        .filter(models.StudentProfile.user_id == current_user.id)
+        .first()
+    )
+    # release the connection; generating an answer can take a while
+    db.close()
+    if profile is None:
+        return None
+    return AskProfile(
+        state=_clean(profile.state),
+        class_level=_clean(profile.class_level),
+        stream_interest=_clean(profile.stream_interest),
+    )
+
+
+def _sources(generation: Generation) -> List[AskSource]:
+    return [
+        AskSource(
+            kind=hit.document.kind,
+            id=hit.document.record_id,
+            title=hit.document.title,
+            score=hit.score,
         )
-    else:
-        text = (
-            "This is a demo AI assistant. In the next phase, it will use real data "
-            "from your profile, colleges, exams, and scholarships."
+        for hit in generation.sources
+    ]
+
+
+async def _start(question: str, profile: AskProfile | None) -> Generation:
+    try:
+        return await assistant.ask(question.strip(), profile)
+    except Overloaded as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Assistant is busy, please try again shortly",
+            headers={"Retry-After": str(exc.retry_after)},
         )
 
-    return AskResponse(answer=text)
+
+@router.post("/ask", response_model=AskResponse, dependencies=[limit_concurrency("ai")])
+@query_budget(7)
+async def ask_gyandarshak(
+    payload: AskRequest,
+    profile: AskProfile | None = Depends(get_ask_profile),
+) -> AskResponse:
+    """
+    Answer from Gyandarshak's own data: the question is matched against
+    exams, scholarships, colleges and courses, and the configured model
+    answers from the best matches, which are returned as sources.
+    Logged-in students get records from their own state and stream first.
+    """
+    generation = await _start(payload.question, profile)
+    try:
+        answer = await generation.text()
+    except Exception:
+        raise HTTPException(status_code=502, detail="Assistant could not answer")
+    return AskResponse(answer=answer, sources=_sources(generation))
+
+
+def _event(data, event: str | None = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/ask/stream", dependencies=[limit_concurrency("ai")])
+@query_budget(7)
+async def ask_gyandarshak_stream(
+    payload: AskRequest,
+    profile: AskProfile | None = Depends(get_ask_profile),
+):
+    """
+    Same as /ask, streamed as server-sent events: a `sources` event, then one
+    `data: {"text": ...}` event per token, then `done` (or `error`).
+    """
+    generation = await _start(payload.question, profile)
+
+    async def events():
+        yield _event([s.model_dump() for s in _sources(generation)], event="sources")
+        try:
+            async for token in generation.astream():
+                yield _event({"text": token})
+        except Exception:
+            yield _event({"detail": "Assistant could not answer"}, event="error")
+            return
+        yield _event({}, event="done")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/stats", response_model=AskStatsOut)
+@query_budget(1)
+def ask_stats(admin_user: models.User = Depends(get_current_admin)):
+    cache, limiter = assistant.cache, assistant.limiter
+    return AskStatsOut(
+        cache_entries=len(cache),
+        cache_hits=cache.stats.hits,
+        cache_misses=cache.stats.misses,
+        cache_hit_rate=cache.stats.hit_rate,
+        cache_evictions=cache.stats.evictions,
+        cache_invalidations=cache.stats.invalidations,
+        generations=assistant.generations,
+        coalesced=assistant.coalesced,
+        active_generations=limiter.active,
+        waiting_generations=limiter.waiting,
+        rejected=limiter.rejected,
+    )
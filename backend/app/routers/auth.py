@@ -5,12 +5,15 @@ from sqlalchemy.orm import Session
 from app import models
 from app.schemas import UserCreate, UserOut, Token
 from app.deps import get_db
+from app.limits import limit_concurrency
+from app.query_budget import query_budget
 from app.security import hash_password, verify_password, create_access_token
 
 router = APIRouter()
 
 
-@router.post("/register", response_model=UserOut)
+@router.post("/register", response_model=UserOut, dependencies=[limit_concurrency("auth")])
+@query_budget(5)
 def register_user(payload: UserCreate, db: Session = Depends(get_db)) -> UserOut:
     existing = (
         db.query(models.User)
@@ -39,7 +42,8 @@ def register_user(payload: UserCreate, db: Session = Depends(get_db)) -> UserOut
     return user
 
 
-@router.post("/login", response_model=Token)
+@router.post("/login", response_model=Token, dependencies=[limit_concurrency("auth")])
+@query_budget(1)
 def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db),
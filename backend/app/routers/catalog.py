@@ -0,0 +1,66 @@
+"""
+The public catalog as pre-built static files (see app.snapshots).
+
+    GET /catalog/en                      -> current English snapshot, revalidated via ETag
+    GET /catalog/en/<digest>.json        -> that exact snapshot, cacheable forever
+
+Both answer from a file on disk, pre-compressed when the client accepts
+gzip/brotli; the database is only touched if no snapshot was built yet.
+"""
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.compression import choose_encoding
+from app.query_budget import query_budget
+from app.snapshots import LANGUAGES, Snapshot, snapshot_store
+
+router = APIRouter()
+
+CURRENT_CACHE_CONTROL = "public, no-cache"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+_SUFFIXES = {"gzip": ".gz", "br": ".br"}
+
+
+def _serve(request: Request, snapshot: Snapshot, cache_control: str) -> Response:
+    headers = {
+        "ETag": f'"{snapshot.digest}"',
+        "Cache-Control": cache_control,
+        "Content-Location": f"/catalog/{snapshot.language}/{snapshot.digest}.json",
+        "Vary": "Accept-Encoding",
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    name = snapshot.name
+    encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+    if encoding in snapshot.encodings:
+        name += _SUFFIXES[encoding]
+        headers["Content-Encoding"] = encoding
+    return FileResponse(snapshot_store.path(name), media_type="application/json", headers=headers)
+
+
+def _check_language(lang: str) -> None:
+    if lang not in LANGUAGES:
+        raise HTTPException(status_code=404, detail="Unknown language")
+
+
+@router.get("/{lang}")
+@query_budget(4)
+async def current_catalog(lang: str, request: Request) -> Response:
+    _check_language(lang)
+    snapshot = snapshot_store.current(lang)
+    if snapshot is None:
+        # first request before the background build finished
+        snapshot = (await run_in_threadpool(snapshot_store.build))[lang]
+    return _serve(request, snapshot, CURRENT_CACHE_CONTROL)
+
+
+@router.get("/{lang}/{digest}.json")
+@query_budget(0)
+async def catalog_by_digest(lang: str, digest: str, request: Request) -> Response:
+    _check_language(lang)
+    snapshot = snapshot_store.find(lang, digest)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    return _serve(request, snapshot, IMMUTABLE_CACHE_CONTROL)
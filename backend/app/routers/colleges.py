@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, Query , status
+from fastapi import APIRouter, Depends, HTTPException, Query , Response, status
+from sqlalchemy import insert
 from sqlalchemy.orm import Session, joinedload
 
 from app.deps import get_db
+from app.limits import limit_concurrency
+from app.query_budget import query_budget
+from app.cache import CATALOG
+from app.responses import cached_response, trusted_response
 from app.security import get_current_user , get_current_admin
 from app import models
-from app.schemas import CollegeCreate, CollegeOut
+from app.catalog_events import catalog_changed
+from app.recommend import recommender
+from app.schemas import CollegeCreate, CollegeOut, CourseRecommendation, RecommendationsOut
 
 router = APIRouter()
 
@@ -15,6 +22,8 @@ def ensure_admin(user: models.User) -> None:
 
 
 @router.post("/", response_model=CollegeOut)
+# +1: the search index reloads the record after the commit
+@query_budget(7)
 def create_college(
     payload: CollegeCreate,
     db: Session = Depends(get_db),
@@ -34,32 +43,38 @@ def create_college(
     db.flush()  # ensure college.id is available
 
     if payload.courses:
-        for c in payload.courses:
-            course = models.Course(
-                college_id=college.id,
-                name=c.name,
-                level=c.level,
-                duration_years=c.duration_years,
-                approx_fee_total=c.approx_fee_total,
-                stream=c.stream,
-                entrance_exam=c.entrance_exam,
-                discount_available=c.discount_available or False,
-                discount_details=c.discount_details,
-            )
-            db.add(course)
+        db.execute(
+            insert(models.Course),
+            [
+                {
+                    "college_id": college.id,
+                    "name": c.name,
+                    "level": c.level,
+                    "duration_years": c.duration_years,
+                    "approx_fee_total": c.approx_fee_total,
+                    "stream": c.stream,
+                    "entrance_exam": c.entrance_exam,
+                    "discount_available": c.discount_available or False,
+                    "discount_details": c.discount_details,
+                }
+                for c in payload.courses
+            ],
+        )
 
+    catalog_changed(db, "college", college.id)
     db.commit()
     db.refresh(college)
     return college
 
 
-@router.get("/", response_model=list[CollegeOut])
+@router.get("/", response_model=list[CollegeOut], dependencies=[limit_concurrency("catalog")])
+@query_budget(1)
 def list_colleges(
     state: str | None = Query(default=None),
     city: str | None = Query(default=None),
     stream: str | None = Query(default=None),
     db: Session = Depends(get_db),
-) -> list[CollegeOut]:
+) -> Response:
     query = db.query(models.College).options(joinedload(models.College.courses))
 
     if state:
@@ -72,18 +87,78 @@ def list_colleges(
             .filter(models.Course.stream.ilike(f"%{stream}%"))
         )
 
-    return query.all()
+    return cached_response(
+        CATALOG, ("colleges", state, city, stream), lambda: trusted_response(CollegeOut, query.all())
+    )
+
+
+@router.get("/recommended", response_model=RecommendationsOut)
+@query_budget(4)
+def recommended_courses(
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> RecommendationsOut:
+    profile = (
+        db.query(models.StudentProfile)
+        .filter(models.StudentProfile.user_id == current_user.id)
+        .first()
+    )
+    if not profile:
+        raise HTTPException(status_code=400, detail="Student profile not found")
+
+    ranked = recommender.recommend(profile)
+    if ranked is None:
+        # this worker is still building its index (see app.recommend)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Recommendations are warming up, please try again shortly",
+            headers={"Retry-After": "5"},
+        )
+    page = ranked[offset:offset + limit]
+    scores = dict(page)
+    rows = (
+        db.query(
+            models.Course.id, models.Course.name, models.Course.level, models.Course.stream,
+            models.Course.approx_fee_total, models.Course.entrance_exam, models.Course.discount_available,
+            models.Course.discount_details, models.College.id, models.College.name, models.College.city,
+            models.College.state, models.College.is_partner,
+        )
+        .join(models.College, models.College.id == models.Course.college_id)
+        .filter(models.Course.id.in_(scores))
+        .all()
+    ) if page else []
+    by_id = {
+        row[0]: CourseRecommendation(
+            course_id=row[0], course_name=row[1], level=row[2], stream=row[3], approx_fee_total=row[4],
+            entrance_exam=row[5], discount_available=bool(row[6]), discount_details=row[7],
+            college_id=row[8], college_name=row[9], city=row[10], state=row[11],
+            is_partner=bool(row[12]), score=scores[row[0]],
+        )
+        for row in rows
+    }
+    return RecommendationsOut(
+        total=len(ranked),
+        offset=offset,
+        # a course deleted since the ranking was cached is simply left out
+        items=[by_id[course_id] for course_id, _ in page if course_id in by_id],
+        next_offset=offset + limit if offset + limit < len(ranked) else None,
+    )
 
 
 @router.delete("/{college_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(5)
 def delete_college(
     college_id: int,
     db: Session = Depends(get_db),
     admin_user: models.User = Depends(get_current_admin),
 ):
-    college = db.query(models.College).filter(models.College.id == college_id).first()
-    if not college:
+    if not db.query(models.College.id).filter(models.College.id == college_id).first():
         raise HTTPException(status_code=404, detail="College not found")
-    db.delete(college)
+    # set-based, children first: nothing is loaded into the session
+    db.query(models.Course).filter(models.Course.college_id == college_id).delete(synchronize_session=False)
+    db.query(models.College).filter(models.College.id == college_id).delete(synchronize_session=False)
+    catalog_changed(db, "college", college_id, deleted=True)
     db.commit()
     return None
\ No newline at end of file
@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, Query , status
+from fastapi import APIRouter, Depends, HTTPException, Query , Response, status
+from sqlalchemy import insert
 from sqlalchemy.orm import Session, joinedload
 
 from app.deps import get_db
+from app.limits import limit_concurrency
+from app.query_budget import query_budget
+from app.cache import CATALOG
+from app.responses import cached_response, trusted_response
 from app.security import get_current_user , get_current_admin
 from app import models
+from app.catalog_events import catalog_changed
 from app.schemas import ExamCreate, ExamOut
 
 router = APIRouter()
@@ -15,6 +21,8 @@ def ensure_admin(user: models.User) -> None:
 
 
 @router.post("/", response_model=ExamOut)
+# +1: the search index reloads the record after the commit
+@query_budget(7)
 def create_exam(
     payload: ExamCreate,
     db: Session = Depends(get_db),
@@ -34,28 +42,28 @@ def create_exam(
     db.flush()  # exam.id available
 
     if payload.dates:
-        for d in payload.dates:
-            db.add(
-                models.ExamDate(
-                    exam_id=exam.id,
-                    year=d.year,
-                    event_type=d.event_type,
-                    date=d.date,
-                )
-            )
+        db.execute(
+            insert(models.ExamDate),
+            [
+                {"exam_id": exam.id, "year": d.year, "event_type": d.event_type, "date": d.date}
+                for d in payload.dates
+            ],
+        )
 
+    catalog_changed(db, "exam", exam.id)
     db.commit()
     db.refresh(exam)
     return exam
 
 
-@router.get("/", response_model=list[ExamOut])
+@router.get("/", response_model=list[ExamOut], dependencies=[limit_concurrency("catalog")])
+@query_budget(1)
 def list_exams(
     year: int | None = Query(default=None),
     stream: str | None = Query(default=None),
     level: str | None = Query(default=None),
     db: Session = Depends(get_db),
-) -> list[ExamOut]:
+) -> Response:
     query = db.query(models.Exam).options(joinedload(models.Exam.dates))
 
     if stream:
@@ -68,18 +76,23 @@ def list_exams(
             .filter(models.ExamDate.year == year)
         )
 
-    return query.all()
+    return cached_response(
+        CATALOG, ("exams", stream, level, year), lambda: trusted_response(ExamOut, query.all())
+    )
 
 
 @router.delete("/{exam_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(5)
 def delete_exam(
     exam_id: int,
     db: Session = Depends(get_db),
     admin_user: models.User = Depends(get_current_admin),
 ):
-    exam = db.query(models.Exam).filter(models.Exam.id == exam_id).first()
-    if not exam:
+    if not db.query(models.Exam.id).filter(models.Exam.id == exam_id).first():
         raise HTTPException(status_code=404, detail="Exam not found")
-    db.delete(exam)
+    # set-based, children first: nothing is loaded into the session
+    db.query(models.ExamDate).filter(models.ExamDate.exam_id == exam_id).delete(synchronize_session=False)
+    db.query(models.Exam).filter(models.Exam.id == exam_id).delete(synchronize_session=False)
+    catalog_changed(db, "exam", exam_id, deleted=True)
     db.commit()
     return None
\ No newline at end of file
@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, Query , status
+from fastapi import APIRouter, Depends, HTTPException, Query , Response, status
 from sqlalchemy.orm import Session
 
 from app.deps import get_db
+from app.limits import limit_concurrency
+from app.query_budget import query_budget
+from app.cache import CATALOG
+from app.responses import cached_response, trusted_response
 from app.security import get_current_user , get_current_admin
 from app import models
+from app.catalog_events import catalog_changed
 from app.schemas import ScholarshipCreate, ScholarshipOut
 
 router = APIRouter()
@@ -15,6 +20,8 @@ def ensure_admin(user: models.User) -> None:
 
 
 @router.post("/", response_model=ScholarshipOut)
+# +1: the search index reloads the record after the commit
+@query_budget(5)
 def create_scholarship(
     payload: ScholarshipCreate,
     db: Session = Depends(get_db),
@@ -36,18 +43,21 @@ def create_scholarship(
         last_date=payload.last_date,
     )
     db.add(sch)
+    db.flush()  # sch.id available
+    catalog_changed(db, "scholarship", sch.id)
     db.commit()
     db.refresh(sch)
     return sch
 
 
-@router.get("/", response_model=list[ScholarshipOut])
+@router.get("/", response_model=list[ScholarshipOut], dependencies=[limit_concurrency("catalog")])
+@query_budget(1)
 def list_scholarships(
     level: str | None = Query(default=None),
     state: str | None = Query(default=None),
     provider_type: str | None = Query(default=None),
     db: Session = Depends(get_db),
-) -> list[ScholarshipOut]:
+) -> Response:
     query = db.query(models.Scholarship)
 
     if level:
@@ -59,28 +69,32 @@ def list_scholarships(
             models.Scholarship.provider_type.ilike(f"%{provider_type}%")
         )
 
-    return (
-        query.order_by(
-            models.Scholarship.last_date.is_(None),
-            models.Scholarship.last_date,
-        ).all()
+    query = query.order_by(
+        models.Scholarship.last_date.is_(None),
+        models.Scholarship.last_date,
+    )
+    return cached_response(
+        CATALOG,
+        ("scholarships", level, state, provider_type),
+        lambda: trusted_response(ScholarshipOut, query.all()),
     )
 
 
 
 @router.delete("/{scholarship_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(5)
 def delete_scholarship(
     scholarship_id: int,
     db: Session = Depends(get_db),
     admin_user: models.User = Depends(get_current_admin),
 ):
-    s = (
-        db.query(models.Scholarship)
-        .filter(models.Scholarship.id == scholarship_id)
-        .first()
-    )
-    if not s:
+    if not db.query(models.Scholarship.id).filter(models.Scholarship.id == scholarship_id).first():
         raise HTTPException(status_code=404, detail="Scholarship not found")
-    db.delete(s)
+    # set-based, children first: nothing is loaded into the session
+    db.query(models.StudentScholarshipStatus).filter(
+        models.StudentScholarshipStatus.scholarship_id == scholarship_id
+    ).delete(synchronize_session=False)
+    db.query(models.Scholarship).filter(models.Scholarship.id == scholarship_id).delete(synchronize_session=False)
+    catalog_changed(db, "scholarship", scholarship_id, deleted=True)
     db.commit()
     return None
\ No newline at end of file
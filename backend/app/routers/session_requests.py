@@ -1,12 +1,32 @@
 from datetime import date
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.deps import get_db
+from app.query_budget import query_budget
 from app.security import get_current_user
 from app import models
-from app.schemas import SessionRequestCreate, SessionRequestOut
+from app.pagination import before_cursor, trim_page
+from app.scheduling import (
+    TIME_BANDS,
+    allocate_day,
+    assign_slot,
+    booked_counts,
+    day_slots,
+    lock_day,
+    normalize_band,
+)
+from app.schemas import (
+    CounsellingSlotIn,
+    CounsellingSlotOut,
+    SessionAllocationOut,
+    SessionQueueSummary,
+    SessionRequestAdminOut,
+    SessionRequestCreate,
+    SessionRequestOut,
+)
 
 router = APIRouter()
 
@@ -17,6 +37,7 @@ def ensure_admin(user: models.User) -> None:
 
 
 @router.post("/", response_model=SessionRequestOut)
+@query_budget(4)
 def create_request(
     payload: SessionRequestCreate,
     db: Session = Depends(get_db),
@@ -48,6 +69,7 @@ def create_request(
 
 
 @router.get("/mine", response_model=list[SessionRequestOut])
+@query_budget(3)
 def my_requests(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
@@ -68,20 +90,102 @@ def my_requests(
     )
 
 
-@router.get("/", response_model=list[SessionRequestOut])
+ADMIN_QUEUE_PAGE_SIZE = 100
+
+
+def _filtered_requests(
+    query,
+    status: str | None,
+    mode: str | None,
+    date_from: date | None,
+    date_to: date | None,
+):
+    if status:
+        query = query.filter(models.SessionRequest.status == status)
+    if mode:
+        query = query.filter(models.SessionRequest.mode == mode)
+    if date_from:
+        query = query.filter(models.SessionRequest.preferred_date >= date_from)
+    if date_to:
+        query = query.filter(models.SessionRequest.preferred_date <= date_to)
+    return query
+
+
+@router.get("/", response_model=list[SessionRequestAdminOut])
+@query_budget(2)
 def list_all_requests(
+    response: Response,
+    status: str | None = Query(default=None),
+    mode: str | None = Query(default=None),
+    date_from: date | None = Query(default=None),
+    date_to: date | None = Query(default=None),
+    limit: int = Query(default=ADMIN_QUEUE_PAGE_SIZE, ge=1, le=1000),
+    cursor: str | None = Query(default=None),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
-) -> list[SessionRequestOut]:
+) -> list[SessionRequestAdminOut]:
+    """
+    Admin queue, newest first, filtered by status / mode / preferred date
+    range. More pages are signalled through the X-Next-Cursor header.
+    """
     ensure_admin(current_user)
-    return (
-        db.query(models.SessionRequest)
-        .order_by(models.SessionRequest.created_at.desc())
-        .all()
+
+    query = _filtered_requests(
+        db.query(models.SessionRequest, models.User.full_name)
+        .join(
+            models.StudentProfile,
+            models.StudentProfile.id == models.SessionRequest.student_id,
+        )
+        .join(models.User, models.User.id == models.StudentProfile.user_id),
+        status,
+        mode,
+        date_from,
+        date_to,
     )
+    if cursor:
+        query = query.filter(
+            before_cursor(models.SessionRequest.created_at, models.SessionRequest.id, cursor)
+        )
+    rows = query.order_by(
+        models.SessionRequest.created_at.desc(),
+        models.SessionRequest.id.desc(),
+    ).limit(limit + 1).all()
+
+    page = trim_page([req for req, _ in rows], limit, response, "created_at")
+    names = {req.id: name for req, name in rows}
+    return [
+        SessionRequestAdminOut.model_validate(req).model_copy(
+            update={"student_id": req.student_id, "student_name": names[req.id]}
+        )
+        for req in page
+    ]
+
+
+@router.get("/summary", response_model=SessionQueueSummary)
+@query_budget(2)
+def requests_summary(
+    mode: str | None = Query(default=None),
+    date_from: date | None = Query(default=None),
+    date_to: date | None = Query(default=None),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> SessionQueueSummary:
+    """Request counts per status for the same filters as the queue."""
+    ensure_admin(current_user)
+
+    query = _filtered_requests(
+        db.query(models.SessionRequest.status, func.count(models.SessionRequest.id)),
+        None,
+        mode,
+        date_from,
+        date_to,
+    )
+    counts = dict(query.group_by(models.SessionRequest.status).all())
+    return SessionQueueSummary(total=sum(counts.values()), by_status=counts)
 
 
 @router.post("/{request_id}/status", response_model=SessionRequestOut)
+@query_budget(6)
 def update_status(
     request_id: int,
     status: str,
@@ -101,7 +205,90 @@ def update_status(
     if status not in {"pending", "approved", "rejected", "done"}:
         raise HTTPException(status_code=400, detail="Invalid status")
 
-    req.status = status
+    if status in {"approved", "done"} and req.slot_id is None:
+        if not assign_slot(db, req, status):
+            db.rollback()
+            raise HTTPException(status_code=409, detail="No counselling slot left for that date")
+    else:
+        if status in {"pending", "rejected"}:
+            req.slot_id = None
+        req.status = status
     db.commit()
     db.refresh(req)
     return req
+
+
+# ---- Counselling slots ----
+
+def _slot_out(db: Session, day: date) -> list[CounsellingSlotOut]:
+    slots = day_slots(db, day)
+    booked = booked_counts(db, day)
+    return [
+        CounsellingSlotOut(
+            id=slot.id,
+            date=slot.date,
+            time_band=slot.time_band,
+            capacity=slot.capacity,
+            booked=booked.get(slot.id, 0),
+        )
+        for slot in (slots[band] for band in TIME_BANDS)
+    ]
+
+
+@router.get("/slots", response_model=list[CounsellingSlotOut])
+@query_budget(3)
+def list_slots(
+    day: date,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> list[CounsellingSlotOut]:
+    ensure_admin(current_user)
+    # days nobody booked yet show default slots without an id
+    return _slot_out(db, day)
+
+
+@router.put("/slots", response_model=list[CounsellingSlotOut])
+@query_budget(6)
+def set_slot_capacity(
+    payload: CounsellingSlotIn,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> list[CounsellingSlotOut]:
+    ensure_admin(current_user)
+
+    band = normalize_band(payload.time_band)
+    if band is None:
+        raise HTTPException(status_code=400, detail="Invalid time band")
+    if payload.capacity < 0:
+        raise HTTPException(status_code=400, detail="Capacity must not be negative")
+
+    slots = lock_day(db, payload.date)
+    slots[band].capacity = payload.capacity
+    db.commit()
+    return _slot_out(db, payload.date)
+
+
+@router.post("/allocate", response_model=SessionAllocationOut)
+@query_budget(8)
+def allocate_requests(
+    day: date,
+    allow_other_bands: bool = Query(default=False),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> SessionAllocationOut:
+    """
+    Approve a day's pending requests into counselling slots in one
+    transaction, first-come by request time. Requests that don't fit stay
+    pending. With `allow_other_bands`, a full preferred band spills over
+    into other bands of the same day.
+    """
+    ensure_admin(current_user)
+
+    allocation = allocate_day(db, day, allow_other_bands=allow_other_bands)
+    db.commit()
+    return SessionAllocationOut(
+        date=day,
+        approved=allocation.approved,
+        still_pending=allocation.still_pending,
+        slots=_slot_out(db, day),
+    )
@@ -1,20 +1,54 @@
-from fastapi import APIRouter, Depends, HTTPException
+import csv
+import hashlib
+import io
+import math
+from datetime import date
+
+from fastapi import APIRouter, Depends, File, HTTPException, Request, Response, UploadFile, status
+from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 
 from app.deps import get_db
-from app.security import get_current_user
+from app.limits import limit_concurrency
+from app.onboarding import ONBOARD_CHUNK_ROWS, InvalidImportFile, import_students
+from app.query_budget import query_budget
+from app.security import get_current_admin, get_current_user
 from app import models
-from app.schemas import StudentWithUser, StudentProfileOut, StudentProfileUpdate
+from app.archive import union_attempts
+from app.cache import CATALOG, cache
+from app.responses import trusted_encoder
+from app.schemas import (
+    AttemptSummary,
+    ScholarshipOut,
+    SessionRequestOut,
+    StudentDashboardOut,
+    StudentImportOut,
+    StudentWithUser,
+    StudentProfileOut,
+    StudentProfileUpdate,
+    UpcomingExamDate,
+)
 
 router = APIRouter()
 
+DASHBOARD_RECENT_ATTEMPTS = 5
+DASHBOARD_UPCOMING_DATES = 10
+DASHBOARD_OPEN_SCHOLARSHIPS = 10
+# the browser may reuse the dashboard briefly (back/forward, tab switches);
+# after that it revalidates with If-None-Match
+DASHBOARD_CACHE_CONTROL = "private, max-age=30"
+# larger files go through scripts_import_students.py
+STUDENT_IMPORT_MAX_ROWS = 2000
+
 
 @router.get("/ping")
+@query_budget(0)
 def students_ping():
     return {"message": "students ok"}
 
 
 @router.get("/me", response_model=StudentWithUser)
+@query_budget(2)
 def get_my_profile(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
@@ -35,7 +69,133 @@ def get_my_profile(
     }
 
 
+def _upcoming_exam_dates(db: Session, stream: str | None, today: date) -> list[dict]:
+    query = (
+        db.query(models.ExamDate.exam_id, models.Exam.name, models.ExamDate.event_type, models.ExamDate.date)
+        .join(models.Exam, models.Exam.id == models.ExamDate.exam_id)
+        .filter(models.ExamDate.date >= today)
+    )
+    if stream:
+        query = query.filter(models.Exam.stream.ilike(f"%{stream}%"))
+    rows = query.order_by(models.ExamDate.date, models.ExamDate.id).limit(DASHBOARD_UPCOMING_DATES).all()
+    return [
+        {"exam_id": exam_id, "exam_name": name, "event_type": event_type, "date": day}
+        for exam_id, name, event_type, day in rows
+    ]
+
+
+def _open_scholarships(db: Session, state: str | None, today: date) -> list[dict]:
+    query = db.query(models.Scholarship).filter(
+        or_(models.Scholarship.last_date.is_(None), models.Scholarship.last_date >= today)
+    )
+    if state:
+        # national schemes (no state) apply everywhere
+        query = query.filter(
+            or_(models.Scholarship.state.is_(None), models.Scholarship.state.ilike(f"%{state}%"))
+        )
+    rows = (
+        query.order_by(models.Scholarship.last_date.is_(None), models.Scholarship.last_date, models.Scholarship.id)
+        .limit(DASHBOARD_OPEN_SCHOLARSHIPS)
+        .all()
+    )
+    encode = trusted_encoder(ScholarshipOut)
+    return [encode(row) for row in rows]
+
+
+@router.get("/me/dashboard", response_model=StudentDashboardOut)
+@query_budget(6)
+def get_my_dashboard(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> Response:
+    """Everything the home screen shows after login, in one response."""
+    profile = (
+        db.query(models.StudentProfile)
+        .filter(models.StudentProfile.user_id == current_user.id)
+        .first()
+    )
+    if not profile:
+        raise HTTPException(status_code=400, detail="Student profile not found")
+
+    def mine(attempts):
+        return (
+            select(
+                attempts.id,
+                models.Test.id.label("test_id"),
+                models.Test.title,
+                attempts.score,
+                models.Test.total_marks,
+                attempts.started_at,
+                attempts.finished_at,
+            )
+            .join(models.Test, models.Test.id == attempts.test_id)
+            .where(attempts.student_id == profile.id)
+        )
+
+    recent = union_attempts(mine)
+    attempts = db.execute(
+        recent.order_by(recent.selected_columns.started_at.desc()).limit(DASHBOARD_RECENT_ATTEMPTS)
+    ).all()
+    pending = (
+        db.query(models.SessionRequest)
+        .filter(
+            models.SessionRequest.student_id == profile.id,
+            models.SessionRequest.status == "pending",
+        )
+        .order_by(models.SessionRequest.created_at.desc())
+        .all()
+    )
+
+    # catalog parts depend only on the profile's stream/state, so students share them
+    today = date.today()
+    upcoming = cache.get_or_set(
+        CATALOG, repr(("dashboard-exam-dates", profile.stream_interest, today)),
+        lambda: _upcoming_exam_dates(db, profile.stream_interest, today),
+    )
+    scholarships = cache.get_or_set(
+        CATALOG, repr(("dashboard-scholarships", profile.state, today)),
+        lambda: _open_scholarships(db, profile.state, today),
+    )
+
+    dashboard = StudentDashboardOut(
+        user=StudentWithUser(
+            id=current_user.id,
+            full_name=current_user.full_name,
+            email=current_user.email,
+            phone=current_user.phone,
+            role=current_user.role,
+            profile=StudentProfileOut.model_validate(profile),
+        ),
+        recent_attempts=[
+            AttemptSummary(
+                attempt_id=attempt_id,
+                test_id=test_id,
+                test_title=title,
+                score=score,
+                total_marks=total_marks,
+                started_at=started_at,
+                finished_at=finished_at,
+            )
+            for attempt_id, test_id, title, score, total_marks, started_at, finished_at in attempts
+        ],
+        pending_sessions=[SessionRequestOut.model_validate(req) for req in pending],
+        upcoming_exam_dates=[UpcomingExamDate(**row) for row in upcoming],
+        open_scholarships=[ScholarshipOut(**row) for row in scholarships],
+    )
+
+    body = dashboard.model_dump_json().encode()
+    headers = {
+        "ETag": f'"{hashlib.sha1(body).hexdigest()}"',
+        "Cache-Control": DASHBOARD_CACHE_CONTROL,
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.patch("/me", response_model=StudentWithUser)
+@query_budget(5)
 def update_my_profile(
     payload: StudentProfileUpdate,
     db: Session = Depends(get_db),
@@ -71,3 +231,32 @@ def update_my_profile(
         "role": current_user.role,
         "profile": profile,
     }
+
+
+@router.post("/import", response_model=StudentImportOut, dependencies=[limit_concurrency("import")])
+# the admin, then (lookup, users, user ids, profiles) per chunk
+@query_budget(1 + 4 * math.ceil(STUDENT_IMPORT_MAX_ROWS / ONBOARD_CHUNK_ROWS))
+def import_students_csv(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    admin_user: models.User = Depends(get_current_admin),
+) -> StudentImportOut:
+    """Register the students in an uploaded CSV; see app.onboarding for the columns."""
+    text = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        rows = sum(1 for _ in csv.reader(text)) - 1
+        if rows > STUDENT_IMPORT_MAX_ROWS:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"At most {STUDENT_IMPORT_MAX_ROWS} students per upload",
+            )
+        text.seek(0)
+        report = import_students(db, text)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="The CSV file must be UTF-8 encoded")
+    except (InvalidImportFile, csv.Error) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    finally:
+        text.detach()  # the upload closes its own file
+
+    return StudentImportOut(created=report.created, skipped=report.skipped, errors=report.errors)
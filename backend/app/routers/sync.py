@@ -0,0 +1,107 @@
+"""
+Catalog deltas for clients that keep a local copy.
+
+Every admin write to colleges, exams and scholarships appends a
+`CatalogChange` row (see app.catalog_events) with a monotonic `version`.
+A client first calls `/sync/?since=0` for the full catalog, stores the
+returned `version`, and afterwards asks only for what changed since then:
+
+    GET /sync/?since=0        -> full catalog, version 42
+    GET /sync/?since=42       -> upserts and deleted ids after 42
+
+Several changes to the same record inside one page collapse into its
+latest state. When `has_more` is true the page was cut at `limit` changes
+and the client should sync again with the new version.
+"""
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
+
+from app.cache import CATALOG
+from app.deps import get_db
+from app.limits import limit_concurrency
+from app.query_budget import query_budget
+from app.responses import FastJSONResponse, cached_response, trusted_encoder
+from app import models
+from app.schemas import CollegeOut, ExamOut, ScholarshipOut, SyncOut
+
+router = APIRouter()
+
+SYNC_PAGE_SIZE = 500
+
+# kind -> (key in the response, schema, model, eager loads for its children)
+KINDS = {
+    "college": ("colleges", CollegeOut, models.College, (joinedload(models.College.courses),)),
+    "exam": ("exams", ExamOut, models.Exam, (joinedload(models.Exam.dates),)),
+    "scholarship": ("scholarships", ScholarshipOut, models.Scholarship, ()),
+}
+
+
+def _load(db: Session, kind: str, ids: list[int] | None = None) -> list:
+    _, _, model, options = KINDS[kind]
+    query = db.query(model).options(*options)
+    if ids is not None:
+        query = query.filter(model.id.in_(ids))
+    return query.order_by(model.id).all()
+
+
+def _payload(version: int, has_more: bool, full: bool, upserted: dict, deleted: dict) -> FastJSONResponse:
+    content = {"version": version, "has_more": has_more, "full": full}
+    for kind, (key, schema, _, _) in KINDS.items():
+        encode = trusted_encoder(schema)
+        content[key] = {
+            "upserted": [encode(row) for row in upserted.get(kind, [])],
+            "deleted": sorted(deleted.get(kind, [])),
+        }
+    return FastJSONResponse(content)
+
+
+def _snapshot(db: Session) -> FastJSONResponse:
+    version = db.query(func.max(models.CatalogChange.version)).scalar() or 0
+    upserted = {kind: _load(db, kind) for kind in KINDS}
+    return _payload(version, False, True, upserted, {})
+
+
+def _delta(db: Session, since: int, limit: int) -> FastJSONResponse:
+    changes = (
+        db.query(models.CatalogChange.version, models.CatalogChange.kind,
+                 models.CatalogChange.entity_id, models.CatalogChange.deleted)
+        .filter(models.CatalogChange.version > since)
+        .order_by(models.CatalogChange.version)
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    # last write wins within the page
+    latest: dict[tuple[str, int], bool] = {}
+    for _, kind, entity_id, deleted in changes:
+        latest[(kind, entity_id)] = deleted
+
+    upserted: dict[str, list] = {}
+    deleted: dict[str, set[int]] = {}
+    for kind in KINDS:
+        ids = [entity_id for (k, entity_id), gone in latest.items() if k == kind and not gone]
+        deleted[kind] = {entity_id for (k, entity_id), gone in latest.items() if k == kind and gone}
+        if not ids:
+            continue
+        rows = _load(db, kind, ids)
+        upserted[kind] = rows
+        # removed by a later change outside this page: report it gone now
+        deleted[kind] |= set(ids) - {row.id for row in rows}
+
+    version = changes[-1].version if changes else since
+    return _payload(version, has_more, False, upserted, deleted)
+
+
+@router.get("/", response_model=SyncOut, dependencies=[limit_concurrency("catalog")])
+@query_budget(4)
+def sync_catalog(
+    since: int = Query(default=0, ge=0),
+    limit: int = Query(default=SYNC_PAGE_SIZE, ge=1, le=5000),
+    db: Session = Depends(get_db),
+) -> Response:
+    if since == 0:
+        return cached_response(CATALOG, ("sync", 0), lambda: _snapshot(db))
+    return cached_response(CATALOG, ("sync", since, limit), lambda: _delta(db, since, limit))
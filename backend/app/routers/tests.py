@@ -1,23 +1,57 @@
+import csv
+import io
+import math
 from datetime import datetime
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, selectinload
 
+from app.database import SessionLocal
 from app.deps import get_db
+from app.limits import PRIORITY_SUBMISSION, limit_concurrency
+from app.query_budget import query_budget
 from app.security import get_current_user
 from app import models
+from app.archive import attempt_answers, packed_answers, union_attempts
+from app.autosave import autosave_buffer, saved_answers
+from app.grading import grade_attempts, grading_queue
+from app.leaderboard import leaderboard
+from app.pagination import before_cursor, trim_page
+from app.question_bank import (
+    QUESTION_IMPORT_CHUNK_ROWS,
+    InvalidImportFile,
+    QuestionLinker,
+    content_hash,
+    import_questions,
+    read_questions,
+    release_test_questions,
+)
 from app.schemas import (
+    AttemptDetailOut,
+    AttemptSummary,
+    LeaderboardEntry,
+    LeaderboardOut,
+    QuestionImportOut,
+    TestAnswerIn,
+    TestAutosaveOut,
     TestCreate,
     TestOut,
     TestStartResponse,
     TestSubmitRequest,
     TestResultOut,
+    TestSavedAnswersOut,
 )
 
 router = APIRouter()
 
+# larger files go through scripts_import_questions.py
+QUESTION_IMPORT_MAX_ROWS = 5000
+
 
 def ensure_admin(user: models.User) -> None:
     if user.role != models.UserRole.admin:
@@ -27,6 +61,7 @@ def ensure_admin(user: models.User) -> None:
 # ---- Admin endpoints ----
 
 @router.post("/", response_model=TestOut)
+@query_budget(8)
 def create_test(
     payload: TestCreate,
     db: Session = Depends(get_db),
@@ -34,6 +69,13 @@ def create_test(
 ) -> TestOut:
     ensure_admin(current_user)
 
+    # the linker keeps one copy of a repeated question, which would quietly lower total_marks
+    first_item: dict[str, int] = {}
+    for item, question in enumerate(payload.questions, start=1):
+        first = first_item.setdefault(content_hash(question), item)
+        if first != item:
+            raise HTTPException(status_code=400, detail=f"Question {item} is a duplicate of question {first}")
+
     test = models.Test(
         title=payload.title,
         description=payload.description,
@@ -44,39 +86,120 @@ def create_test(
     db.add(test)
     db.flush()  # get test.id
 
-    total_marks = 0
-    for q in payload.questions:
-        question = models.TestQuestion(
-            test_id=test.id,
-            text=q.text,
-            option_a=q.option_a,
-            option_b=q.option_b,
-            option_c=q.option_c,
-            option_d=q.option_d,
-            correct_option=q.correct_option.upper(),
-            marks=q.marks,
-        )
-        total_marks += q.marks
-        db.add(question)
+    # questions already in the bank are linked, not copied; the rest go in with one INSERT
+    QuestionLinker(db, test.id, new_test=True).add(list(enumerate(payload.questions, start=1)))
 
-    test.total_marks = total_marks
     db.commit()
     db.refresh(test)
     return test
 
 
-@router.get("/", response_model=list[TestOut])
+@router.get("/", response_model=list[TestOut], dependencies=[limit_concurrency("catalog")])
+@query_budget(3)
 def list_tests(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ) -> list[TestOut]:
     # both admin and students can see active tests
-    return db.query(models.Test).filter(models.Test.is_active.is_(True)).all()
+    return (
+        db.query(models.Test)
+        .options(selectinload(models.Test.questions))
+        .filter(models.Test.is_active.is_(True))
+        .all()
+    )
+
+
+@router.delete("/{test_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(10)
+def delete_test(
+    test_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Delete a test with its questions, attempts (live and archived), answers
+    and grading jobs as set-based DELETEs, children first, in one transaction. No rows are
+    loaded, however many answers the test has. Questions other tests still
+    use are kept.
+    """
+    ensure_admin(current_user)
+    if not db.query(models.Test.id).filter(models.Test.id == test_id).first():
+        raise HTTPException(status_code=404, detail="Test not found")
+    attempt_ids = select(models.TestAttempt.id).where(models.TestAttempt.test_id == test_id)
+    db.query(models.TestAnswer).filter(
+        models.TestAnswer.attempt_id.in_(attempt_ids)
+    ).delete(synchronize_session=False)
+    db.query(models.GradingJob).filter(
+        models.GradingJob.attempt_id.in_(attempt_ids)
+    ).delete(synchronize_session=False)
+    db.query(models.TestAttempt).filter(
+        models.TestAttempt.test_id == test_id
+    ).delete(synchronize_session=False)
+    db.query(models.ArchivedAttempt).filter(
+        models.ArchivedAttempt.test_id == test_id
+    ).delete(synchronize_session=False)
+    release_test_questions(db, test_id)
+    db.query(models.TestQuestion).filter(
+        models.TestQuestion.test_id == test_id
+    ).delete(synchronize_session=False)
+    db.query(models.Test).filter(models.Test.id == test_id).delete(synchronize_session=False)
+    db.commit()
+    leaderboard.discard(test_id)
+    return None
+
+
+@router.post(
+    "/{test_id}/questions/import",
+    response_model=QuestionImportOut,
+    dependencies=[limit_concurrency("import")],
+)
+# user, test, its links, its marks, then per chunk: hash lookup, questions, links, marks
+@query_budget(4 + 4 * math.ceil(QUESTION_IMPORT_MAX_ROWS / QUESTION_IMPORT_CHUNK_ROWS))
+def import_test_questions(
+    test_id: int,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> QuestionImportOut:
+    """
+    Add the questions in an uploaded CSV or JSON file to a test. Questions
+    already in the bank are linked rather than copied; see app.question_bank.
+    """
+    ensure_admin(current_user)
+    if not db.query(models.Test.id).filter(models.Test.id == test_id).first():
+        raise HTTPException(status_code=404, detail="Test not found")
+
+    text = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        rows = sum(1 for _ in read_questions(text))
+        if rows > QUESTION_IMPORT_MAX_ROWS:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"At most {QUESTION_IMPORT_MAX_ROWS} questions per upload",
+            )
+        text.seek(0)
+        report = import_questions(db, test_id, text)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="The file must be UTF-8 encoded")
+    except (InvalidImportFile, csv.Error) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    finally:
+        text.detach()  # the upload closes its own file
+
+    leaderboard.discard(test_id)
+    return QuestionImportOut(
+        created=report.created,
+        reused=report.reused,
+        skipped=report.skipped,
+        total_marks=report.total_marks,
+        errors=report.errors,
+    )
 
 
 # ---- Student endpoints ----
 
 @router.post("/{test_id}/start", response_model=TestStartResponse)
+@query_budget(7)
 def start_test(
     test_id: int,
     db: Session = Depends(get_db),
@@ -110,13 +233,100 @@ def start_test(
     return TestStartResponse(attempt_id=attempt.id, test=test)
 
 
-@router.post("/attempts/{attempt_id}/submit", response_model=TestResultOut)
+def get_own_open_attempt(
+    db: Session, attempt_id: int, current_user: models.User
+) -> models.TestAttempt:
+    attempt = (
+        db.query(models.TestAttempt)
+        .join(
+            models.StudentProfile,
+            models.StudentProfile.id == models.TestAttempt.student_id,
+        )
+        .filter(
+            models.TestAttempt.id == attempt_id,
+            models.StudentProfile.user_id == current_user.id,
+        )
+        .first()
+    )
+    if not attempt:
+        raise HTTPException(status_code=404, detail="Attempt not found")
+    if attempt.finished_at is not None:
+        raise HTTPException(status_code=400, detail="Attempt already submitted")
+    return attempt
+
+
+@router.put("/attempts/{attempt_id}/autosave", response_model=TestAutosaveOut)
+# user, attempt, question ids, then the write: open check, delete, insert
+@query_budget(6)
+def autosave_answers(
+    attempt_id: int,
+    payload: TestSubmitRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> TestAutosaveOut:
+    """
+    Save in-progress answers.
+
+    By default every save is written to test_answers before the response
+    is sent. Only with GYANDARSHAK_AUTOSAVE_WRITE_BEHIND=1, on a single
+    worker, are they kept in memory, written in batches by the autosave
+    flusher and picked up again on submit; see app.autosave.
+    """
+    attempt = get_own_open_attempt(db, attempt_id, current_user)
+
+    question_ids = {
+        qid
+        for (qid,) in db.query(models.TestQuestionLink.question_id).filter(
+            models.TestQuestionLink.test_id == attempt.test_id
+        )
+    }
+    answers = {
+        a.question_id: a.selected_option.upper()
+        for a in payload.answers
+        if a.question_id in question_ids
+    }
+    pending = autosave_buffer.put(attempt.id, answers)
+    return TestAutosaveOut(attempt_id=attempt.id, pending_answers=pending)
+
+
+@router.get("/attempts/{attempt_id}/answers", response_model=TestSavedAnswersOut)
+@query_budget(3)
+def get_saved_answers(
+    attempt_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> TestSavedAnswersOut:
+    """Autosaved answers, so a client can resume after losing connectivity."""
+    attempt = get_own_open_attempt(db, attempt_id, current_user)
+    answers = saved_answers(db, attempt.id)
+    return TestSavedAnswersOut(
+        attempt_id=attempt.id,
+        answers=[
+            TestAnswerIn(question_id=qid, selected_option=opt)
+            for qid, opt in sorted(answers.items())
+        ],
+    )
+
+
+@router.post(
+    "/attempts/{attempt_id}/submit",
+    response_model=TestResultOut,
+    dependencies=[limit_concurrency("submit", PRIORITY_SUBMISSION)],
+)
+@query_budget(15)
 def submit_test(
     attempt_id: int,
     payload: TestSubmitRequest,
+    queued: bool = Query(default=False),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ) -> TestResultOut:
+    """
+    Grade and store an attempt. With `queued=true` the submission is only
+    recorded and graded in the background; poll
+    `/tests/attempts/{attempt_id}/result` for the score. Without a running
+    grading pool a queued submission is graded inline.
+    """
     attempt = (
         db.query(models.TestAttempt)
         .filter(models.TestAttempt.id == attempt_id)
@@ -142,55 +352,198 @@ def submit_test(
     if not test:
         raise HTTPException(status_code=404, detail="Test not found")
 
-    # clear previous answers if any
-    db.query(models.TestAnswer).filter(
-        models.TestAnswer.attempt_id == attempt.id
-    ).delete()
-
-    # score
-    questions_by_id = {q.id: q for q in test.questions}
-    score = 0
-
-    for ans in payload.answers:
-        q = questions_by_id.get(ans.question_id)
-        if not q:
-            continue
-        selected = ans.selected_option.upper()
-        db.add(
-            models.TestAnswer(
+    # final answers: autosaved ones (buffered or flushed), overridden by the payload
+    buffered = autosave_buffer.take(attempt.id)
+    overrides = {**buffered, **{a.question_id: a.selected_option for a in payload.answers}}
+
+    try:
+        if queued and grading_queue.running:
+            result = TestResultOut(
                 attempt_id=attempt.id,
-                question_id=q.id,
-                selected_option=selected,
+                status="pending",
+                total_marks=test.total_marks,
             )
+            # hand the pooled connection back before waiting on the group commit
+            db.close()
+            grading_queue.enqueue(attempt.id, overrides)
+            return result
+
+        scores = grade_attempts(
+            db, {attempt.id: overrides}, finished_at={attempt.id: datetime.utcnow()}
         )
-        if selected == q.correct_option:
-            score += q.marks
+        score = scores[attempt.id]
+        db.commit()
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Attempt not found")
+    except Exception as exc:
+        # not recorded: keep the autosaves for a retry
+        db.rollback()
+        autosave_buffer.give_back(attempt.id, buffered)
+        if isinstance(exc, (TimeoutError, RuntimeError, SQLAlchemyError)):
+            # e.g. "database is locked" in a deadline burst
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Grading is busy, please submit again",
+                headers={"Retry-After": "5"},
+            )
+        raise
 
-    attempt.score = score
-    attempt.finished_at = datetime.utcnow()
-    db.commit()
-    db.refresh(attempt)
+    leaderboard.record(db, test.id, student.id, score)
+    rank = leaderboard.rank_of(db, test.id, student.id)
 
     return TestResultOut(
         attempt_id=attempt.id,
         score=score,
         total_marks=test.total_marks,
+        rank=rank.rank if rank else None,
+        percentile=rank.percentile if rank else None,
     )
 
 
-# ---- Attempt summaries ----
+def _own_finished_attempt(db: Session, attempt_id: int, user_id: int):
+    """The user's attempt, live or archived, with its test; 404 / 400 if not found or still open."""
+
+    def own(attempts):
+        return (
+            select(
+                attempts.id,
+                attempts.test_id,
+                attempts.student_id,
+                attempts.score,
+                attempts.started_at,
+                attempts.finished_at,
+                models.Test.title,
+                models.Test.total_marks,
+                packed_answers(attempts),
+            )
+            .join(models.Test, models.Test.id == attempts.test_id)
+            .join(models.StudentProfile, models.StudentProfile.id == attempts.student_id)
+            .where(attempts.id == attempt_id, models.StudentProfile.user_id == user_id)
+        )
 
-class AttemptSummary(BaseModel):
-    attempt_id: int
-    test_id: int
-    test_title: str
-    score: int | None
-    total_marks: int
-    started_at: datetime
-    finished_at: datetime | None
+    attempt = db.execute(union_attempts(own)).first()
+    if not attempt:
+        raise HTTPException(status_code=404, detail="Attempt not found")
+    if attempt.finished_at is None:
+        raise HTTPException(status_code=400, detail="Attempt not submitted yet")
+    return attempt
 
 
+@router.get("/attempts/{attempt_id}/result", response_model=TestResultOut)
+@query_budget(4)
+def get_attempt_result(
+    attempt_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> TestResultOut:
+    attempt = _own_finished_attempt(db, attempt_id, current_user.id)
+    if attempt.score is None:
+        return TestResultOut(attempt_id=attempt.id, status="pending", total_marks=attempt.total_marks)
+
+    rank = leaderboard.rank_of(db, attempt.test_id, attempt.student_id)
+    return TestResultOut(
+        attempt_id=attempt.id,
+        score=attempt.score,
+        total_marks=attempt.total_marks,
+        rank=rank.rank if rank else None,
+        percentile=rank.percentile if rank else None,
+    )
+
+
+@router.get("/attempts/{attempt_id}/details", response_model=AttemptDetailOut)
+@query_budget(3)
+def get_attempt_details(
+    attempt_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> AttemptDetailOut:
+    """A submitted attempt with its answers, whether it is live or archived."""
+    attempt = _own_finished_attempt(db, attempt_id, current_user.id)
+    answers = attempt_answers(db, attempt.id, attempt.answers_zlib)
+    return AttemptDetailOut(
+        attempt_id=attempt.id,
+        test_id=attempt.test_id,
+        test_title=attempt.title,
+        score=attempt.score,
+        total_marks=attempt.total_marks,
+        started_at=attempt.started_at,
+        finished_at=attempt.finished_at,
+        archived=attempt.answers_zlib is not None,
+        answers=[
+            TestAnswerIn(question_id=qid, selected_option=option)
+            for qid, option in sorted(answers.items())
+        ],
+    )
+
+
+# ---- Leaderboard ----
+
+@router.get("/{test_id}/leaderboard", response_model=LeaderboardOut)
+@query_budget(4)
+def get_leaderboard(
+    test_id: int,
+    limit: int = Query(default=10, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> LeaderboardOut:
+    test = db.query(models.Test.id).filter(models.Test.id == test_id).first()
+    if not test:
+        raise HTTPException(status_code=404, detail="Test not found")
+
+    top, total_students = leaderboard.top(db, test_id, limit)
+
+    names: dict[int, str] = {}
+    if top:
+        names = dict(
+            db.query(models.StudentProfile.id, models.User.full_name)
+            .join(models.User, models.User.id == models.StudentProfile.user_id)
+            .filter(models.StudentProfile.id.in_([sid for _, sid, _ in top]))
+            .all()
+        )
+
+    result = LeaderboardOut(
+        test_id=test_id,
+        total_students=total_students,
+        top=[
+            LeaderboardEntry(rank=rank, student_name=names.get(sid), score=score)
+            for rank, sid, score in top
+        ],
+    )
+
+    student = (
+        db.query(models.StudentProfile.id)
+        .filter(models.StudentProfile.user_id == current_user.id)
+        .first()
+    )
+    if student:
+        mine = leaderboard.rank_of(db, test_id, student.id)
+        if mine:
+            result.my_rank = mine.rank
+            result.my_percentile = mine.percentile
+            result.my_best_score = mine.best_score
+    return result
+
+
+@router.post("/{test_id}/leaderboard/rebuild", response_model=LeaderboardOut)
+@query_budget(7)
+def rebuild_leaderboard(
+    test_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> LeaderboardOut:
+    ensure_admin(current_user)
+    test = db.query(models.Test.id).filter(models.Test.id == test_id).first()
+    if not test:
+        raise HTTPException(status_code=404, detail="Test not found")
+
+    leaderboard.rebuild(db, test_id)
+    return get_leaderboard(test_id, 10, db, current_user)
+
+
+# ---- Attempt summaries ----
+
 @router.get("/my-attempts", response_model=List[AttemptSummary])
+@query_budget(3)
 def list_my_attempts(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
@@ -203,28 +556,37 @@ def list_my_attempts(
     if not student:
         raise HTTPException(status_code=400, detail="Student profile not found")
 
-    attempts = (
-        db.query(models.TestAttempt)
-        .join(models.Test, models.Test.id == models.TestAttempt.test_id)
-        .filter(models.TestAttempt.student_id == student.id)
-        .order_by(models.TestAttempt.started_at.desc())
-        .all()
-    )
-
-    items: list[AttemptSummary] = []
-    for a in attempts:
-        items.append(
-            AttemptSummary(
-                attempt_id=a.id,
-                test_id=a.test.id,
-                test_title=a.test.title,
-                score=a.score,
-                total_marks=a.test.total_marks,
-                started_at=a.started_at,
-                finished_at=a.finished_at,
+    # test columns come from the join, not a lazy load per attempt
+    def mine(attempts):
+        return (
+            select(
+                attempts.id,
+                models.Test.id.label("test_id"),
+                models.Test.title,
+                attempts.score,
+                models.Test.total_marks,
+                attempts.started_at,
+                attempts.finished_at,
             )
+            .join(models.Test, models.Test.id == attempts.test_id)
+            .where(attempts.student_id == student.id)
+        )
+
+    attempts = union_attempts(mine)
+    rows = db.execute(attempts.order_by(attempts.selected_columns.started_at.desc())).all()
+
+    return [
+        AttemptSummary(
+            attempt_id=attempt_id,
+            test_id=test_id,
+            test_title=title,
+            score=score,
+            total_marks=total_marks,
+            started_at=started_at,
+            finished_at=finished_at,
         )
-    return items
+        for attempt_id, test_id, title, score, total_marks, started_at, finished_at in rows
+    ]
 
 
 class AttemptAdminSummary(BaseModel):
@@ -236,40 +598,130 @@ class AttemptAdminSummary(BaseModel):
     finished_at: datetime | None
 
 
+ADMIN_ATTEMPTS_PAGE_SIZE = 100
+CSV_EXPORT_BATCH_SIZE = 1000
+
+
+def _admin_attempt_rows(test_id: int, cursor: str | None = None):
+    # column-only select with the student's name joined through the profile,
+    # over live and archived attempts
+    def rows(attempts):
+        query = (
+            select(
+                attempts.id.label("id"),  # an alias, so ORDER BY on the union can name it
+                models.User.full_name,
+                attempts.score,
+                attempts.started_at,
+                attempts.finished_at,
+            )
+            .join(models.StudentProfile, models.StudentProfile.id == attempts.student_id)
+            .join(models.User, models.User.id == models.StudentProfile.user_id)
+            .where(attempts.test_id == test_id)
+        )
+        if cursor:
+            query = query.where(before_cursor(attempts.started_at, attempts.id, cursor))
+        return query
+
+    attempts = union_attempts(rows)
+    return attempts.order_by(
+        attempts.selected_columns.started_at.desc(), attempts.selected_columns.id.desc()
+    )
+
+
 @router.get("/{test_id}/attempts", response_model=List[AttemptAdminSummary])
+@query_budget(3)
 def list_test_attempts_admin(
     test_id: int,
+    response: Response,
+    limit: int = Query(default=ADMIN_ATTEMPTS_PAGE_SIZE, ge=1, le=1000),
+    cursor: str | None = Query(default=None),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ) -> List[AttemptAdminSummary]:
+    """
+    Newest attempts first, `limit` per page. When more rows exist, the
+    `X-Next-Cursor` response header holds the cursor for the next page.
+    """
     ensure_admin(current_user)
 
-    test = db.query(models.Test).filter(models.Test.id == test_id).first()
+    test = (
+        db.query(models.Test.total_marks)
+        .filter(models.Test.id == test_id)
+        .first()
+    )
     if not test:
         raise HTTPException(status_code=404, detail="Test not found")
 
-    attempts = (
-        db.query(models.TestAttempt)
-        .join(
-            models.StudentProfile,
-            models.StudentProfile.id == models.TestAttempt.student_id,
+    query = _admin_attempt_rows(test_id, cursor)
+    rows = trim_page(db.execute(query.limit(limit + 1)).all(), limit, response, "started_at")
+
+    return [
+        AttemptAdminSummary(
+            attempt_id=row.id,
+            student_name=row.full_name,
+            score=row.score,
+            total_marks=test.total_marks,
+            started_at=row.started_at,
+            finished_at=row.finished_at,
         )
-        .filter(models.TestAttempt.test_id == test_id)
-        .order_by(models.TestAttempt.started_at.desc())
-        .all()
-    )
+        for row in rows
+    ]
 
-    items: list[AttemptAdminSummary] = []
-    for a in attempts:
-        student_name = getattr(a.student, "full_name", None)
-        items.append(
-            AttemptAdminSummary(
-                attempt_id=a.id,
-                student_name=student_name,
-                score=a.score,
-                total_marks=test.total_marks,
-                started_at=a.started_at,
-                finished_at=a.finished_at,
+
+@router.get("/{test_id}/attempts/export")
+@query_budget(3)
+def export_test_attempts_csv(
+    test_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> StreamingResponse:
+    """Stream every attempt of a test as CSV, newest first."""
+    ensure_admin(current_user)
+
+    test = (
+        db.query(models.Test.total_marks)
+        .filter(models.Test.id == test_id)
+        .first()
+    )
+    if not test:
+        raise HTTPException(status_code=404, detail="Test not found")
+    total_marks = test.total_marks
+
+    def generate():
+        # own session: the request-scoped one may be closed while streaming
+        stream_db = SessionLocal()
+        try:
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(
+                ["attempt_id", "student_name", "score", "total_marks", "started_at", "finished_at"]
             )
-        )
-    return items
+            rows = stream_db.execute(
+                _admin_attempt_rows(test_id).execution_options(yield_per=CSV_EXPORT_BATCH_SIZE)
+            )
+            for n, row in enumerate(rows, start=1):
+                writer.writerow(
+                    [
+                        row.id,
+                        row.full_name or "",
+                        "" if row.score is None else row.score,
+                        total_marks,
+                        row.started_at.isoformat(),
+                        row.finished_at.isoformat() if row.finished_at else "",
+                    ]
+                )
+                if n % CSV_EXPORT_BATCH_SIZE == 0:
+                    yield buf.getvalue()
+                    buf.seek(0)
+                    buf.truncate()
+            yield buf.getvalue()
+        finally:
+            stream_db.close()
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/csv",
+        headers={
+            "Content-Disposition": f'attachment; filename="test-{test_id}-attempts.csv"'
+        },
+    )
@@ -0,0 +1,159 @@
+"""
+Counselling slot allocation.
+
+Each date has one slot per time band with a counsellor capacity (admins can
+change it; otherwise DEFAULT_SLOT_CAPACITY applies). Approving a request
+books it into a slot, and a slot never holds more approved/done requests
+than its capacity.
+
+Default slots are only written when a request is booked or a capacity is
+set; reading a day's slots leaves the table alone. Booking runs under
+SQLite's write lock (see `lock_day`), so concurrent approvals in other
+threads or workers cannot both take the last place in a slot.
+"""
+from dataclasses import dataclass, field
+from datetime import date
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from app import models
+
+TIME_BANDS = ("Morning", "Afternoon", "Evening")
+DEFAULT_SLOT_CAPACITY = 5
+BOOKED_STATUSES = ("approved", "done")
+
+
+def normalize_band(value: str | None) -> str | None:
+    if not value:
+        return None
+    for band in TIME_BANDS:
+        if band.lower() == value.strip().lower():
+            return band
+    return None
+
+
+def day_slots(db: Session, day: date) -> dict[str, models.CounsellingSlot]:
+    """
+    Slots for a day by band. Bands without a row get an unsaved slot with
+    the default capacity (and no id); nothing is written.
+    """
+    slots = {
+        slot.time_band: slot
+        for slot in db.query(models.CounsellingSlot).filter(models.CounsellingSlot.date == day)
+    }
+    for band in TIME_BANDS:
+        if band not in slots:
+            slots[band] = models.CounsellingSlot(date=day, time_band=band, capacity=DEFAULT_SLOT_CAPACITY)
+    return slots
+
+
+def lock_day(db: Session, day: date) -> dict[str, models.CounsellingSlot]:
+    """
+    Create the day's missing slots, then return them all by band.
+
+    The INSERT OR IGNORE is the transaction's first write, so SQLite holds
+    its write lock from here until commit: booked counts read afterwards
+    cannot change under us. Two workers creating the same slots is not an
+    error either.
+    """
+    db.execute(
+        insert(models.CounsellingSlot)
+        .values([{"date": day, "time_band": band, "capacity": DEFAULT_SLOT_CAPACITY} for band in TIME_BANDS])
+        .on_conflict_do_nothing()
+    )
+    return day_slots(db, day)
+
+
+def booked_counts(db: Session, day: date) -> dict[int, int]:
+    return dict(
+        db.query(models.SessionRequest.slot_id, func.count(models.SessionRequest.id))
+        .filter(
+            models.SessionRequest.preferred_date == day,
+            models.SessionRequest.status.in_(BOOKED_STATUSES),
+            models.SessionRequest.slot_id.is_not(None),
+        )
+        .group_by(models.SessionRequest.slot_id)
+        .all()
+    )
+
+
+def _candidate_bands(request: models.SessionRequest, allow_other_bands: bool) -> list[str]:
+    preferred = normalize_band(request.preferred_time)
+    if preferred is None:
+        return list(TIME_BANDS)
+    if allow_other_bands:
+        return [preferred] + [b for b in TIME_BANDS if b != preferred]
+    return [preferred]
+
+
+@dataclass
+class Allocation:
+    approved: list[int] = field(default_factory=list)
+    still_pending: list[int] = field(default_factory=list)
+
+
+def allocate_day(db: Session, day: date, allow_other_bands: bool = False) -> Allocation:
+    """
+    Approve the day's pending requests first-come by `created_at` while
+    slots have room. Nothing is committed.
+    """
+    slots = lock_day(db, day)
+    booked = booked_counts(db, day)
+    remaining = {band: slot.capacity - booked.get(slot.id, 0) for band, slot in slots.items()}
+
+    pending = (
+        db.query(models.SessionRequest)
+        .filter(
+            models.SessionRequest.preferred_date == day,
+            models.SessionRequest.status == "pending",
+        )
+        .order_by(models.SessionRequest.created_at, models.SessionRequest.id)
+        .all()
+    )
+
+    result = Allocation()
+    for request in pending:
+        band = next(
+            (b for b in _candidate_bands(request, allow_other_bands) if remaining[b] > 0),
+            None,
+        )
+        if band is None:
+            result.still_pending.append(request.id)
+            continue
+        remaining[band] -= 1
+        request.slot_id = slots[band].id
+        request.status = "approved"
+        result.approved.append(request.id)
+    return result
+
+
+def assign_slot(db: Session, request: models.SessionRequest, status: str) -> bool:
+    """
+    Book a single request into a slot with room and set its status;
+    False if the day is full. The capacity check is part of the UPDATE, so
+    it holds even without the lock taken by `lock_day`. Nothing is
+    committed; refresh `request` afterwards.
+    """
+    slots = lock_day(db, request.preferred_date)
+    booking = models.SessionRequest
+    for band in _candidate_bands(request, allow_other_bands=False):
+        slot = slots[band]
+        booked = (
+            select(func.count(booking.id))
+            .where(booking.slot_id == slot.id, booking.status.in_(BOOKED_STATUSES))
+            .scalar_subquery()
+        )
+        capacity = select(models.CounsellingSlot.capacity).where(
+            models.CounsellingSlot.id == slot.id
+        ).scalar_subquery()
+        result = db.execute(
+            update(booking)
+            .where(booking.id == request.id, booked < capacity)
+            .values(slot_id=slot.id, status=status)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            return True
+    return False
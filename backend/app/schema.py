@@ -0,0 +1,214 @@
+"""
+Startup schema check.
+
+`ensure_schema` brings an existing database up to the models without a
+migration tool:
+
+- missing tables are created (with their indexes);
+- missing columns are added with ALTER TABLE when SQLite allows it, i.e. the
+  column is nullable or has a default;
+- missing indexes on existing tables are created;
+- on SQLite, tables the models declare AUTOINCREMENT are rebuilt with it
+  when they were created without (see `rebuild_for_autoincrement`);
+- questions from before the shared question bank are linked to their tests
+  (see app.question_bank; an indexed lookup when there are none).
+
+Columns are never dropped or altered in place. The one exception to "no
+table is dropped" is that rebuild: SQLite can only add AUTOINCREMENT by
+copying the table into a new one and dropping the old. For test_attempts,
+the largest table, the first start after the upgrade copies every row
+while holding the write lock, so other workers (and writes) wait until it
+is done; later starts find nothing to do. On a big database, let one
+worker (or a script calling `ensure_schema`) do it before starting the rest.
+
+Apart from that linking only the schema is changed. Rows broken before foreign keys were enforced
+are left to scripts_clean_orphans.py, which reports them before deleting.
+
+It runs once per worker in the app lifespan; set GYANDARSHAK_SCHEMA_CHECK=0
+in production once the schema is managed out of band, so workers start
+without touching the database.
+
+Workers start at the same time, so the whole check runs in one transaction
+that on SQLite is opened with BEGIN IMMEDIATE: one worker applies the
+changes, the others wait for its write lock (up to SCHEMA_LOCK_TIMEOUT_MS)
+and then find nothing left to do.
+"""
+import logging
+import os
+from dataclasses import dataclass, field
+
+from sqlalchemy import Column, Table, inspect
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.exc import DBAPIError
+
+from app import models  # noqa: F401  (registers the tables on Base.metadata)
+from app.database import Base
+from app.question_bank import has_unhashed_questions, link_owned_questions
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_CHECK = os.getenv("GYANDARSHAK_SCHEMA_CHECK", "1") != "0"
+# how long a worker waits for another worker's schema check to finish
+SCHEMA_LOCK_TIMEOUT_MS = 120_000
+# ids that live on in another table: a rebuilt table's sequence starts past both
+ID_CONTINUES_IN = {"test_attempts": "archived_attempts"}
+
+
+@dataclass
+class SchemaReport:
+    created_tables: list[str] = field(default_factory=list)
+    added_columns: list[str] = field(default_factory=list)
+    created_indexes: list[str] = field(default_factory=list)
+    rebuilt_tables: list[str] = field(default_factory=list)
+    linked_questions: int = 0
+    skipped: list[str] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return bool(
+            self.created_tables or self.added_columns or self.created_indexes or self.rebuilt_tables
+            or self.linked_questions
+        )
+
+
+def _column_default_sql(column: Column) -> str | None:
+    if column.server_default is not None:
+        return str(column.server_default.arg)
+    default = column.default
+    if default is None or not default.is_scalar:
+        return None
+    value = default.arg
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    value = getattr(value, "value", value)  # enum members
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _add_column(conn: Connection, table_name: str, column: Column) -> bool:
+    ddl = f'ALTER TABLE "{table_name}" ADD COLUMN "{column.name}" {column.type.compile(dialect=conn.dialect)}'
+    default = _column_default_sql(column)
+    if default is not None:
+        ddl += f" DEFAULT {default}"
+    if not column.nullable:
+        if default is None:
+            return False
+        ddl += " NOT NULL"
+    conn.exec_driver_sql(ddl)
+    return True
+
+
+def ensure_schema(bind: Engine) -> SchemaReport:
+    """Bring the database up to the models; one worker at a time."""
+    with bind.connect() as conn:
+        sqlite = conn.dialect.name == "sqlite"
+        if sqlite:
+            busy_timeout = conn.exec_driver_sql("PRAGMA busy_timeout").scalar()
+            foreign_keys = conn.exec_driver_sql("PRAGMA foreign_keys").scalar()
+            conn.exec_driver_sql(f"PRAGMA busy_timeout = {SCHEMA_LOCK_TIMEOUT_MS}")
+            # dropping a table that is being rebuilt must not cascade into its children;
+            # every row is copied back, so no key is left dangling
+            conn.exec_driver_sql("PRAGMA foreign_keys = OFF")
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            report = _ensure_schema(conn)
+            if sqlite:
+                rebuild_for_autoincrement(conn, report)
+            if has_unhashed_questions(conn):
+                report.linked_questions = link_owned_questions(conn)
+            conn.commit()
+        finally:
+            if sqlite:
+                conn.rollback()  # no-op after the commit; the connection goes back to the pool
+                conn.exec_driver_sql(f"PRAGMA busy_timeout = {busy_timeout}")
+                conn.exec_driver_sql(f"PRAGMA foreign_keys = {foreign_keys}")
+
+    if report.changed:
+        logger.info(
+            "schema updated: tables %s, columns %s, indexes %s, rebuilt %s, questions linked %s",
+            report.created_tables, report.added_columns, report.created_indexes, report.rebuilt_tables,
+            report.linked_questions,
+        )
+    for item in report.skipped:
+        logger.warning("schema check skipped %s; it needs a manual migration", item)
+    return report
+
+
+def _ensure_schema(conn: Connection) -> SchemaReport:
+    report = SchemaReport()
+    existing = set(inspect(conn).get_table_names())
+
+    new_tables = [t for t in Base.metadata.sorted_tables if t.name not in existing]
+    Base.metadata.create_all(bind=conn, tables=new_tables)
+    report.created_tables = [t.name for t in new_tables]
+
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        columns = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in columns:
+                continue
+            name = f"{table.name}.{column.name}"
+            if column.primary_key or column.unique or not _add_column(conn, table.name, column):
+                report.skipped.append(f"column {name}")
+            else:
+                report.added_columns.append(name)
+
+        indexes = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in indexes:
+                continue
+            try:
+                index.create(conn)
+            except DBAPIError as exc:  # e.g. a unique index over duplicate rows
+                logger.warning("could not create index %s: %s", index.name, exc.orig)
+                report.skipped.append(f"index {index.name}")
+            else:
+                report.created_indexes.append(index.name)
+    return report
+
+
+def _rebuild(conn: Connection, table: Table) -> None:
+    """The SQLite way to change a table: create it anew, copy the rows, swap the names."""
+    temp = f"_rebuild_{table.name}"
+    ddl = str(CreateTable(table).compile(dialect=conn.dialect)).strip()
+    prefix = f"CREATE TABLE {table.name} ("
+    assert ddl.startswith(prefix), ddl
+    conn.exec_driver_sql(f'DROP TABLE IF EXISTS "{temp}"')
+    conn.exec_driver_sql(f'CREATE TABLE "{temp}" (' + ddl[len(prefix):])
+
+    existing = {c["name"] for c in inspect(conn).get_columns(table.name)}
+    columns = ", ".join(f'"{c.name}"' for c in table.columns if c.name in existing)
+    conn.exec_driver_sql(f'INSERT INTO "{temp}" ({columns}) SELECT {columns} FROM "{table.name}"')
+    conn.exec_driver_sql(f'DROP TABLE "{table.name}"')
+    conn.exec_driver_sql(f'ALTER TABLE "{temp}" RENAME TO "{table.name}"')
+    for index in table.indexes:
+        index.create(conn)
+
+
+def rebuild_for_autoincrement(conn: Connection, report: SchemaReport) -> None:
+    """
+    SQLite can only add AUTOINCREMENT by rebuilding the table. Without it a
+    new row takes max(id) + 1, so ids freed by deleting the newest rows (or
+    kept elsewhere, see ID_CONTINUES_IN) are handed out again.
+    """
+    for table in Base.metadata.sorted_tables:
+        if not table.dialect_options["sqlite"]["autoincrement"]:
+            continue
+        sql = conn.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table.name,)
+        ).scalar()
+        if sql is None or "AUTOINCREMENT" in sql.upper():
+            continue
+        _rebuild(conn, table)
+
+        seq = f'coalesce((SELECT max(id) FROM "{table.name}"), 0)'
+        if table.name in ID_CONTINUES_IN:
+            seq = f'max({seq}, coalesce((SELECT max(id) FROM "{ID_CONTINUES_IN[table.name]}"), 0))'
+        conn.exec_driver_sql("DELETE FROM sqlite_sequence WHERE name = ?", (table.name,))
+        conn.exec_driver_sql(f"INSERT INTO sqlite_sequence (name, seq) SELECT ?, {seq}", (table.name,))
+        report.rebuilt_tables.append(table.name)
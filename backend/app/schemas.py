@@ -74,6 +74,27 @@ class StudentProfileUpdate(BaseModel):
     target_field: Optional[str] = None
 
 
+class StudentImportRow(UserCreate):
+    """One row of a bulk onboarding CSV; the profile columns are optional."""
+    state: Optional[str] = None
+    district: Optional[str] = None
+    class_level: Optional[str] = None
+    stream_interest: Optional[str] = None
+    target_field: Optional[str] = None
+
+
+class StudentImportError(BaseModel):
+    line: int  # CSV line number, header is line 1
+    email: Optional[str] = None
+    reason: str
+
+
+class StudentImportOut(BaseModel):
+    created: int
+    skipped: int
+    errors: List[StudentImportError]  # the first STUDENT_IMPORT_MAX_ERRORS skipped rows
+
+
 # ---------- Colleges & courses ----------
 
 class CourseCreate(BaseModel):
@@ -118,6 +139,30 @@ class CollegeOut(BaseModel):
         from_attributes = True
 
 
+class CourseRecommendation(BaseModel):
+    course_id: int
+    course_name: str
+    level: Optional[str] = None
+    stream: Optional[str] = None
+    approx_fee_total: Optional[float] = None
+    entrance_exam: Optional[str] = None
+    discount_available: bool = False
+    discount_details: Optional[str] = None
+    college_id: int
+    college_name: str
+    city: str
+    state: str
+    is_partner: bool = False
+    score: float
+
+
+class RecommendationsOut(BaseModel):
+    total: int  # ranked results available, at most RECOMMEND_MAX_RESULTS
+    offset: int
+    items: List[CourseRecommendation]
+    next_offset: Optional[int] = None
+
+
 # ---------- Exams ----------
 
 class ExamDateCreate(BaseModel):
@@ -180,6 +225,32 @@ class ScholarshipOut(ScholarshipCreate):
         from_attributes = True
 
 
+# ---------- Catalog sync ----------
+
+class CollegeChanges(BaseModel):
+    upserted: List[CollegeOut] = []
+    deleted: List[int] = []
+
+
+class ExamChanges(BaseModel):
+    upserted: List[ExamOut] = []
+    deleted: List[int] = []
+
+
+class ScholarshipChanges(BaseModel):
+    upserted: List[ScholarshipOut] = []
+    deleted: List[int] = []
+
+
+class SyncOut(BaseModel):
+    version: int  # pass back as ?since= on the next sync
+    has_more: bool  # more changes are waiting; sync again right away
+    full: bool  # the upserts are the whole catalog; drop the local copy first
+    colleges: CollegeChanges
+    exams: ExamChanges
+    scholarships: ScholarshipChanges
+
+
 # ---------- Tests ----------
 
 class TestQuestionCreate(BaseModel):
@@ -219,6 +290,19 @@ class TestOut(BaseModel):
         from_attributes = True
 
 
+class QuestionImportError(BaseModel):
+    item: int  # CSV line (header is line 1) or position in the JSON
+    reason: str
+
+
+class QuestionImportOut(BaseModel):
+    created: int  # new questions added to the bank
+    reused: int  # identical questions already in the bank, now also used by this test
+    skipped: int
+    total_marks: int
+    errors: List[QuestionImportError]  # the first QUESTION_IMPORT_MAX_ERRORS skipped rows
+
+
 class TestStartResponse(BaseModel):
     attempt_id: int
     test: TestOut
@@ -233,10 +317,53 @@ class TestSubmitRequest(BaseModel):
     answers: List[TestAnswerIn]
 
 
+class TestAutosaveOut(BaseModel):
+    attempt_id: int
+    pending_answers: int
+
+
+class TestSavedAnswersOut(BaseModel):
+    attempt_id: int
+    answers: List[TestAnswerIn]
+
+
 class TestResultOut(BaseModel):
     attempt_id: int
+    status: str = "graded"  # graded / pending
+    score: Optional[int] = None
+    total_marks: int
+    rank: Optional[int] = None
+    percentile: Optional[float] = None
+
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    student_name: Optional[str] = None
     score: int
+
+
+class LeaderboardOut(BaseModel):
+    test_id: int
+    total_students: int
+    top: List[LeaderboardEntry]
+    my_rank: Optional[int] = None
+    my_percentile: Optional[float] = None
+    my_best_score: Optional[int] = None
+
+
+class AttemptSummary(BaseModel):
+    attempt_id: int
+    test_id: int
+    test_title: str
+    score: int | None
     total_marks: int
+    started_at: datetime
+    finished_at: datetime | None
+
+
+class AttemptDetailOut(AttemptSummary):
+    archived: bool  # moved to the attempt archive; the answers were unpacked from it
+    answers: List[TestAnswerIn]
 
 
 # ---------- Session requests ----------
@@ -256,6 +383,55 @@ class SessionRequestOut(BaseModel):
     note: Optional[str]
     status: str
     created_at: datetime
+    slot_id: Optional[int] = None
 
     class Config:
         from_attributes = True
+
+
+class SessionRequestAdminOut(SessionRequestOut):
+    student_id: Optional[int] = None
+    student_name: Optional[str] = None
+
+
+class SessionQueueSummary(BaseModel):
+    total: int
+    by_status: dict[str, int]
+
+
+class CounsellingSlotIn(BaseModel):
+    date: date
+    time_band: str
+    capacity: int
+
+
+class CounsellingSlotOut(BaseModel):
+    id: Optional[int] = None  # None until the slot is first booked or edited
+    date: date
+    time_band: str
+    capacity: int
+    booked: int = 0
+
+
+class SessionAllocationOut(BaseModel):
+    date: date
+    approved: List[int]
+    still_pending: List[int]
+    slots: List[CounsellingSlotOut]
+
+
+# ---------- Student dashboard ----------
+
+class UpcomingExamDate(BaseModel):
+    exam_id: int
+    exam_name: str
+    event_type: str
+    date: date
+
+
+class StudentDashboardOut(BaseModel):
+    user: StudentWithUser
+    recent_attempts: List[AttemptSummary]
+    pending_sessions: List[SessionRequestOut]
+    upcoming_exam_dates: List[UpcomingExamDate]
+    open_scholarships: List[ScholarshipOut]
@@ -0,0 +1,341 @@
+"""
+In-process BM25 retrieval over the catalog, used by /ai/ask.
+
+Documents are built from exams (with their dates), scholarships, colleges
+and courses, indexing both English and Hindi fields. The index is built
+lazily from the database on first use and then kept current from admin
+writes through `catalog_events`. Writes made by other workers are noticed
+through the shared catalog version in `app.cache` and trigger a rebuild.
+Local writes that commit while a build is running are recorded and
+replayed onto the new index before it replaces the old one, since the
+build may already have read the tables they changed.
+
+Queries score rare terms over their full posting lists first; very common
+terms (df above COMMON_TERM_DF) only re-rank documents that rarer terms
+already matched, which keeps latency low on large catalogs. When every query
+term is common, candidates come from the rarest term's champion list: its
+CHAMPION_LIST_SIZE highest-impact documents, computed lazily per term and
+dropped whenever that term's postings change.
+"""
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app import models
+from app.cache import CATALOG, VersionWatch, cache
+from app.catalog_events import subscribe
+from app.database import SessionLocal
+
+TOKEN_RE = re.compile(r"[0-9a-z\u0900-\u0963\u0966-\u097f]+")
+DEVANAGARI_RE = re.compile(r"[\u0900-\u097f]")
+STOPWORDS = {
+    "a", "an", "and", "are", "about", "can", "do", "for", "give", "how", "i", "in",
+    "is", "me", "my", "of", "on", "or", "show", "tell", "the", "to", "what", "when",
+    "which", "who", "with",
+    "और", "का", "की", "के", "को", "क्या", "है", "हैं", "में", "मुझे", "से", "कब", "कौन",
+}
+COMMON_TERM_DF = 5_000
+CHAMPION_LIST_SIZE = 500
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def tokenize(text: str | None) -> list[str]:
+    if not text:
+        return []
+    return [t for t in TOKEN_RE.findall(text.casefold()) if t not in STOPWORDS]
+
+
+def is_hindi(text: str) -> bool:
+    return bool(DEVANAGARI_RE.search(text))
+
+
+@dataclass
+class Document:
+    kind: str  # exam / scholarship / college / course
+    record_id: int
+    title: str
+    summary_en: str
+    summary_hi: str | None = None
+    text: list[str | None] = field(default_factory=list)
+
+    @property
+    def key(self) -> tuple[str, int]:
+        return (self.kind, self.record_id)
+
+    def summary(self, hindi: bool) -> str:
+        return (self.summary_hi if hindi and self.summary_hi else self.summary_en)
+
+
+@dataclass
+class SearchHit:
+    score: float
+    document: Document
+
+
+class SearchIndex:
+    def __init__(self):
+        self._postings: dict[str, dict[tuple[str, int], int]] = {}
+        self._lengths: dict[tuple[str, int], int] = {}
+        self._docs: dict[tuple[str, int], Document] = {}
+        # catalog entity -> keys of the documents derived from it
+        self._groups: dict[tuple[str, int], list[tuple[str, int]]] = {}
+        self._champions: dict[str, list[tuple[str, int]]] = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _add(self, doc: Document) -> None:
+        counts = Counter(t for text in doc.text for t in tokenize(text))
+        counts.update(tokenize(doc.title))
+        key = doc.key
+        for term, tf in counts.items():
+            self._postings.setdefault(term, {})[key] = tf
+            self._champions.pop(term, None)
+        length = sum(counts.values())
+        self._lengths[key] = length
+        self._total_length += length
+        self._docs[key] = doc
+
+    def _remove(self, key: tuple[str, int]) -> None:
+        doc = self._docs.pop(key, None)
+        if doc is None:
+            return
+        terms = set(tokenize(doc.title))
+        for text in doc.text:
+            terms.update(tokenize(text))
+        for term in terms:
+            posting = self._postings.get(term)
+            self._champions.pop(term, None)
+            if posting is not None:
+                posting.pop(key, None)
+                if not posting:
+                    del self._postings[term]
+        self._total_length -= self._lengths.pop(key, 0)
+
+    def replace_group(self, group: tuple[str, int], docs: list[Document]) -> None:
+        """Replace every document derived from one catalog entity."""
+        with self._lock:
+            for key in self._groups.pop(group, []):
+                self._remove(key)
+            for doc in docs:
+                self._add(doc)
+            if docs:
+                self._groups[group] = [d.key for d in docs]
+
+    def _champion_items(self, term: str, posting: dict, avg_len: float):
+        champions = self._champions.get(term)
+        if champions is None:
+            lengths = self._lengths
+            champions = heapq.nlargest(
+                CHAMPION_LIST_SIZE,
+                posting,
+                key=lambda key: posting[key] / (posting[key] + BM25_K1 * (
+                    1 - BM25_B + BM25_B * lengths[key] / avg_len)),
+            )
+            self._champions[term] = champions
+        return ((key, posting[key]) for key in champions)
+
+    def search(self, query: str, limit: int = 5) -> list[SearchHit]:
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            n_docs = len(self._docs)
+            if not terms or not n_docs:
+                return []
+            avg_len = self._total_length / n_docs
+            postings = sorted(
+                ((t, self._postings[t]) for t in terms if t in self._postings),
+                key=lambda item: len(item[1]),
+            )
+            scores: dict[tuple[str, int], float] = {}
+            for term, posting in postings:
+                df = len(posting)
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                if df <= COMMON_TERM_DF:
+                    items = posting.items()
+                elif scores:
+                    items = ((key, posting[key]) for key in scores if key in posting)
+                else:
+                    items = self._champion_items(term, posting, avg_len)
+                lengths = self._lengths
+                for key, tf in items:
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[key] / avg_len)
+                    scores[key] = scores.get(key, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+            best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            return [SearchHit(score=round(score, 4), document=self._docs[key]) for key, score in best]
+
+
+# ---- documents from catalog rows ----
+
+def _join(*parts) -> str:
+    return " · ".join(str(p) for p in parts if p)
+
+
+def exam_documents(exam: models.Exam) -> list[Document]:
+    dates = sorted(exam.dates, key=lambda d: d.date)
+    date_text = "; ".join(f"{d.event_type.replace('_', ' ')}: {d.date.isoformat()}" for d in dates)
+    summary_en = _join(exam.name, exam.level, exam.stream, date_text, exam.official_website)
+    summary_hi = (
+        _join(exam.name, exam.description_hi, date_text) if exam.description_hi else None
+    )
+    return [
+        Document(
+            kind="exam",
+            record_id=exam.id,
+            title=exam.name,
+            summary_en=summary_en,
+            summary_hi=summary_hi,
+            text=[exam.level, exam.stream, exam.description_en, exam.description_hi, date_text,
+                  "exam exams date dates परीक्षा तारीख"],
+        )
+    ]
+
+
+def scholarship_documents(sch: models.Scholarship) -> list[Document]:
+    last_date = f"last date {sch.last_date.isoformat()}" if sch.last_date else None
+    return [
+        Document(
+            kind="scholarship",
+            record_id=sch.id,
+            title=sch.name,
+            summary_en=_join(sch.name, sch.provider_name, sch.level, sch.state,
+                             sch.amount_description, last_date, sch.application_url),
+            summary_hi=(
+                _join(sch.name, sch.eligibility_summary_hi, last_date)
+                if sch.eligibility_summary_hi else None
+            ),
+            text=[sch.provider_type, sch.provider_name, sch.level, sch.min_class_or_course,
+                  sch.eligibility_summary_en, sch.eligibility_summary_hi, sch.amount_description,
+                  sch.state, "scholarship scholarships छात्रवृत्ति"],
+        )
+    ]
+
+
+def college_documents(college: models.College) -> list[Document]:
+    docs = [
+        Document(
+            kind="college",
+            record_id=college.id,
+            title=college.name,
+            summary_en=_join(college.name, f"{college.city}, {college.state}",
+                             "partner college" if college.is_partner else None,
+                             college.website_url),
+            text=[college.city, college.state, college.notes,
+                  " ".join(c.name for c in college.courses), "college colleges कॉलेज"],
+        )
+    ]
+    for course in college.courses:
+        fee = f"approx fee ₹{course.approx_fee_total:,.0f}" if course.approx_fee_total else None
+        docs.append(
+            Document(
+                kind="course",
+                record_id=course.id,
+                title=f"{course.name} – {college.name}",
+                summary_en=_join(f"{course.name} at {college.name}", course.level,
+                                 f"{college.city}, {college.state}", fee,
+                                 f"via {course.entrance_exam}" if course.entrance_exam else None,
+                                 course.discount_details if course.discount_available else None),
+                text=[course.level, course.stream, course.entrance_exam, course.discount_details,
+                      college.city, college.state, "course courses कोर्स"],
+            )
+        )
+    return docs
+
+
+def build_documents(db: Session) -> list[tuple[tuple[str, int], list[Document]]]:
+    groups = []
+    for exam in db.query(models.Exam).options(selectinload(models.Exam.dates)):
+        groups.append((("exam", exam.id), exam_documents(exam)))
+    for sch in db.query(models.Scholarship):
+        groups.append((("scholarship", sch.id), scholarship_documents(sch)))
+    for college in db.query(models.College).options(selectinload(models.College.courses)):
+        groups.append((("college", college.id), college_documents(college)))
+    return groups
+
+
+# kind -> (model, documents, eager loads); one query per change, run in the writing request
+_LOADERS = {
+    "exam": (models.Exam, exam_documents, (joinedload(models.Exam.dates),)),
+    "scholarship": (models.Scholarship, scholarship_documents, ()),
+    "college": (models.College, college_documents, (joinedload(models.College.courses),)),
+}
+
+_index: SearchIndex | None = None
+_index_lock = threading.Lock()
+_catalog_watch = VersionWatch(cache, CATALOG)
+# changes committed during a build, replayed onto the new index; None when not building
+_changes_during_build: list[tuple[str, int, bool]] | None = None
+_changes_lock = threading.Lock()
+
+
+def get_search_index() -> SearchIndex:
+    """The process-wide index, built from the database on first use.
+
+    It is rebuilt when another worker changed the catalog; until the new one
+    is ready, other requests keep using the old index.
+    """
+    global _index, _changes_during_build
+    stale = _index is not None and _catalog_watch.changed_elsewhere()
+    if _index is None or stale:
+        with _index_lock:
+            if _index is None or stale:
+                # read the version first so changes made during the build trigger another one
+                _catalog_watch.reset()
+                with _changes_lock:
+                    _changes_during_build = []
+                try:
+                    index = SearchIndex()
+                    db = SessionLocal()
+                    try:
+                        for group, docs in build_documents(db):
+                            index.replace_group(group, docs)
+                    finally:
+                        db.close()
+                    while True:
+                        with _changes_lock:
+                            changes, _changes_during_build = _changes_during_build, []
+                            if not changes:
+                                _changes_during_build = None
+                                _index = index
+                                break
+                        for change in changes:
+                            _apply(index, *change)
+                finally:
+                    with _changes_lock:
+                        _changes_during_build = None
+    return _index
+
+
+def _apply(index: SearchIndex, kind: str, entity_id: int, deleted: bool) -> None:
+    model, to_documents, options = _LOADERS[kind]
+    docs: list[Document] = []
+    if not deleted:
+        db = SessionLocal()
+        try:
+            row = db.query(model).options(*options).filter(model.id == entity_id).first()
+            if row is not None:
+                docs = to_documents(row)
+        finally:
+            db.close()
+    index.replace_group((kind, entity_id), docs)
+
+
+def _on_catalog_change(kind: str, entity_id: int, deleted: bool) -> None:
+    if kind not in _LOADERS:
+        return
+    with _changes_lock:
+        if _changes_during_build is not None:
+            _changes_during_build.append((kind, entity_id, deleted))
+        index = _index
+    if index is not None:  # not built yet and not building: the first build reads the new state
+        _apply(index, kind, entity_id, deleted)
+
+
+subscribe(_on_catalog_change)
@@ -1,3 +1,5 @@
+import hmac
+import os
 from datetime import datetime, timedelta, timezone
 
 from fastapi import HTTPException, status, Depends
@@ -12,9 +14,13 @@ from app.deps import get_db
 SECRET_KEY = "change-this-secret-later"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 1 day
+# static bearer token for the Prometheus scraper; unset, only admins can read /metrics
+METRICS_TOKEN = os.getenv("GYANDARSHAK_METRICS_TOKEN") or None
 
 pwd_context = CryptContext(schemes=["sha256_crypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+# for endpoints that also serve anonymous visitors
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
 
 def hash_password(password: str) -> str:
@@ -34,10 +40,16 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> models.User:
+def token_is_valid(token: str) -> bool:
+    """Signed by us and not expired; checked without a database lookup."""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return False
+    return payload.get("sub") is not None
+
+
+def user_from_token(token: str, db: Session) -> models.User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -59,6 +71,27 @@ def get_current_user(
     return user
 
 
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> models.User:
+    return user_from_token(token, db)
+
+
+def get_optional_user(
+    token: str | None = Depends(optional_oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> models.User | None:
+    """The logged-in user, or None for anonymous requests and unusable tokens."""
+    if token is None:
+        return None
+    try:
+        return user_from_token(token, db)
+    except HTTPException:
+        # an expired or invalid token is served as anonymous, not refused
+        return None
+
+
 
 def get_current_admin(
     current_user: models.User = Depends(get_current_user),
@@ -69,3 +102,23 @@ def get_current_admin(
             detail="Admins only",
         )
     return current_user
+
+
+def get_metrics_reader(
+    token: str | None = Depends(optional_oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> None:
+    """
+    /metrics shows route names, error rates and queue depths, so it is not
+    public: the scraper sends METRICS_TOKEN as its bearer token, and admins
+    can read it with their own login.
+    """
+    if token is not None and METRICS_TOKEN is not None and hmac.compare_digest(token, METRICS_TOKEN):
+        return
+    if token is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    get_current_admin(user_from_token(token, db))
@@ -0,0 +1,300 @@
+"""
+Pre-built catalog snapshots served as static files.
+
+Most anonymous traffic reads the whole public catalog. Instead of querying
+and encoding it per request, `SnapshotStore.build` materializes colleges, exams
+and scholarships once per language into
+
+    catalog-<lang>-<sha256 prefix>.json      (+ .json.gz, + .json.br with brotli)
+
+under SNAPSHOT_DIR, and records the current file per language in
+`manifest.json`. Localized columns (`description_en` / `description_hi`, ...)
+collapse into one field in the snapshot's language, falling back to English.
+
+File names are content hashes, so a file never changes once written and can
+be cached forever by browsers and CDNs; /catalog/{lang} points clients at
+the current one. Files and the manifest are written atomically (temp file +
+rename), so several workers may build at once without serving a torn file.
+The manifest is only replaced under a lock file and never by an older
+version than the one on disk, so a slow build cannot roll clients back.
+
+The worker that commits an admin change rebuilds in the background shortly
+afterwards (bursts of changes coalesce into one build). Every worker picks
+up a new manifest by its mtime, without touching the database.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload, sessionmaker
+
+from app import models
+from app.catalog_events import subscribe
+from app.compression import brotli
+from app.database import SessionLocal
+from app.responses import dumps, trusted_encoder
+from app.schemas import CollegeOut, ExamOut, ScholarshipOut
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = os.getenv("GYANDARSHAK_SNAPSHOT_DIR", "./snapshots")
+LANGUAGES = ("en", "hi")
+MANIFEST_NAME = "manifest.json"
+MANIFEST_LOCK_NAME = ".manifest.lock"
+# built once and served many times, so spend the CPU on the smallest files
+SNAPSHOT_GZIP_LEVEL = 9
+SNAPSHOT_BROTLI_QUALITY = 11
+# wait this long after a change so a burst of admin edits builds once
+REBUILD_DELAY_SECONDS = 0.5
+# older files stay servable for clients that still hold their URL
+KEEP_OLD_SNAPSHOTS = 3
+_DIGEST_RE = re.compile(r"[0-9a-f]{16}")
+
+# response key -> (schema, model, eager loads, localized fields)
+CATALOG_PARTS = {
+    "colleges": (CollegeOut, models.College, (joinedload(models.College.courses),), ()),
+    "exams": (ExamOut, models.Exam, (joinedload(models.Exam.dates),), ("description",)),
+    "scholarships": (ScholarshipOut, models.Scholarship, (), ("eligibility_summary",)),
+}
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    language: str
+    version: int
+    digest: str
+    name: str  # "catalog-en-<digest>.json"
+    encodings: tuple[str, ...]  # pre-compressed variants on disk: "gzip", "br"
+
+
+def _localize(row: dict, fields: tuple[str, ...], language: str) -> dict:
+    for field in fields:
+        values = {lang: row.pop(f"{field}_{lang}", None) for lang in LANGUAGES}
+        row[field] = values.get(language) or values["en"]
+    return row
+
+
+def render_catalog(db: Session) -> tuple[int, dict[str, bytes]]:
+    """Encode the catalog once per language; returns (change-log version, bodies)."""
+    version = db.query(func.max(models.CatalogChange.version)).scalar() or 0
+    rows = {}
+    for key, (schema, model, options, _) in CATALOG_PARTS.items():
+        encode = trusted_encoder(schema)
+        rows[key] = [encode(obj) for obj in db.query(model).options(*options).order_by(model.id)]
+
+    bodies = {}
+    for language in LANGUAGES:
+        content = {"version": version, "language": language}
+        for key, (_, _, _, localized) in CATALOG_PARTS.items():
+            content[key] = [_localize(dict(row), localized, language) for row in rows[key]]
+        bodies[language] = dumps(content)
+    return version, bodies
+
+
+@contextmanager
+def _locked(path: str):
+    """Exclusive lock on `path` shared by every worker process, blocking until free."""
+    with open(path, "a+b") as lock_file:
+        if os.name == "nt":
+            import msvcrt
+
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield  # closing the file releases the lock
+
+
+def _parse_manifest(raw: dict) -> dict[str, Snapshot]:
+    return {
+        lang: Snapshot(lang, entry["version"], entry["digest"], entry["name"], tuple(entry["encodings"]))
+        for lang, entry in raw.items()
+    }
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class SnapshotStore:
+    def __init__(self, directory: str = SNAPSHOT_DIR, session_factory: sessionmaker = SessionLocal):
+        self.directory = directory
+        self.session_factory = session_factory
+        self.builds = 0
+        self._manifest: dict[str, Snapshot] = {}
+        self._manifest_mtime: float | None = None
+        self._build_lock = threading.Lock()
+        self._wanted = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    # ---------- building ----------
+
+    def build(self, db: Session | None = None) -> dict[str, Snapshot]:
+        """Write snapshots for every language and point the manifest at them."""
+        with self._build_lock:
+            own_session = db is None
+            db = db or self.session_factory()
+            try:
+                version, bodies = render_catalog(db)
+            finally:
+                if own_session:
+                    db.close()
+
+            os.makedirs(self.directory, exist_ok=True)
+            snapshots = {}
+            for language, body in bodies.items():
+                digest = hashlib.sha256(body).hexdigest()[:16]
+                name = f"catalog-{language}-{digest}.json"
+                variants = {"": body, ".gz": gzip.compress(body, compresslevel=SNAPSHOT_GZIP_LEVEL, mtime=0)}
+                if brotli is not None:
+                    variants[".br"] = brotli.compress(body, quality=SNAPSHOT_BROTLI_QUALITY)
+                for suffix, data in variants.items():
+                    if not os.path.exists(self.path(name + suffix)):
+                        _write_atomic(self.path(name + suffix), data)
+                encodings = tuple({".gz": "gzip", ".br": "br"}[s] for s in variants if s)
+                snapshots[language] = Snapshot(language, version, digest, name, encodings)
+
+            manifest = {lang: {"version": s.version, "digest": s.digest, "name": s.name,
+                               "encodings": list(s.encodings)} for lang, s in snapshots.items()}
+            with _locked(self.path(MANIFEST_LOCK_NAME)):
+                on_disk = self._read_manifest()
+                newer = {lang: s for lang, s in on_disk.items() if s.version > version}
+                if newer:
+                    # another worker rendered a later catalog while this one was busy
+                    logger.info("catalog snapshots at version %s skipped, manifest is newer", version)
+                    snapshots = on_disk
+                else:
+                    _write_atomic(self.path(MANIFEST_NAME), json.dumps(manifest, indent=2).encode())
+                    logger.info("catalog snapshots built at version %s", version)
+                self._prune(keep={s.name for s in snapshots.values()})
+            self.builds += 1
+            return snapshots
+
+    def _mtime(self, name: str) -> float:
+        try:
+            return os.stat(self.path(name)).st_mtime
+        except FileNotFoundError:  # pruned by another worker meanwhile
+            return 0.0
+
+    def _prune(self, keep: set[str]) -> None:
+        for language in LANGUAGES:
+            prefix = f"catalog-{language}-"
+            names = sorted(
+                (n for n in os.listdir(self.directory) if n.startswith(prefix) and n.endswith(".json")),
+                key=lambda n: self._mtime(n),
+                reverse=True,
+            )
+            for name in [n for n in names if n not in keep][KEEP_OLD_SNAPSHOTS:]:
+                for suffix in ("", ".gz", ".br"):
+                    try:
+                        os.unlink(self.path(name + suffix))
+                    except FileNotFoundError:
+                        pass
+
+    def is_stale(self) -> bool:
+        db = self.session_factory()
+        try:
+            version = db.query(func.max(models.CatalogChange.version)).scalar() or 0
+        finally:
+            db.close()
+        current = self.manifest()
+        return not current or any(s.version != version for s in current.values())
+
+    # ---------- reading ----------
+
+    def _read_manifest(self) -> dict[str, Snapshot]:
+        try:
+            with open(self.path(MANIFEST_NAME), "rb") as f:
+                return _parse_manifest(json.load(f))
+        except FileNotFoundError:
+            return {}
+
+    def manifest(self) -> dict[str, Snapshot]:
+        """The current snapshots, re-read only when another build replaced the manifest."""
+        try:
+            mtime = os.stat(self.path(MANIFEST_NAME)).st_mtime
+        except FileNotFoundError:
+            return {}
+        if mtime != self._manifest_mtime:
+            with open(self.path(MANIFEST_NAME), "rb") as f:
+                self._manifest = _parse_manifest(json.load(f))
+            self._manifest_mtime = mtime
+        return self._manifest
+
+    def current(self, language: str) -> Snapshot | None:
+        return self.manifest().get(language)
+
+    def find(self, language: str, digest: str) -> Snapshot | None:
+        """A current or recent snapshot by its digest (files stay until pruned)."""
+        if not _DIGEST_RE.fullmatch(digest):
+            return None
+        current = self.current(language)
+        if current is not None and current.digest == digest:
+            return current
+        name = f"catalog-{language}-{digest}.json"
+        if not os.path.isfile(self.path(name)):
+            return None
+        encodings = tuple(enc for enc, suffix in (("gzip", ".gz"), ("br", ".br"))
+                          if os.path.isfile(self.path(name + suffix)))
+        return Snapshot(language, -1, digest, name, encodings)
+
+    # ---------- background rebuilds ----------
+
+    def request_rebuild(self) -> None:
+        self._wanted.set()
+
+    def _run(self) -> None:
+        try:
+            if self.is_stale():
+                self.build()
+        except Exception:
+            logger.exception("initial catalog snapshot build failed")
+        while not self._stop.is_set():
+            self._wanted.wait()
+            if self._stop.wait(REBUILD_DELAY_SECONDS):
+                break
+            self._wanted.clear()
+            try:
+                self.build()
+            except Exception:
+                logger.exception("catalog snapshot build failed")
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="catalog-snapshots", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wanted.set()
+        if self._thread is not None:
+            self._thread.join(timeout=REBUILD_DELAY_SECONDS + 5)
+            self._thread = None
+
+
+snapshot_store = SnapshotStore()
+
+subscribe(lambda kind, entity_id, deleted: snapshot_store.request_rebuild())
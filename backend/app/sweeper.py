@@ -0,0 +1,152 @@
+"""
+Background finalization of expired test attempts.
+
+An attempt that is never submitted keeps `finished_at`/`score` NULL. Every
+few seconds the sweeper looks for open attempts whose test duration (plus a
+grace period) has elapsed, grades whatever was autosaved for them and marks
+them finished at their deadline.
+
+Open attempts are found through a partial index that only contains rows
+with `finished_at IS NULL`, so the cost of a sweep depends on how many
+attempts are currently open, not on the size of the attempt history.
+"""
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import models
+from app.autosave import autosave_buffer
+from app.database import SessionLocal
+from app.grading import grade_attempts
+from app.leaderboard import leaderboard
+
+logger = logging.getLogger(__name__)
+
+SWEEP_INTERVAL_SECONDS = 5.0
+SWEEP_BATCH_SIZE = 500
+# extra time after the deadline for submissions that are already in flight
+SWEEP_GRACE_SECONDS = 60
+
+
+def finalize_expired(db: Session, now: datetime | None = None, batch_size: int = SWEEP_BATCH_SIZE) -> int:
+    """Finalize up to `batch_size` expired attempts; returns how many were finalized."""
+    now = now or datetime.utcnow()
+    open_tests = (
+        db.query(models.TestAttempt.test_id)
+        .filter(models.TestAttempt.finished_at.is_(None))
+        .distinct()
+        .subquery()
+    )
+    durations = dict(
+        db.query(models.Test.id, models.Test.duration_minutes)
+        .filter(models.Test.id.in_(open_tests.select()))
+        .all()
+    )
+
+    deadlines: dict[int, datetime] = {}
+    for test_id, duration in durations.items():
+        limit = batch_size - len(deadlines)
+        if limit <= 0:
+            break
+        cutoff = now - timedelta(minutes=duration, seconds=SWEEP_GRACE_SECONDS)
+        rows = (
+            db.query(models.TestAttempt.id, models.TestAttempt.started_at)
+            .filter(
+                models.TestAttempt.finished_at.is_(None),
+                models.TestAttempt.test_id == test_id,
+                models.TestAttempt.started_at < cutoff,
+            )
+            .limit(limit)
+            .all()
+        )
+        for attempt_id, started_at in rows:
+            deadlines[attempt_id] = started_at + timedelta(minutes=duration)
+
+    if not deadlines:
+        return 0
+
+    # claim the attempts first; anything submitted meanwhile is left alone
+    claimed = [
+        attempt_id
+        for (attempt_id,) in db.execute(
+            update(models.TestAttempt)
+            .where(
+                models.TestAttempt.id.in_(list(deadlines)),
+                models.TestAttempt.finished_at.is_(None),
+            )
+            .values(finished_at=now)
+            .returning(models.TestAttempt.id)
+        )
+    ]
+    buffered = autosave_buffer.take_many(claimed)
+    scores = grade_attempts(
+        db,
+        {attempt_id: buffered.get(attempt_id, {}) for attempt_id in claimed},
+        finished_at={attempt_id: deadlines[attempt_id] for attempt_id in claimed},
+    )
+    graded = (
+        db.query(models.TestAttempt.test_id, models.TestAttempt.student_id, models.TestAttempt.id)
+        .filter(models.TestAttempt.id.in_(claimed))
+        .all()
+    )
+    db.commit()
+
+    for test_id, student_id, attempt_id in graded:
+        leaderboard.record(db, test_id, student_id, scores[attempt_id])
+    return len(claimed)
+
+
+class ExpiredAttemptSweeper:
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        interval: float = SWEEP_INTERVAL_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.finalized = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def sweep(self) -> int:
+        total = 0
+        while True:
+            db = self.session_factory()
+            try:
+                done = finalize_expired(db)
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+            total += done
+            if done < SWEEP_BATCH_SIZE:
+                break
+        self.finalized += total
+        return total
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception:
+                logger.exception("expired attempt sweep failed")
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="attempt-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 5)
+            self._thread = None
+
+
+attempt_sweeper = ExpiredAttemptSweeper()
@@ -1,9 +1,58 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import auth, students, colleges , exams, scholarships , ai, tests , session_requests
-from app.database import Base, engine
+from fastapi.responses import PlainTextResponse
+from app.routers import auth, students, colleges , exams, scholarships , ai, tests , session_requests, sync, catalog
+from app.archive import attempt_archiver
+from app.autosave import autosave_buffer
+from app.compression import CompressionMiddleware
+from app.assistant import assistant
+from app.cache import cache
+from app.grading import grading_queue
+from app.limits import route_limiters, work_gate
+from app.metrics import MetricsMiddleware, metrics
+from app.onboarding import password_hasher
+from app.query_budget import QueryBudgetMiddleware
+from app.pagination import NEXT_CURSOR_HEADER
+from app.question_bank import hash_question_bank
+from app.recommend import recommender
+from app.schema import SCHEMA_CHECK, ensure_schema
+from app.security import get_metrics_reader
+from app.snapshots import snapshot_store
+from app.sweeper import attempt_sweeper
+from app.database import engine
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # off in production (GYANDARSHAK_SCHEMA_CHECK=0): workers then start without touching the database
+    if SCHEMA_CHECK:
+        # also links questions from before the shared bank, under the schema lock
+        ensure_schema(engine)
+        # then hashes them; one indexed lookup once the bank is complete
+        hash_question_bank()
+    autosave_buffer.start()
+    grading_queue.start()
+    attempt_sweeper.start()
+    attempt_archiver.start()
+    # builds the catalog snapshots in the background if they are missing or stale
+    snapshot_store.start()
+    # first recommendation index, so no request builds it inline
+    recommender.start()
+    try:
+        yield
+    finally:
+        snapshot_store.stop()
+        password_hasher.stop()
+        attempt_archiver.stop()
+        attempt_sweeper.stop()
+        grading_queue.stop()
+        # write any buffered answers before the worker exits
+        autosave_buffer.stop()
 
-app = FastAPI(title="Gyandarshak API")
+
+app = FastAPI(title="Gyandarshak API", lifespan=lifespan)
 
 # Allow React dev server
 origins = [
@@ -17,9 +66,59 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
+# inside the metrics middleware, so Server-Timing includes compression time
+app.add_middleware(CompressionMiddleware)
+# QueryBudgetMiddleware reads the counters MetricsMiddleware sets up, so it goes inside
+app.add_middleware(QueryBudgetMiddleware)
+app.add_middleware(MetricsMiddleware)
 
-Base.metadata.create_all(bind=engine)
+metrics.add_gauge(
+    "gyandarshak_autosave_pending_answers",
+    "Autosaved answers not yet written to the database.",
+    lambda: autosave_buffer.pending_answers,
+)
+metrics.add_gauge(
+    "gyandarshak_grading_queue_depth",
+    "Queued submissions waiting for a grading worker.",
+    lambda: grading_queue.depth,
+)
+metrics.add_gauge(
+    "gyandarshak_cache_hit_rate",
+    "Share of shared-cache lookups (catalog lists) that were hits.",
+    lambda: cache.stats.hit_rate,
+)
+metrics.add_gauge(
+    "gyandarshak_ai_answer_cache_hit_rate",
+    "Share of /ai/ask lookups answered from the cache.",
+    lambda: assistant.cache.stats.hit_rate,
+)
+metrics.add_gauge(
+    "gyandarshak_ai_generations_waiting",
+    "/ai/ask generations queued for a model slot.",
+    lambda: assistant.limiter.waiting,
+)
+for limiter in [*route_limiters.values(), work_gate]:
+    labels = {"limiter": limiter.name}
+    metrics.add_gauge(
+        "gyandarshak_route_queue_depth",
+        "Requests waiting for a concurrency slot, per route limiter.",
+        lambda limiter=limiter: limiter.waiting,
+        labels,
+    )
+    metrics.add_gauge(
+        "gyandarshak_route_active",
+        "Requests holding a concurrency slot, per route limiter.",
+        lambda limiter=limiter: limiter.active,
+        labels,
+    )
+    metrics.add_gauge(
+        "gyandarshak_route_rejected",
+        "Requests shed with 503 since start, per route limiter.",
+        lambda limiter=limiter: limiter.rejected,
+        labels,
+    )
 
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(students.router, prefix="/students", tags=["students"])
@@ -29,7 +128,15 @@ app.include_router(scholarships.router, prefix="/scholarships", tags=["scholarsh
 app.include_router(tests.router, prefix="/tests", tags=["tests"])
 app.include_router(ai.router, prefix="/ai", tags=["ai"])
 app.include_router(session_requests.router, prefix="/sessions", tags=["sessions"])
+app.include_router(sync.router, prefix="/sync", tags=["sync"])
+app.include_router(catalog.router, prefix="/catalog", tags=["catalog"])
 
 @app.get("/")
 def read_root():
     return {"message": "Gyandarshak API is running"}
+
+
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(get_metrics_reader)])
+def read_metrics():
+    """Prometheus scrape endpoint; set GYANDARSHAK_METRICS_TOKEN for the scraper."""
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
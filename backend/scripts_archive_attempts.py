@@ -0,0 +1,35 @@
+"""
+Move graded attempts older than a cutoff, with their answers, into the
+attempt archive (see app/archive.py). Safe to re-run; the background
+archiver does the same every few hours.
+
+    python scripts_archive_attempts.py --older-than-days 365
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from app.archive import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE, archive_attempts
+from app.database import SessionLocal
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    cutoff = datetime.utcnow() - timedelta(days=args.older_than_days)
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        report = archive_attempts(db, cutoff, args.batch_size)
+    finally:
+        db.close()
+    print(f"archived {report.attempts} attempts started before {cutoff:%Y-%m-%d} "
+          f"({report.answers} answer rows packed into {report.packed_bytes / 1024:.0f} KiB) "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""
+Upgrade a database from before the shared question bank: create the link
+table, link every question to its own test and hash it. The API does this
+at startup when GYANDARSHAK_SCHEMA_CHECK is on; run this when it is off.
+Safe to re-run.
+
+    python scripts_backfill_question_bank.py
+"""
+import argparse
+import time
+
+from app.database import engine
+from app.question_bank import backfill_question_bank
+from app.schema import ensure_schema
+
+
+def main() -> None:
+    argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter).parse_args()
+    started = time.perf_counter()
+    ensure_schema(engine)
+    linked, hashed = backfill_question_bank()
+    print(f"linked {linked} questions to their tests, hashed {hashed}, "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+Mixed-traffic benchmark of the API, run in-process.
+
+Seeds a throwaway SQLite database with scripts_seed.py (or uses an existing
+seeded one), then drives a weighted mix of student and anonymous requests
+from several threads and reports throughput and p50/p95/p99 per endpoint.
+Results are written as JSON so runs can be compared:
+
+    python scripts_bench.py --scale small --requests 5000 --concurrency 8
+    python scripts_bench.py --database-url sqlite:///./big.db --requests 20000
+    python scripts_bench.py --compare bench_results/baseline.json
+
+Anonymous catalog reads, logged-in dashboard reads, /ai/ask and full
+start-and-submit test attempts are mixed according to SCENARIOS.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+if __name__ == "__main__":
+    # must be set before app.database is imported
+    _pre = argparse.ArgumentParser(add_help=False)
+    _pre.add_argument("--database-url")
+    _known, _ = _pre.parse_known_args()
+    os.environ["GYANDARSHAK_DATABASE_URL"] = _known.database_url or (
+        f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    )
+    _SEED_FRESH = _known.database_url is None
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+from app import models  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.security import create_access_token  # noqa: E402
+from scripts_seed import SCALES, SEED_PASSWORD, STATES, seed_database  # noqa: E402
+
+RESULTS_DIR = Path(__file__).parent / "bench_results"
+QUESTIONS = [
+    "JEE Main exam dates", "scholarship for class 12 in Bihar", "engineering college in Pune",
+    "NEET UG application date", "बिहार छात्रवृत्ति", "law colleges in Delhi", "CUET result date",
+]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def call(self, client: TestClient, label: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        response = client.request(method, url, **kwargs)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.latencies[label].append(elapsed)
+            if response.status_code >= 400:
+                self.errors[label] += 1
+        return response
+
+
+class Traffic:
+    def __init__(self, client: TestClient, recorder: Recorder, students: list[tuple[str, dict]], test_ids: list[int]):
+        self.client = client
+        self.rec = recorder
+        self.students = students
+        self.test_ids = test_ids
+
+    def _student(self, rnd: random.Random) -> tuple[str, dict]:
+        return rnd.choice(self.students)
+
+    def colleges(self, rnd):
+        self.rec.call(self.client, "GET /colleges/?state", "GET", "/colleges/", params={"state": rnd.choice(STATES)})
+
+    def exams(self, rnd):
+        self.rec.call(self.client, "GET /exams/", "GET", "/exams/")
+
+    def scholarships(self, rnd):
+        self.rec.call(self.client, "GET /scholarships/?state", "GET", "/scholarships/",
+                      params={"state": rnd.choice(STATES)})
+
+    def profile(self, rnd):
+        self.rec.call(self.client, "GET /students/me", "GET", "/students/me", headers=self._student(rnd)[1])
+
+    def my_attempts(self, rnd):
+        self.rec.call(self.client, "GET /tests/my-attempts", "GET", "/tests/my-attempts",
+                      headers=self._student(rnd)[1])
+
+    def tests(self, rnd):
+        self.rec.call(self.client, "GET /tests/", "GET", "/tests/", headers=self._student(rnd)[1])
+
+    def leaderboard(self, rnd):
+        self.rec.call(self.client, "GET /tests/{test_id}/leaderboard", "GET",
+                      f"/tests/{rnd.choice(self.test_ids)}/leaderboard", headers=self._student(rnd)[1])
+
+    def sessions(self, rnd):
+        self.rec.call(self.client, "GET /sessions/mine", "GET", "/sessions/mine", headers=self._student(rnd)[1])
+
+    def ask(self, rnd):
+        self.rec.call(self.client, "POST /ai/ask", "POST", "/ai/ask", json={"question": rnd.choice(QUESTIONS)})
+
+    def login(self, rnd):
+        email, _ = self._student(rnd)
+        self.rec.call(self.client, "POST /auth/login", "POST", "/auth/login",
+                      data={"username": email, "password": SEED_PASSWORD})
+
+    def attempt(self, rnd):
+        headers = self._student(rnd)[1]
+        r = self.rec.call(self.client, "POST /tests/{test_id}/start", "POST",
+                          f"/tests/{rnd.choice(self.test_ids)}/start", headers=headers)
+        if r.status_code != 200:
+            return
+        start = r.json()
+        answers = [{"question_id": q["id"], "selected_option": rnd.choice("ABCD")} for q in start["test"]["questions"]]
+        self.rec.call(self.client, "POST /tests/attempts/{attempt_id}/submit", "POST",
+                      f"/tests/attempts/{start['attempt_id']}/submit", headers=headers, json={"answers": answers})
+
+
+# (scenario, weight)
+SCENARIOS = [
+    ("colleges", 10), ("exams", 8), ("scholarships", 8), ("profile", 10), ("my_attempts", 8),
+    ("tests", 4), ("leaderboard", 5), ("sessions", 5), ("ask", 6), ("login", 1), ("attempt", 2),
+]
+
+
+def sample_students(n: int) -> tuple[list[tuple[str, dict]], list[int]]:
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(models.User.id, models.User.email)
+            .join(models.StudentProfile, models.StudentProfile.user_id == models.User.id)
+            .filter(models.User.role == models.UserRole.student)
+            .order_by(models.User.id)
+            .limit(n)
+            .all()
+        )
+        test_ids = [tid for (tid,) in db.query(models.Test.id).filter(models.Test.is_active.is_(True)).limit(50)]
+    finally:
+        db.close()
+    students = [
+        (email, {"Authorization": "Bearer " + create_access_token({"sub": str(uid), "role": "student"})})
+        for uid, email in rows
+    ]
+    return students, test_ids
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def summarize(recorder: Recorder, wall: float) -> dict:
+    endpoints = {}
+    for label, values in sorted(recorder.latencies.items()):
+        endpoints[label] = {
+            "requests": len(values),
+            "errors": recorder.errors.get(label, 0),
+            "rps": round(len(values) / wall, 1),
+            "p50_ms": round(statistics.median(values) * 1000, 2),
+            "p95_ms": round(percentile(values, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+            "max_ms": round(max(values) * 1000, 2),
+        }
+    total = sum(e["requests"] for e in endpoints.values())
+    return {"total_requests": total, "wall_seconds": round(wall, 2), "rps": round(total / wall, 1),
+            "endpoints": endpoints}
+
+
+def print_report(summary: dict, baseline: dict | None) -> None:
+    print(f"\n{'endpoint':42} {'reqs':>6} {'err':>4} {'rps':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+          + ("   p50 Δ    p99 Δ" if baseline else ""))
+    for label, e in summary["endpoints"].items():
+        line = (f"{label:42} {e['requests']:>6} {e['errors']:>4} {e['rps']:>7} "
+                f"{e['p50_ms']:>8} {e['p95_ms']:>8} {e['p99_ms']:>8}")
+        old = baseline["endpoints"].get(label) if baseline else None
+        if old:
+            line += f"  {100 * (e['p50_ms'] / old['p50_ms'] - 1):+6.0f}%  {100 * (e['p99_ms'] / old['p99_ms'] - 1):+6.0f}%"
+        print(line)
+    print(f"\ntotal {summary['total_requests']} requests in {summary['wall_seconds']}s = {summary['rps']} req/s"
+          + (f" (baseline {baseline['rps']} req/s)" if baseline else ""))
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main_bench() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="use an already seeded database instead of a fresh one")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--requests", type=int, default=3_000, help="scenarios to run")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--students", type=int, default=500, help="distinct logged-in students")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=Path, help="results file (default bench_results/<scale>-<time>.json)")
+    parser.add_argument("--compare", type=Path, help="earlier results file to diff against")
+    args = parser.parse_args()
+
+    if _SEED_FRESH:
+        print(f"seeding fresh database ({args.scale})")
+        seed_database(engine, SCALES[args.scale], log=lambda line: None)
+    students, test_ids = sample_students(args.students)
+    if not students or not test_ids:
+        raise SystemExit("database has no seeded students/tests; run scripts_seed.py first")
+
+    recorder = Recorder()
+    names = [name for name, _ in SCENARIOS]
+    weights = [w for _, w in SCENARIOS]
+    plan = random.Random(args.seed).choices(names, weights=weights, k=args.requests)
+
+    with TestClient(main.app) as client:
+        traffic = Traffic(client, recorder, students, test_ids)
+        # warm lazily built state (search index, leaderboards) outside the measurement
+        traffic.ask(random.Random(0))
+        recorder = traffic.rec = Recorder()
+
+        def run(i: int) -> None:
+            getattr(traffic, plan[i])(random.Random(args.seed * 1_000_003 + i))
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            list(pool.map(run, range(len(plan))))
+        wall = time.perf_counter() - started
+
+    summary = summarize(recorder, wall)
+    result = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "config": {"scale": args.scale if _SEED_FRESH else "existing", "requests": args.requests,
+                   "concurrency": args.concurrency, "students": len(students)},
+        **summary,
+    }
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print_report(result, baseline)
+
+    output = args.output or RESULTS_DIR / f"{result['config']['scale']}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2, ensure_ascii=False))
+    print(f"results saved to {output}")
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,105 @@
+"""
+Sustained autosave throughput: write-behind buffer vs. one commit per save.
+
+Runs against a throwaway SQLite file, never the app database:
+
+    python scripts_bench_autosave.py --seconds 5 --threads 8
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_autosave.db")
+os.environ["GYANDARSHAK_DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from sqlalchemy import insert  # noqa: E402
+
+from app import models  # noqa: E402
+from app.autosave import AutosaveBuffer, write_answers  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.question_bank import link_owned_questions  # noqa: E402
+
+
+def seed(attempts: int, questions: int) -> tuple[list[int], list[int]]:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = models.User(full_name="Bench", email="bench@example.com", password_hash="x")
+    db.add(user)
+    db.flush()
+    profile = models.StudentProfile(user_id=user.id)
+    test = models.Test(title="Bench", duration_minutes=60, total_marks=questions)
+    db.add_all([profile, test])
+    db.flush()
+    db.execute(
+        insert(models.TestQuestion),
+        [
+            {"test_id": test.id, "text": f"Q{i}", "option_a": "a", "option_b": "b",
+             "option_c": "c", "option_d": "d", "correct_option": "A", "marks": 1}
+            for i in range(questions)
+        ],
+    )
+    link_owned_questions(db)
+    db.execute(
+        insert(models.TestAttempt),
+        [{"test_id": test.id, "student_id": profile.id} for _ in range(attempts)],
+    )
+    db.commit()
+    attempt_ids = [i for (i,) in db.query(models.TestAttempt.id)]
+    question_ids = [i for (i,) in db.query(models.TestQuestion.id)]
+    db.close()
+    return attempt_ids, question_ids
+
+
+def drive(save, seconds: float, threads: int, attempt_ids, question_ids) -> int:
+    done = [0] * threads
+    deadline = time.perf_counter() + seconds
+
+    def worker(n: int) -> None:
+        rnd = random.Random(n)
+        while time.perf_counter() < deadline:
+            save(rnd.choice(attempt_ids), {rnd.choice(question_ids): rnd.choice("ABCD")})
+            done[n] += 1
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return sum(done)
+
+
+def direct_save(attempt_id: int, answers: dict[int, str]) -> None:
+    db = SessionLocal()
+    try:
+        write_answers(db, {attempt_id: answers})
+        db.commit()
+    finally:
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--attempts", type=int, default=2000)
+    parser.add_argument("--questions", type=int, default=50)
+    args = parser.parse_args()
+
+    attempt_ids, question_ids = seed(args.attempts, args.questions)
+
+    saves = drive(direct_save, args.seconds, args.threads, attempt_ids, question_ids)
+    print(f"direct commit per save : {saves / args.seconds:10.0f} saves/s")
+
+    buffer = AutosaveBuffer(flush_interval=1.0, write_behind=True)
+    buffer.start()
+    saves = drive(buffer.put, args.seconds, args.threads, attempt_ids, question_ids)
+    buffer.stop()
+    print(f"write-behind buffer    : {saves / args.seconds:10.0f} saves/s "
+          f"({buffer.stats.flushes} flushes, {buffer.stats.rows_written} rows written)")
+
+
+if __name__ == "__main__":
+    main()
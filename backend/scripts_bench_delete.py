@@ -0,0 +1,125 @@
+"""
+Deleting a large test: ORM cascade vs. the set-based DELETE /tests/{id}.
+
+Builds one test with many attempts and answers in a throwaway SQLite file,
+copies the file, then deletes the test once through `session.delete(test)`
+(SQLAlchemy loads and deletes every child row) and once through the API
+endpoint. Reports wall time and peak Python memory for each:
+
+    python scripts_bench_delete.py --attempts 5000 --questions 40   # 200k answers
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+DB_DIR = tempfile.mkdtemp()
+DB_PATH = os.path.join(DB_DIR, "bench_delete.db")
+os.environ["GYANDARSHAK_DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import create_engine, event, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+import main  # noqa: E402
+from app import models  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.question_bank import link_owned_questions  # noqa: E402
+from app.security import create_access_token, hash_password  # noqa: E402
+
+
+def build(attempts: int, questions: int) -> tuple[int, int]:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    admin = models.User(full_name="Admin", email="admin@example.com",
+                        password_hash=hash_password("secret"), role=models.UserRole.admin)
+    db.add(admin)
+    test = models.Test(title="Big", duration_minutes=60, total_marks=questions)
+    db.add(test)
+    db.flush()
+    db.execute(insert(models.TestQuestion), [
+        {"test_id": test.id, "text": f"Q{n}", "option_a": "a", "option_b": "b", "option_c": "c",
+         "option_d": "d", "correct_option": "A", "marks": 1}
+        for n in range(questions)
+    ])
+    link_owned_questions(db)
+    question_ids = [q for (q,) in db.query(models.TestQuestion.id).filter_by(test_id=test.id)]
+    db.execute(insert(models.User), [
+        {"full_name": f"S{n}", "email": f"s{n}@example.com", "password_hash": "x", "role": models.UserRole.student}
+        for n in range(attempts)
+    ])
+    user_ids = [u for (u,) in db.query(models.User.id).filter(models.User.role == models.UserRole.student)]
+    db.execute(insert(models.StudentProfile), [{"user_id": u} for u in user_ids])
+    profile_ids = [p for (p,) in db.query(models.StudentProfile.id)]
+    now = datetime.utcnow()
+    db.execute(insert(models.TestAttempt), [
+        {"test_id": test.id, "student_id": p, "started_at": now, "finished_at": now, "score": 0}
+        for p in profile_ids
+    ])
+    attempt_ids = [a for (a,) in db.query(models.TestAttempt.id)]
+    for start in range(0, len(attempt_ids), 1_000):
+        db.execute(insert(models.TestAnswer), [
+            {"attempt_id": a, "question_id": q, "selected_option": "B"}
+            for a in attempt_ids[start:start + 1_000] for q in question_ids
+        ])
+    db.commit()
+    test_id, admin_id = test.id, admin.id
+    db.close()
+    return test_id, admin_id
+
+
+def measure(fn) -> tuple[float, float]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def main_bench() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--attempts", type=int, default=5_000)
+    parser.add_argument("--questions", type=int, default=40)
+    args = parser.parse_args()
+
+    test_id, admin_id = build(args.attempts, args.questions)
+    copy = os.path.join(DB_DIR, "orm.db")
+    shutil.copy(DB_PATH, copy)
+    print(f"test {test_id}: {args.attempts:,} attempts, {args.attempts * args.questions:,} answers")
+
+    orm_engine = create_engine(f"sqlite:///{copy}")
+
+    @event.listens_for(orm_engine, "connect")
+    def _fk(dbapi_connection, _):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    def orm_delete() -> None:
+        # what the relationships' cascade="all, delete-orphan" did before passive_deletes:
+        # load every child into the session, then DELETE them one by one
+        db = sessionmaker(bind=orm_engine)()
+        test = db.get(models.Test, test_id)
+        for attempt in test.attempts:
+            attempt.answers
+        test.questions
+        db.delete(test)
+        db.commit()
+        db.close()
+
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": str(admin_id), "role": "admin"})}
+    with TestClient(main.app) as client:
+        def api_delete() -> None:
+            client.delete(f"/tests/{test_id}", headers=headers).raise_for_status()
+
+        print(f"{'method':28} {'seconds':>8} {'peak MB':>8}")
+        for name, fn in (("ORM cascade (before)", orm_delete), ("DELETE /tests/{id}", api_delete)):
+            seconds, peak = measure(fn)
+            print(f"{name:28} {seconds:>8.2f} {peak:>8.1f}")
+
+
+if __name__ == "__main__":
+    main_bench()
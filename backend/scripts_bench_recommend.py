@@ -0,0 +1,130 @@
+"""
+Course recommendations at scale: the pre-sorted CourseIndex vs. scoring a
+full scan per request.
+
+Seeds a throwaway SQLite file with scripts_seed.py (1M courses by default),
+builds the index, then ranks the top RECOMMEND_MAX_RESULTS courses for
+random profiles three ways:
+
+- "full scan": what a per-request implementation would do, i.e. SELECT every
+  matching course with its college and score it in Python;
+- "index": CourseIndex.rank, merging the heads of the pre-sorted lists;
+- "endpoint": GET /colleges/recommended, which also caches per profile.
+
+    python scripts_bench_recommend.py --colleges 100000 --courses 10
+"""
+import argparse
+import heapq
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+os.environ["GYANDARSHAK_DATABASE_URL"] = (
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_recommend.db')}"
+)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+from app import models  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.recommend import (  # noqa: E402
+    DISCOUNT_WEIGHT, FEE_WEIGHT, PARTNER_WEIGHT, RECOMMEND_MAX_RESULTS, REGION_MATCH, STATE_WEIGHT,
+    STREAM_WEIGHT, CourseIndex, _REGION_OF, fee_score,
+)
+from app.security import create_access_token  # noqa: E402
+from scripts_seed import STATES, STREAMS, SeedScale, seed_database  # noqa: E402
+
+
+def full_scan(db, stream: str, state: str) -> list[tuple[int, float]]:
+    region = _REGION_OF.get(state.casefold())
+    rows = (
+        db.query(models.Course.id, models.Course.approx_fee_total, models.Course.discount_available,
+                 models.College.is_partner, models.College.state)
+        .join(models.College, models.College.id == models.Course.college_id)
+        .filter(models.Course.stream.ilike(f"%{stream}%"))
+    )
+    scored = []
+    for course_id, fee, discount, partner, course_state in rows:
+        proximity = (1.0 if course_state == state
+                     else REGION_MATCH if region and _REGION_OF.get(course_state.casefold()) == region else 0.0)
+        score = (STREAM_WEIGHT + STATE_WEIGHT * proximity + FEE_WEIGHT * fee_score(fee)
+                 + PARTNER_WEIGHT * bool(partner) + DISCOUNT_WEIGHT * bool(discount))
+        scored.append((score, -course_id))
+    return [(-neg_id, score) for score, neg_id in heapq.nlargest(RECOMMEND_MAX_RESULTS, scored)]
+
+
+def timed(fn, runs: int) -> list[float]:
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - started) * 1000)
+    return times
+
+
+def report(name: str, times: list[float]) -> None:
+    p95 = sorted(times)[max(0, int(len(times) * 0.95) - 1)]
+    print(f"{name:22} {len(times):>5} {statistics.median(times):>9.2f} {p95:>9.2f}")
+
+
+def main_bench() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--colleges", type=int, default=100_000)
+    parser.add_argument("--courses", type=int, default=10, help="courses per college")
+    parser.add_argument("--profiles", type=int, default=200)
+    parser.add_argument("--scan-runs", type=int, default=3)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    seed_database(engine, SeedScale(
+        students=args.profiles, colleges=args.colleges, courses_per_college=args.courses, exams=0,
+        dates_per_exam=0, scholarships=0, tests=0, questions_per_test=0, attempts=0, session_requests=0,
+    ), log=lambda line: None)
+    print(f"seeded {args.colleges * args.courses:,} courses in {time.perf_counter() - started:.1f}s\n")
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    index = CourseIndex.build(db, version=0)
+    build_s = time.perf_counter() - started
+    # a second, traced build for memory; tracing slows it down a lot
+    tracemalloc.start()
+    traced = CourseIndex.build(db, version=0)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del traced
+    print(f"index build: {build_s:.1f}s for {index.size:,} courses, "
+          f"{retained / 2**20:.0f} MB retained, {peak / 2**20:.0f} MB peak\n")
+
+    rnd = random.Random(7)
+    profiles = [(rnd.choice(STREAMS), rnd.choice(STATES)) for _ in range(args.profiles)]
+    print(f"{'method':22} {'runs':>5} {'p50 ms':>9} {'p95 ms':>9}")
+    report("full scan", timed(lambda: full_scan(db, *rnd.choice(profiles)), args.scan_runs))
+
+    def rank_random() -> None:
+        stream, state = rnd.choice(profiles)
+        index.rank(stream, None, state)
+
+    report("index", timed(rank_random, args.profiles))
+    stream, state = profiles[0]
+    check = full_scan(db, stream, state)
+    same = [s for _, s in index.rank(stream, None, state)] == [round(s, 4) for _, s in check]
+    print(f"{'':22} same scores as full scan: {same}")
+
+    student_ids = [u for (u,) in db.query(models.User.id).filter(models.User.role == models.UserRole.student)]
+    db.close()
+    tokens = [create_access_token({"sub": str(u), "role": "student"}) for u in student_ids]
+    with TestClient(main.app) as client:
+        def request() -> None:
+            token = rnd.choice(tokens)
+            client.get("/colleges/recommended", headers={"Authorization": f"Bearer {token}"}).raise_for_status()
+
+        report("endpoint (first)", timed(request, 1))
+        report("endpoint", timed(request, args.profiles))
+
+
+if __name__ == "__main__":
+    main_bench()
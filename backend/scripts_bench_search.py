@@ -0,0 +1,101 @@
+"""
+Query latency of the /ai/ask retrieval index on a synthetic catalog.
+
+Builds documents in memory (no database) and times a mix of English and
+Hindi questions:
+
+    python scripts_bench_search.py --docs 100000 --queries 2000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.search import Document, SearchIndex
+
+STATES = ["Bihar", "Uttar Pradesh", "Maharashtra", "Karnataka", "Rajasthan", "Odisha",
+          "Madhya Pradesh", "Tamil Nadu", "West Bengal", "Gujarat", "Assam", "Punjab"]
+STREAMS = ["engineering", "medical", "law", "commerce", "arts", "science", "design",
+           "management", "pharmacy", "agriculture"]
+EXAMS = ["JEE Main", "JEE Advanced", "NEET UG", "CLAT", "CUET", "BITSAT", "NDA",
+         "MHT CET", "KCET", "WBJEE", "COMEDK", "NIFT", "AIIMS", "GATE", "CAT"]
+HINDI = ["छात्रवृत्ति", "परीक्षा", "कॉलेज", "इंजीनियरिंग", "चिकित्सा", "बिहार",
+         "उत्तर", "प्रदेश", "सरकारी", "आवेदन", "तारीख", "छात्र", "कक्षा", "प्रवेश"]
+QUERIES = [
+    "JEE Main exam dates",
+    "scholarship for class 12 in Bihar",
+    "engineering college in Karnataka with low fee",
+    "NEET UG application date",
+    "law course CLAT Maharashtra",
+    "बिहार छात्रवृत्ति कक्षा 12",
+    "इंजीनियरिंग प्रवेश परीक्षा तारीख",
+    "government scholarship for girls",
+    "pharmacy diploma Rajasthan",
+    "management college Gujarat partner discount",
+]
+
+
+def synthetic_documents(n: int, rnd: random.Random) -> list[Document]:
+    filler = [f"w{i}" for i in range(20_000)]
+    docs = []
+    for i in range(n):
+        kind = rnd.choices(["course", "college", "scholarship", "exam"], weights=[6, 2, 1.5, 0.5])[0]
+        state, stream = rnd.choice(STATES), rnd.choice(STREAMS)
+        words = " ".join(
+            filler[min(int(rnd.paretovariate(1.1)), len(filler) - 1)] for _ in range(rnd.randint(10, 40))
+        )
+        hindi = " ".join(rnd.sample(HINDI, 4))
+        title = {
+            "course": f"B.Tech {stream} {i}",
+            "college": f"{state} Institute of {stream.title()} {i}",
+            "scholarship": f"{state} {stream} scholarship {i}",
+            "exam": f"{rnd.choice(EXAMS)} {i}",
+        }[kind]
+        docs.append(
+            Document(
+                kind=kind,
+                record_id=i,
+                title=title,
+                summary_en=title,
+                text=[state, stream, words, hindi, f"class {rnd.choice([10, 11, 12])}",
+                      f"{rnd.choice(EXAMS)} exam date application"],
+            )
+        )
+    return docs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    args = parser.parse_args()
+
+    rnd = random.Random(7)
+    docs = synthetic_documents(args.docs, rnd)
+    index = SearchIndex()
+    t0 = time.perf_counter()
+    for doc in docs:
+        index.replace_group(doc.key, [doc])
+    print(f"built index of {len(index)} docs in {time.perf_counter() - t0:.1f}s")
+
+    t0 = time.perf_counter()
+    index.replace_group(docs[0].key, [docs[0]])
+    print(f"incremental update: {(time.perf_counter() - t0) * 1000:.3f}ms")
+
+    latencies = []
+    for n in range(args.queries):
+        query = QUERIES[n % len(QUERIES)]
+        t0 = time.perf_counter()
+        index.search(query, limit=3)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    latencies.sort()
+    print(
+        f"query latency over {args.queries} queries: "
+        f"p50={statistics.median(latencies):.2f}ms "
+        f"p99={latencies[int(len(latencies) * 0.99)]:.2f}ms "
+        f"max={latencies[-1]:.2f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
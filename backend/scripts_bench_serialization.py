@@ -0,0 +1,105 @@
+"""
+Catalog response encoding: Pydantic re-validation vs. the trusted ORM path,
+and bytes on the wire with and without compression.
+
+Seeds a throwaway SQLite file with scripts_seed.py, loads each catalog list
+the way its endpoint does, and times:
+
+- "validated": TypeAdapter(list[Model]) validate + dump_json, which is what
+  FastAPI does for a `response_model` route;
+- "trusted": app.responses.trusted_response (no validation, orjson if
+  installed);
+
+then fetches each list, and the pre-built /catalog/en snapshot that holds all
+three, through the app to report raw, gzip and brotli sizes:
+
+    python scripts_bench_serialization.py --colleges 2000 --courses 6
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+TMP_DIR = tempfile.mkdtemp()
+os.environ["GYANDARSHAK_DATABASE_URL"] = f"sqlite:///{os.path.join(TMP_DIR, 'bench_serialization.db')}"
+os.environ["GYANDARSHAK_SNAPSHOT_DIR"] = os.path.join(TMP_DIR, "snapshots")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy.orm import joinedload  # noqa: E402
+
+import main  # noqa: E402
+from app import models  # noqa: E402
+from app.compression import brotli, compress  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.responses import orjson, trusted_response  # noqa: E402
+from app.schemas import CollegeOut, ExamOut, ScholarshipOut  # noqa: E402
+from scripts_seed import SeedScale, seed_database  # noqa: E402
+
+CATALOGS = [
+    ("/colleges/", CollegeOut, lambda db: db.query(models.College).options(joinedload(models.College.courses)).all()),
+    ("/exams/", ExamOut, lambda db: db.query(models.Exam).options(joinedload(models.Exam.dates)).all()),
+    ("/scholarships/", ScholarshipOut, lambda db: db.query(models.Scholarship).all()),
+]
+
+
+def best_of(fn, runs: int) -> tuple[float, bytes]:
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - started)
+    return min(times) * 1000, out
+
+
+def main_bench() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--colleges", type=int, default=2_000)
+    parser.add_argument("--courses", type=int, default=6, help="courses per college")
+    parser.add_argument("--exams", type=int, default=500)
+    parser.add_argument("--scholarships", type=int, default=3_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    seed_database(engine, SeedScale(
+        students=0, colleges=args.colleges, courses_per_college=args.courses, exams=args.exams,
+        dates_per_exam=4, scholarships=args.scholarships, tests=0, questions_per_test=0, attempts=0,
+        session_requests=0,
+    ), log=lambda line: None)
+    print(f"json encoder: {'orjson' if orjson else 'stdlib json'}; brotli: {'yes' if brotli else 'not installed'}\n")
+
+    print(f"{'endpoint':16} {'rows':>6} {'validated ms':>13} {'trusted ms':>11} {'speedup':>8} {'same bytes':>11}")
+    db = SessionLocal()
+    try:
+        for path, model, load in CATALOGS:
+            rows = load(db)
+            adapter = TypeAdapter(list[model])
+            validated_ms, validated = best_of(
+                lambda: adapter.dump_json(adapter.validate_python(rows, from_attributes=True)), args.runs
+            )
+            trusted_ms, trusted = best_of(lambda: trusted_response(model, rows).body, args.runs)
+            print(f"{path:16} {len(rows):>6} {validated_ms:>13.1f} {trusted_ms:>11.1f} "
+                  f"{validated_ms / trusted_ms:>7.1f}x {str(validated == trusted):>11}")
+    finally:
+        db.close()
+
+    print(f"\n{'endpoint':16} {'raw KB':>9} {'gzip KB':>9} {'br KB':>9} {'gzip ms':>8} {'p50 plain ms':>13} "
+          f"{'p50 gzip ms':>12}")
+    with TestClient(main.app) as client:
+        for path in [path for path, _, _ in CATALOGS] + ["/catalog/en"]:
+            raw = client.get(path, headers={"Accept-Encoding": "identity"}).content
+            gzip_ms, gzipped = best_of(lambda: compress(raw, "gzip"), args.runs)
+            br = f"{len(compress(raw, 'br')) / 1024:>9.1f}" if brotli else f"{'-':>9}"
+            plain, encoded = [], []
+            for _ in range(args.runs):
+                for headers, sink in (({"Accept-Encoding": "identity"}, plain), ({"Accept-Encoding": "gzip"}, encoded)):
+                    started = time.perf_counter()
+                    client.get(path, headers=headers).raise_for_status()
+                    sink.append(time.perf_counter() - started)
+            print(f"{path:16} {len(raw) / 1024:>9.1f} {len(gzipped) / 1024:>9.1f} {br} {gzip_ms:>8.1f} "
+                  f"{statistics.median(plain) * 1000:>13.1f} {statistics.median(encoded) * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main_bench()
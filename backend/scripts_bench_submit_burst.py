@@ -0,0 +1,126 @@
+"""
+Exam-deadline burst: every student submits at once, synchronous vs. queued.
+
+Runs the FastAPI app in-process against a throwaway SQLite file:
+
+    python scripts_bench_submit_burst.py --students 300 --questions 50
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ["GYANDARSHAK_DATABASE_URL"] = (
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_burst.db')}"
+)
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+import main  # noqa: E402
+from app import models  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.question_bank import link_owned_questions  # noqa: E402
+from app.security import create_access_token  # noqa: E402
+
+
+def seed(students: int, questions: int) -> tuple[int, list[int], list[dict]]:
+    db = SessionLocal()
+    test = models.Test(title="Burst", duration_minutes=60, total_marks=questions)
+    db.add(test)
+    db.flush()
+    db.execute(
+        insert(models.TestQuestion),
+        [
+            {"test_id": test.id, "text": f"Q{i}", "option_a": "a", "option_b": "b",
+             "option_c": "c", "option_d": "d", "correct_option": "A", "marks": 1}
+            for i in range(questions)
+        ],
+    )
+    link_owned_questions(db)
+    start = db.query(models.User).count()
+    db.execute(
+        insert(models.User),
+        [
+            {"full_name": f"Student {n}", "email": f"burst{start + n}@example.com",
+             "password_hash": "x", "role": models.UserRole.student}
+            for n in range(students)
+        ],
+    )
+    user_ids = [
+        uid for (uid,) in db.query(models.User.id).order_by(models.User.id).offset(start)
+    ]
+    db.execute(insert(models.StudentProfile), [{"user_id": uid} for uid in user_ids])
+    db.commit()
+    question_ids = [qid for (qid,) in db.query(models.TestQuestion.id).filter_by(test_id=test.id)]
+    test_id = test.id
+    db.close()
+    headers = [
+        {"Authorization": "Bearer " + create_access_token({"sub": str(uid), "role": "student"})}
+        for uid in user_ids
+    ]
+    return test_id, question_ids, headers
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def burst(client: TestClient, students: int, questions: int, concurrency: int, queued: bool) -> None:
+    test_id, question_ids, headers = seed(students, questions)
+    attempt_ids = [
+        client.post(f"/tests/{test_id}/start", headers=h).json()["attempt_id"] for h in headers
+    ]
+    body = {"answers": [{"question_id": q, "selected_option": "A"} for q in question_ids]}
+
+    def submit(i: int) -> float:
+        t0 = time.perf_counter()
+        r = client.post(
+            f"/tests/attempts/{attempt_ids[i]}/submit",
+            params={"queued": queued},
+            json=body,
+            headers=headers[i],
+        )
+        r.raise_for_status()
+        return time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(submit, range(students)))
+    accepted = time.perf_counter() - t0
+
+    db = SessionLocal()
+    while db.query(models.TestAttempt).filter(
+        models.TestAttempt.id.in_(attempt_ids), models.TestAttempt.score.is_(None)
+    ).count():
+        db.close()
+        time.sleep(0.05)
+        db = SessionLocal()
+    db.close()
+    graded = time.perf_counter() - t0
+
+    mode = "queued" if queued else "sync"
+    print(
+        f"{mode:6s} p50={statistics.median(latencies) * 1000:7.1f}ms "
+        f"p99={percentile(latencies, 0.99) * 1000:7.1f}ms "
+        f"all accepted={accepted:5.2f}s all graded={graded:5.2f}s"
+    )
+
+
+def main_() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=40)
+    args = parser.parse_args()
+
+    with TestClient(main.app) as client:
+        burst(client, args.students, args.questions, args.concurrency, queued=False)
+        burst(client, args.students, args.questions, args.concurrency, queued=True)
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,90 @@
+"""
+Check every app.cache backend and cross-worker invalidation.
+
+Each worker is simulated by its own Cache over its own backend connection to
+the same store (a shared SQLite file, the RESP stand-in from
+scripts_resp_server.py). The in-memory backend is checked on its own, since
+it cannot be shared:
+
+    python scripts_check_cache.py
+
+Exits non-zero on the first failed check.
+"""
+import os
+import sys
+import tempfile
+import time
+
+from app.cache import Cache, MemoryBackend, RedisBackend, SQLiteBackend, VersionWatch
+from scripts_resp_server import start_in_thread
+
+POLL = 0.05
+
+
+def check(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+
+
+def check_backend(name: str, backend) -> None:
+    check(backend.get("missing") is None, f"{name}: missing key")
+    backend.set("k", b"v", ttl=60)
+    check(backend.get("k") == b"v", f"{name}: get after set")
+    backend.set("short", b"x", ttl=0.05)
+    time.sleep(0.1)
+    check(backend.get("short") is None, f"{name}: ttl expiry")
+    backend.delete("k")
+    check(backend.get("k") is None, f"{name}: delete")
+    check(backend.counter("c") == 0, f"{name}: fresh counter")
+    check([backend.incr("c") for _ in range(3)] == [1, 2, 3], f"{name}: incr")
+    check(backend.counter("c") == 3, f"{name}: counter read")
+    print(f"{name}: backend ok")
+
+
+def check_workers(name: str, make_backend) -> None:
+    a, b = Cache(make_backend(), version_poll=POLL), Cache(make_backend(), version_poll=POLL)
+    a.set("catalog", "colleges", {"n": 1})
+    check(b.get("catalog", "colleges") == {"n": 1}, f"{name}: shared entry visible to the other worker")
+
+    watch_a = VersionWatch(a, "catalog")
+    watch_a.reset()
+    b.invalidate("catalog")
+    time.sleep(POLL * 2)
+    check(a.get("catalog", "colleges") is None, f"{name}: other worker's invalidation")
+    check(watch_a.changed_elsewhere(), f"{name}: watch sees the remote bump")
+
+    a.invalidate("catalog")
+    check(not watch_a.changed_elsewhere(), f"{name}: watch ignores its own bump")
+
+    version = a.version("catalog")
+    b.invalidate("catalog")
+    time.sleep(POLL * 2)
+    a.set("catalog", "colleges", {"n": 2}, version=version)
+    check(a.get("catalog", "colleges") is None, f"{name}: value computed before a bump is not stored")
+    print(f"{name}: cross-worker invalidation ok")
+
+
+def main_check() -> int:
+    check_backend("memory", MemoryBackend())
+    memory = Cache(MemoryBackend())
+    memory.set("ns", "k", [1, 2])
+    check(memory.get("ns", "k") == [1, 2], "memory: cache round trip")
+    memory.invalidate("ns")
+    check(memory.get("ns", "k") is None, "memory: invalidate")
+
+    path = os.path.join(tempfile.mkdtemp(), "cache.db")
+    check_backend("sqlite", SQLiteBackend(path))
+    check_workers("sqlite", lambda: SQLiteBackend(path))
+
+    host, port = start_in_thread()
+    check_backend("redis", RedisBackend(host, port, db=1))
+    check_workers("redis", lambda: RedisBackend(host, port, db=2))
+
+    dead = Cache(RedisBackend("127.0.0.1", 1, timeout=0.2))
+    check(dead.get("ns", "k") is None and dead.stats.errors > 0, "unreachable backend is a miss, not an error")
+    print("ok")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_check())
@@ -0,0 +1,40 @@
+"""
+Report rows left behind by deletes from before foreign keys were enforced
+(see app/integrity.py), and with --delete resolve them the way the models'
+ON DELETE says. Without --delete nothing is changed. SQLite only.
+
+    python scripts_clean_orphans.py
+    python scripts_clean_orphans.py --delete
+"""
+import argparse
+import time
+
+from app.database import engine
+from app.integrity import find_orphans, remove_orphans
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--delete", action="store_true", help="delete or clear the orphaned rows")
+    args = parser.parse_args()
+    if engine.dialect.name != "sqlite":
+        parser.error("only SQLite databases can hold orphaned rows; the others always enforce foreign keys")
+
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        orphans = find_orphans(conn)
+        for o in orphans:
+            print(o if o.fixable else f"{o}  <- needs a manual fix")
+        if not orphans:
+            print("no orphaned rows")
+        elif args.delete:
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            removed = remove_orphans(conn)
+            conn.commit()
+            print(f"resolved {sum(len(o.rowids) for o in removed)} rows in {time.perf_counter() - started:.1f}s")
+        else:
+            print("nothing changed; run again with --delete to resolve the fixable rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Add questions from a CSV or JSON file to a test: the command-line twin of
+POST /tests/{test_id}/questions/import, without its per-upload row limit.
+
+    python scripts_import_questions.py 12 physics_bank.csv
+
+See app/question_bank.py for the accepted formats.
+"""
+import argparse
+import time
+
+from app.database import SessionLocal
+from app.question_bank import QUESTION_IMPORT_CHUNK_ROWS, import_questions
+from app import models
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("test_id", type=int)
+    parser.add_argument("file")
+    parser.add_argument("--chunk-rows", type=int, default=QUESTION_IMPORT_CHUNK_ROWS)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        if db.get(models.Test, args.test_id) is None:
+            parser.error(f"test {args.test_id} does not exist")
+        with open(args.file, encoding="utf-8-sig", newline="") as f:
+            report = import_questions(db, args.test_id, f, chunk_rows=args.chunk_rows)
+    finally:
+        db.close()
+
+    for error in report.errors:
+        print(f"item {error.item}: {error.reason}")
+    print(f"created {report.created}, reused {report.reused}, skipped {report.skipped}; "
+          f"test total {report.total_marks} marks, in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
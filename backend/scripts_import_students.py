@@ -0,0 +1,40 @@
+"""
+Register students from a CSV file: the command-line twin of
+POST /students/import, without its per-upload row limit.
+
+    python scripts_import_students.py students.csv --workers 8
+
+See app/onboarding.py for the expected columns.
+"""
+import argparse
+import time
+
+from app.database import SessionLocal
+from app.onboarding import HASH_WORKERS, ONBOARD_CHUNK_ROWS, PasswordHasher, import_students
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv_file")
+    parser.add_argument("--chunk-rows", type=int, default=ONBOARD_CHUNK_ROWS)
+    parser.add_argument("--workers", type=int, default=HASH_WORKERS, help="password hashing processes")
+    args = parser.parse_args()
+
+    hasher = PasswordHasher(args.workers)
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        with open(args.csv_file, encoding="utf-8-sig", newline="") as f:
+            report = import_students(db, f, hasher=hasher, chunk_rows=args.chunk_rows)
+    finally:
+        db.close()
+        hasher.stop()
+
+    for error in report.errors:
+        print(f"line {error.line}: {error.email or '-'}: {error.reason}")
+    print(f"created {report.created}, skipped {report.skipped} "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+A tiny in-memory server speaking the Redis protocol (RESP2), for developing
+and checking app.cache's RedisBackend without a real Redis:
+
+    python scripts_resp_server.py --port 6399
+    GYANDARSHAK_CACHE_URL=redis://127.0.0.1:6399/0 uvicorn main:app --workers 4
+
+Supports PING, SELECT, GET, SET (EX/PX), DEL, INCR, EXISTS, FLUSHDB and
+DBSIZE. Data lives in this process only.
+"""
+import argparse
+import asyncio
+import threading
+import time
+
+
+class RespStandIn:
+    def __init__(self):
+        self._dbs: dict[int, dict[bytes, tuple[bytes, float | None]]] = {}
+
+    def _live(self, db: dict, key: bytes) -> bytes | None:
+        entry = db.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del db[key]
+            return None
+        return value
+
+    def execute(self, state: dict, args: list[bytes]) -> bytes:
+        command = args[0].upper()
+        db = self._dbs.setdefault(state["db"], {})
+        if command == b"PING":
+            return b"+PONG\r\n"
+        if command == b"SELECT":
+            state["db"] = int(args[1])
+            return b"+OK\r\n"
+        if command == b"GET":
+            value = self._live(db, args[1])
+            return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+        if command == b"SET":
+            expires_at = None
+            options = [a.upper() for a in args[3:]]
+            if b"PX" in options:
+                expires_at = time.monotonic() + int(args[3 + options.index(b"PX") + 1]) / 1000
+            elif b"EX" in options:
+                expires_at = time.monotonic() + int(args[3 + options.index(b"EX") + 1])
+            db[args[1]] = (args[2], expires_at)
+            return b"+OK\r\n"
+        if command == b"DEL":
+            removed = sum(1 for key in args[1:] if self._live(db, key) is not None and db.pop(key))
+            return b":%d\r\n" % removed
+        if command == b"EXISTS":
+            return b":%d\r\n" % sum(1 for key in args[1:] if self._live(db, key) is not None)
+        if command == b"INCR":
+            current = self._live(db, args[1])
+            try:
+                value = int(current or 0) + 1
+            except ValueError:
+                return b"-ERR value is not an integer or out of range\r\n"
+            db[args[1]] = (str(value).encode(), db.get(args[1], (None, None))[1])
+            return b":%d\r\n" % value
+        if command == b"FLUSHDB":
+            db.clear()
+            return b"+OK\r\n"
+        if command == b"DBSIZE":
+            return b":%d\r\n" % len(db)
+        return b"-ERR unknown command '%s'\r\n" % args[0]
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        state = {"db": 0}
+        try:
+            while True:
+                header = await reader.readline()
+                if not header:
+                    break
+                if not header.startswith(b"*"):
+                    writer.write(b"-ERR only RESP arrays are supported\r\n")
+                    continue
+                args = []
+                for _ in range(int(header[1:])):
+                    length = int((await reader.readline())[1:])
+                    args.append((await reader.readexactly(length + 2))[:-2])
+                writer.write(self.execute(state, args))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def start_in_thread(host: str = "127.0.0.1", port: int = 0) -> tuple[str, int]:
+    """Serve from a daemon thread; returns the bound (host, port)."""
+    bound = threading.Event()
+    address: list = []
+
+    def run() -> None:
+        loop = asyncio.new_event_loop()
+        server = loop.run_until_complete(asyncio.start_server(RespStandIn().handle, host, port))
+        address.extend(server.sockets[0].getsockname()[:2])
+        bound.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, name="resp-stand-in", daemon=True).start()
+    bound.wait()
+    return address[0], address[1]
+
+
+async def serve(host: str, port: int) -> None:
+    server = await asyncio.start_server(RespStandIn().handle, host, port)
+    print(f"RESP stand-in listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6399)
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port))
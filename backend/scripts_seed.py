@@ -0,0 +1,305 @@
+"""
+Populate a database with synthetic Gyandarshak data for load testing.
+
+Rows are generated in chunks and written with executemany INSERTs, one
+transaction per chunk, with explicit ids so foreign keys never need a
+read-back. Every seeded user's password is SEED_PASSWORD. The target
+database must be named explicitly, never the app's own gyandarshak.db by
+default: the load runs with synchronous=OFF.
+
+    python scripts_seed.py --database-url sqlite:///./seed.db                  # ~260k rows
+    python scripts_seed.py --database-url sqlite:///./big.db --scale large     # ~10M rows
+    python scripts_seed.py --database-url sqlite:///./seed.db --scale medium --attempts 0
+
+Seed into an empty database: ids continue from the current maximum, but
+unique emails assume no earlier seed run used the same prefix.
+"""
+import argparse
+import os
+import random
+import time
+from dataclasses import dataclass, fields, replace
+from datetime import date, datetime, timedelta
+from typing import Callable, Iterator
+
+if __name__ == "__main__":
+    # must be set before app.database is imported
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url")
+    _known, _ = parser.parse_known_args()
+    if _known.database_url:
+        os.environ["GYANDARSHAK_DATABASE_URL"] = _known.database_url
+
+from sqlalchemy import func, insert  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+
+from app import models  # noqa: E402
+from app.database import Base, engine  # noqa: E402
+from app.question_bank import link_owned_questions  # noqa: E402
+from app.security import hash_password  # noqa: E402
+
+SEED_PASSWORD = "password"
+SEED_EMAIL_PREFIX = "seed"
+SEED_CHUNK_ROWS = 20_000
+
+STATES = ["Bihar", "Uttar Pradesh", "Maharashtra", "Karnataka", "Rajasthan", "Odisha",
+          "Madhya Pradesh", "Tamil Nadu", "West Bengal", "Gujarat", "Jharkhand", "Delhi"]
+CITIES = {
+    "Bihar": ["Patna", "Gaya", "Muzaffarpur"], "Uttar Pradesh": ["Lucknow", "Kanpur", "Varanasi"],
+    "Maharashtra": ["Pune", "Mumbai", "Nagpur"], "Karnataka": ["Bengaluru", "Mysuru"],
+    "Rajasthan": ["Jaipur", "Kota"], "Odisha": ["Bhubaneswar", "Cuttack"],
+    "Madhya Pradesh": ["Indore", "Bhopal"], "Tamil Nadu": ["Chennai", "Coimbatore"],
+    "West Bengal": ["Kolkata", "Durgapur"], "Gujarat": ["Ahmedabad", "Surat"],
+    "Jharkhand": ["Ranchi", "Dhanbad"], "Delhi": ["New Delhi"],
+}
+STREAMS = ["engineering", "medical", "law", "commerce", "arts", "science", "management", "pharmacy"]
+EXAM_NAMES = ["JEE Main", "JEE Advanced", "NEET UG", "CLAT", "CUET", "BITSAT", "NDA", "MHT CET",
+              "KCET", "WBJEE", "COMEDK", "NIFT", "CAT", "GATE", "BCECE", "UPSEE"]
+EVENT_TYPES = ["application_start", "application_end", "exam_date", "result_date"]
+CLASS_LEVELS = ["9", "10", "11", "12", "UG"]
+TIME_BANDS = ["Morning", "Afternoon", "Evening"]
+
+
+@dataclass
+class SeedScale:
+    students: int
+    colleges: int
+    courses_per_college: int
+    exams: int
+    dates_per_exam: int
+    scholarships: int
+    tests: int
+    questions_per_test: int
+    attempts: int
+    session_requests: int
+
+
+SCALES = {
+    # ~260k rows, most of them test answers
+    "small": SeedScale(1_000, 200, 5, 100, 4, 300, 20, 50, 5_000, 2_000),
+    # ~2.7M rows
+    "medium": SeedScale(10_000, 2_000, 5, 500, 4, 3_000, 100, 50, 50_000, 20_000),
+    # ~10M rows
+    "large": SeedScale(100_000, 10_000, 6, 1_000, 4, 10_000, 500, 50, 190_000, 100_000),
+}
+
+
+def _chunks(rows: Iterator[dict], size: int) -> Iterator[list[dict]]:
+    chunk: list[dict] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _next_id(conn, model) -> int:
+    return (conn.execute(func.max(model.id).select()).scalar() or 0) + 1
+
+
+class Seeder:
+    def __init__(self, bind: Engine, scale: SeedScale, seed: int = 42, chunk_rows: int = SEED_CHUNK_ROWS,
+                 log: Callable[[str], None] = print):
+        self.bind = bind
+        self.scale = scale
+        self.rnd = random.Random(seed)
+        self.chunk_rows = chunk_rows
+        self.log = log
+        self.counts: dict[str, int] = {}
+
+    def _write(self, model, make_rows: Callable[[int], Iterator[dict]]) -> int:
+        """Insert rows from make_rows(first_id); returns that first id."""
+        started = time.perf_counter()
+        written = 0
+        with self.bind.connect() as conn:
+            # bulk load: skip fsync per chunk, restored before the connection goes back to the pool
+            conn.exec_driver_sql("PRAGMA synchronous=OFF")
+            try:
+                first_id = _next_id(conn, model)
+                for chunk in _chunks(make_rows(first_id), self.chunk_rows):
+                    conn.execute(insert(model), chunk)
+                    conn.commit()
+                    written += len(chunk)
+            finally:
+                conn.exec_driver_sql("PRAGMA synchronous=FULL")
+        table = model.__tablename__
+        self.counts[table] = self.counts.get(table, 0) + written
+        self.log(f"  {table:28} {written:>10,} rows  {time.perf_counter() - started:6.1f}s")
+        return first_id
+
+    def run(self) -> dict[str, int]:
+        s, rnd = self.scale, self.rnd
+        today = date.today()
+        now = datetime.utcnow()
+        password_hash = hash_password(SEED_PASSWORD)  # one hash shared by every seeded user
+
+        def users(first_id):
+            for n in range(s.students):
+                yield {"id": first_id + n, "full_name": f"Student {first_id + n}",
+                       "email": f"{SEED_EMAIL_PREFIX}{first_id + n}@example.com",
+                       "password_hash": password_hash, "role": models.UserRole.student}
+
+        first_user = self._write(models.User, users)
+
+        def profiles(first_id):
+            for n in range(s.students):
+                state = rnd.choice(STATES)
+                yield {"id": first_id + n, "user_id": first_user + n, "state": state,
+                       "district": rnd.choice(CITIES[state]), "class_level": rnd.choice(CLASS_LEVELS),
+                       "stream_interest": rnd.choice(STREAMS), "target_field": rnd.choice(STREAMS)}
+
+        first_profile = self._write(models.StudentProfile, profiles)
+
+        def colleges(first_id):
+            for n in range(s.colleges):
+                state = rnd.choice(STATES)
+                yield {"id": first_id + n, "name": f"{rnd.choice(CITIES[state])} Institute {first_id + n}",
+                       "state": state, "city": rnd.choice(CITIES[state]),
+                       "website_url": f"https://college{first_id + n}.example.in",
+                       "is_partner": rnd.random() < 0.1, "notes": None}
+
+        first_college = self._write(models.College, colleges)
+
+        def courses(first_id):
+            n = 0
+            for c in range(s.colleges):
+                for _ in range(s.courses_per_college):
+                    stream = rnd.choice(STREAMS)
+                    discount = rnd.random() < 0.2
+                    yield {"id": first_id + n, "college_id": first_college + c,
+                           "name": f"{stream.title()} {rnd.choice(['B.Tech', 'B.Sc', 'BA', 'MBBS', 'LLB', 'B.Com'])}",
+                           "level": rnd.choice(["UG", "PG", "Diploma"]), "duration_years": rnd.choice([2, 3, 4, 5]),
+                           "approx_fee_total": float(rnd.randrange(20_000, 1_500_000, 5_000)), "stream": stream,
+                           "entrance_exam": rnd.choice(EXAM_NAMES), "discount_available": discount,
+                           "discount_details": "10% for Gyandarshak students" if discount else None}
+                    n += 1
+
+        self._write(models.Course, courses)
+
+        def exams(first_id):
+            for n in range(s.exams):
+                name = f"{rnd.choice(EXAM_NAMES)} {first_id + n}"
+                yield {"id": first_id + n, "name": name, "level": rnd.choice(["national", "state", "college"]),
+                       "stream": rnd.choice(STREAMS), "official_website": f"https://exam{first_id + n}.example.in",
+                       "description_en": f"{name} entrance examination",
+                       "description_hi": f"{name} प्रवेश परीक्षा"}
+
+        first_exam = self._write(models.Exam, exams)
+
+        def exam_dates(first_id):
+            n = 0
+            for e in range(s.exams):
+                day = today + timedelta(days=rnd.randint(-60, 240))
+                for k in range(s.dates_per_exam):
+                    yield {"id": first_id + n, "exam_id": first_exam + e, "year": day.year,
+                           "event_type": EVENT_TYPES[k % len(EVENT_TYPES)], "date": day + timedelta(days=30 * k)}
+                    n += 1
+
+        self._write(models.ExamDate, exam_dates)
+
+        def scholarships(first_id):
+            for n in range(s.scholarships):
+                state = rnd.choice(STATES + [None])
+                yield {"id": first_id + n, "name": f"{state or 'National'} Merit Scholarship {first_id + n}",
+                       "provider_type": rnd.choice(["government", "trust", "private"]),
+                       "provider_name": f"Provider {n % 500}", "level": rnd.choice(["school", "UG", "PG"]),
+                       "min_class_or_course": rnd.choice(CLASS_LEVELS),
+                       "eligibility_summary_en": f"Students of class {rnd.choice(CLASS_LEVELS)}"
+                                                 f"{' from ' + state if state else ''}",
+                       "eligibility_summary_hi": None,
+                       "amount_description": f"Rs {rnd.randrange(5_000, 100_000, 1_000)} per year",
+                       "application_url": f"https://scholarship{first_id + n}.example.in", "state": state,
+                       "last_date": today + timedelta(days=rnd.randint(-30, 180))}
+
+        self._write(models.Scholarship, scholarships)
+
+        def tests(first_id):
+            for n in range(s.tests):
+                yield {"id": first_id + n, "title": f"Practice Test {first_id + n}", "description": None,
+                       "duration_minutes": 60, "total_marks": s.questions_per_test, "is_active": True}
+
+        first_test = self._write(models.Test, tests)
+
+        def questions(first_id):
+            n = 0
+            for t in range(s.tests):
+                for q in range(s.questions_per_test):
+                    yield {"id": first_id + n, "test_id": first_test + t, "text": f"Question {q + 1}",
+                           "option_a": "A", "option_b": "B", "option_c": "C", "option_d": "D",
+                           "correct_option": rnd.choice("ABCD"), "marks": 1}
+                    n += 1
+
+        first_question = self._write(models.TestQuestion, questions)
+        with self.bind.begin() as conn:
+            self.counts["test_question_links"] = link_owned_questions(conn)
+
+        attempt_plan: list[tuple[int, int]] = []  # (test index, score)
+
+        def attempts(first_id):
+            for n in range(s.attempts):
+                t = rnd.randrange(s.tests) if s.tests else 0
+                score = rnd.randint(0, s.questions_per_test)
+                attempt_plan.append((t, score))
+                started = now - timedelta(minutes=rnd.randint(90, 60 * 24 * 365))
+                yield {"id": first_id + n, "test_id": first_test + t,
+                       "student_id": first_profile + rnd.randrange(s.students),
+                       "started_at": started, "finished_at": started + timedelta(minutes=rnd.randint(5, 60)),
+                       "score": score}
+
+        if s.tests and s.students:
+            first_attempt = self._write(models.TestAttempt, attempts)
+
+            def answers(first_id):
+                n = 0
+                for a, (t, _) in enumerate(attempt_plan):
+                    base = first_question + t * s.questions_per_test
+                    for q in range(s.questions_per_test):
+                        yield {"id": first_id + n, "attempt_id": first_attempt + a, "question_id": base + q,
+                               "selected_option": rnd.choice("ABCD")}
+                        n += 1
+
+            self._write(models.TestAnswer, answers)
+
+        def session_requests(first_id):
+            for n in range(s.session_requests):
+                yield {"id": first_id + n, "student_id": first_profile + rnd.randrange(s.students),
+                       "preferred_date": today + timedelta(days=rnd.randint(-30, 30)),
+                       "preferred_time": rnd.choice(TIME_BANDS), "mode": rnd.choice(["online", "offline"]),
+                       "note": None, "status": rnd.choice(["pending", "pending", "approved", "done", "rejected"]),
+                       "created_at": now - timedelta(minutes=rnd.randint(1, 60 * 24 * 60)), "slot_id": None}
+
+        if s.students:
+            self._write(models.SessionRequest, session_requests)
+        return self.counts
+
+
+def seed_database(bind: Engine, scale: SeedScale, seed: int = 42, log: Callable[[str], None] = print) -> dict[str, int]:
+    """Create the schema if needed and insert `scale` worth of rows."""
+    Base.metadata.create_all(bind=bind)
+    return Seeder(bind, scale, seed=seed, log=log).run()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True, help="e.g. sqlite:///./seed.db")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    for f in fields(SeedScale):
+        parser.add_argument(f"--{f.name.replace('_', '-')}", type=int, dest=f.name,
+                            help=f"override the preset's {f.name}")
+    args = parser.parse_args()
+
+    overrides = {f.name: getattr(args, f.name) for f in fields(SeedScale) if getattr(args, f.name) is not None}
+    scale = replace(SCALES[args.scale], **overrides)
+    print(f"seeding {engine.url} with {scale}")
+    started = time.perf_counter()
+    counts = seed_database(engine, scale, seed=args.seed)
+    total = sum(counts.values())
+    elapsed = time.perf_counter() - started
+    print(f"done: {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
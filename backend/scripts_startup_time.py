@@ -0,0 +1,98 @@
+"""
+Worker startup time: how long a fresh process takes to import the app, run
+the lifespan startup and answer its first request.
+
+Every sample runs in its own interpreter, so module caches are cold the way
+they are after a deploy. Both schema-check modes are measured against an
+already created database:
+
+    python scripts_startup_time.py --runs 7
+    python scripts_startup_time.py --database-url sqlite:///./gyandarshak.db
+    python scripts_startup_time.py --importtime 15   # slowest imports
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PHASES = ("import", "startup", "first_request")
+
+
+def child() -> None:
+    """Runs inside the measured interpreter; prints one JSON sample."""
+    started = time.perf_counter()
+    import main
+    from fastapi.testclient import TestClient
+
+    imported = time.perf_counter()
+    with TestClient(main.app) as client:
+        ready = time.perf_counter()
+        client.get("/").raise_for_status()
+        answered = time.perf_counter()
+    print(json.dumps({
+        "import": imported - started,
+        "startup": ready - imported,
+        "first_request": answered - ready,
+    }))
+
+
+def sample(env: dict) -> dict:
+    out = subprocess.run(
+        [sys.executable, __file__, "--child"], env=env, capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)), check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def importtime(env: dict, top: int) -> None:
+    err = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"], env=env, capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)), check=True,
+    ).stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+        rows.append((int(cumulative_us), int(self_us), name.strip()))
+    print(f"{'module':50} {'cumulative ms':>14} {'self ms':>8}")
+    for cumulative_us, self_us, name in sorted(rows, reverse=True)[:top]:
+        print(f"{name:50} {cumulative_us / 1000:>14.1f} {self_us / 1000:>8.1f}")
+
+
+def main_startup() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--database-url", help="default: a throwaway SQLite file")
+    parser.add_argument("--importtime", type=int, metavar="N", help="list the N slowest imports and exit")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child()
+        return
+
+    env = dict(os.environ)
+    env["GYANDARSHAK_DATABASE_URL"] = args.database_url or (
+        f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'startup.db')}"
+    )
+    if args.importtime:
+        importtime(env, args.importtime)
+        return
+
+    # the first run creates the throwaway schema; it is not counted
+    sample({**env, "GYANDARSHAK_SCHEMA_CHECK": "1"})
+    print(f"{'schema check':14} " + " ".join(f"{p + ' ms':>18}" for p in PHASES) + f" {'total ms':>10}")
+    for mode in ("1", "0"):
+        runs = [sample({**env, "GYANDARSHAK_SCHEMA_CHECK": mode}) for _ in range(args.runs)]
+        medians = {p: statistics.median(r[p] for r in runs) * 1000 for p in PHASES}
+        total = statistics.median(sum(r.values()) for r in runs) * 1000
+        print(f"{'on' if mode == '1' else 'off':14} " + " ".join(f"{medians[p]:>18.1f}" for p in PHASES)
+              + f" {total:>10.1f}")
+
+
+if __name__ == "__main__":
+    main_startup()
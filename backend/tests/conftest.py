@@ -0,0 +1,119 @@
+"""
+Shared fixtures: the app runs in-process against a throwaway SQLite file,
+with query budgets in strict mode so a request over its endpoint's
+@query_budget comes back as a 500.
+"""
+import os
+import re
+import tempfile
+import time
+from datetime import date, timedelta
+
+TMP_DIR = tempfile.mkdtemp()
+os.environ["GYANDARSHAK_DATABASE_URL"] = f"sqlite:///{os.path.join(TMP_DIR, 'tests.db')}"
+os.environ["GYANDARSHAK_SNAPSHOT_DIR"] = os.path.join(TMP_DIR, "snapshots")
+os.environ["GYANDARSHAK_QUERY_BUDGET_MODE"] = "strict"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+from app import models  # noqa: E402
+from app.cache import CATALOG, cache  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.recommend import recommender  # noqa: E402
+from app.search import get_search_index  # noqa: E402
+
+# long enough lists that a per-row lazy load shows up as a budget failure
+ROWS = 25
+QUERIES_RE = re.compile(r'desc="(\d+) queries"')
+
+QUESTIONS = [
+    {"text": f"Q{k}", "option_a": "a", "option_b": "b", "option_c": "c", "option_d": "d",
+     "correct_option": "A", "marks": 1}
+    for k in range(5)
+]
+
+
+def queries_of(response) -> int:
+    """SQL statements the request ran, from its Server-Timing header."""
+    match = QUERIES_RE.search(response.headers.get("server-timing", ""))
+    return int(match.group(1)) if match else -1
+
+
+def wait_for_recommendations(timeout: float = 10.0) -> None:
+    """Until the background-built recommendation index covers the current catalog."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        index = recommender.index()
+        if index is not None and index.version == cache.version(CATALOG):
+            return
+        time.sleep(0.05)
+    raise TimeoutError("recommendation index was not rebuilt")
+
+
+def register(client: TestClient, email: str, name: str) -> dict:
+    r = client.post("/auth/register", json={"full_name": name, "email": email, "password": "secret"})
+    r.raise_for_status()
+    token = client.post("/auth/login", data={"username": email, "password": "secret"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def seeded(client) -> dict:
+    # built first, so every catalog write below also pays for updating it
+    get_search_index()
+    admin = register(client, "admin@example.com", "Admin")
+    db = SessionLocal()
+    db.query(models.User).filter_by(email="admin@example.com").update({"role": models.UserRole.admin})
+    db.commit()
+    db.close()
+    student = register(client, "student@example.com", "Student")
+    client.patch("/students/me", json={"state": "Bihar", "class_level": "12", "stream_interest": "engineering"},
+                 headers=student)
+
+    for n in range(ROWS):
+        client.post("/colleges/", headers=admin, json={
+            "name": f"College {n}", "state": "Bihar", "city": "Patna",
+            "courses": [{"name": f"B.Tech {k}", "stream": "engineering"} for k in range(3)],
+        })
+        client.post("/exams/", headers=admin, json={
+            "name": f"Exam {n}", "stream": "engineering",
+            "dates": [{"year": 2026, "event_type": "exam_date", "date": "2026-05-01"},
+                      {"year": 2026, "event_type": "result_date", "date": "2026-06-01"}],
+        })
+        client.post("/scholarships/", headers=admin, json={"name": f"Scholarship {n}", "state": "Bihar"})
+
+    test_ids = [
+        client.post("/tests/", headers=admin, json={"title": f"Test {n}", "questions": QUESTIONS}).json()["id"]
+        for n in range(ROWS)
+    ]
+    attempt_ids = []
+    for test_id in test_ids:
+        start = client.post(f"/tests/{test_id}/start", headers=student).json()
+        answers = [{"question_id": q["id"], "selected_option": "A"} for q in start["test"]["questions"]]
+        client.post(f"/tests/attempts/{start['attempt_id']}/submit", headers=student, json={"answers": answers})
+        attempt_ids.append(start["attempt_id"])
+    open_attempt = client.post(f"/tests/{test_ids[0]}/start", headers=student).json()
+
+    day = date.today() + timedelta(days=3)
+    request_ids = [
+        client.post("/sessions/", headers=student, json={
+            "mode": "online", "preferred_date": day.isoformat(), "preferred_time": "Morning",
+            "note": f"Topic {n}",
+        }).json()["id"]
+        for n in range(ROWS)
+    ]
+    wait_for_recommendations()
+    return {
+        "admin": admin, "student": student, "test_id": test_ids[0], "attempt_id": attempt_ids[0],
+        "open_attempt": open_attempt, "request_id": request_ids[0], "day": day.isoformat(),
+        "doomed_test_id": test_ids[-1],
+        "snapshot_digest": client.get("/catalog/en").headers["etag"].strip('"'),
+    }
@@ -0,0 +1,32 @@
+"""Admin attempt listing: keyset pages over live attempts, a fixed query count per page."""
+from conftest import QUESTIONS, queries_of
+
+ATTEMPTS = 12
+
+
+def test_attempt_pages_cost_the_same_queries(client, seeded):
+    admin, student = seeded["admin"], seeded["student"]
+    test_id = client.post("/tests/", headers=admin, json={"title": "Paged", "questions": QUESTIONS}).json()["id"]
+    for _ in range(ATTEMPTS):
+        start = client.post(f"/tests/{test_id}/start", headers=student).json()
+        client.post(f"/tests/attempts/{start['attempt_id']}/submit", headers=student, json={"answers": []})
+
+    seen, counts, cursor = [], [], None
+    while True:
+        params = {"limit": 5, **({"cursor": cursor} if cursor else {})}
+        r = client.get(f"/tests/{test_id}/attempts", headers=admin, params=params)
+        assert r.status_code == 200, r.text
+        seen += [row["attempt_id"] for row in r.json()]
+        counts.append(queries_of(r))
+        cursor = r.headers.get("x-next-cursor")
+        if not cursor:
+            break
+
+    assert len(seen) == ATTEMPTS
+    assert seen == sorted(seen, reverse=True)
+    # user, test, one page select: no per-row loads, however many rows
+    assert counts == [3, 3, 3]
+
+    r = client.get(f"/tests/{test_id}/attempts", headers=admin, params={"limit": 100})
+    assert len(r.json()) == ATTEMPTS and queries_of(r) == 3
+    assert "x-next-cursor" not in r.headers
@@ -0,0 +1,66 @@
+"""Archived attempts keep their ids, so attempt ids must never be handed out twice."""
+import sqlite3
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app import models
+from app.archive import archive_attempts
+from app.database import Base
+from app.schema import ensure_schema
+
+
+def _database(tmp_path) -> str:
+    path = str(tmp_path / "archive.db")
+    Base.metadata.create_all(create_engine(f"sqlite:///{path}"))
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        INSERT INTO users (id, full_name, email, password_hash, role) VALUES (1, 'S', 's@example.com', 'x', 'student');
+        INSERT INTO student_profiles (id, user_id) VALUES (1, 1);
+        INSERT INTO tests (id, title, duration_minutes, total_marks, is_active) VALUES (1, 'T', 30, 1, 1);
+    """)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _attempt(db: Session, started_at: datetime) -> models.TestAttempt:
+    attempt = models.TestAttempt(test_id=1, student_id=1, started_at=started_at, finished_at=started_at, score=1)
+    db.add(attempt)
+    db.commit()
+    return attempt
+
+
+def test_newest_attempt_can_be_archived(tmp_path):
+    engine = create_engine(f"sqlite:///{_database(tmp_path)}")
+    old = datetime.utcnow() - timedelta(days=400)
+    with Session(engine) as db:
+        archived = [_attempt(db, old).id for _ in range(3)]
+        assert archive_attempts(db, datetime.utcnow()).attempts == 3
+
+        assert _attempt(db, datetime.utcnow()).id > max(archived)
+
+
+def test_schema_check_adds_autoincrement_past_archived_ids(tmp_path):
+    path = _database(tmp_path)
+    conn = sqlite3.connect(path)
+    ddl = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'test_attempts'").fetchone()[0]
+    conn.executescript(f"""
+        DROP TABLE test_attempts;
+        {ddl.replace(" AUTOINCREMENT", "")};
+        INSERT INTO test_attempts (id, test_id, student_id, started_at) VALUES (3, 1, 1, '2025-01-01');
+        INSERT INTO archived_attempts (id, test_id, student_id, started_at, answers_zlib, archived_at)
+        VALUES (9, 1, 1, '2024-01-01', x'00', '2025-01-01');
+    """)
+    conn.close()
+
+    engine = create_engine(f"sqlite:///{path}")
+    report = ensure_schema(engine)
+    assert report.rebuilt_tables == ["test_attempts"]
+    assert "ix_test_attempts_open" in report.created_indexes
+    assert ensure_schema(engine).rebuilt_tables == []
+
+    with Session(engine) as db:
+        assert db.get(models.TestAttempt, 3) is not None
+        assert _attempt(db, datetime.utcnow()).id == 10
@@ -0,0 +1,78 @@
+"""The autosave buffer: write-through by default, coalesced in memory with write-behind on."""
+import pytest
+
+from app import models
+from app.autosave import AutosaveBuffer
+from app.database import SessionLocal
+from conftest import QUESTIONS
+
+
+@pytest.fixture
+def open_attempt(client, seeded):
+    """An open attempt and the ids of its questions."""
+    test_id = client.post("/tests/", headers=seeded["admin"], json={"title": "Autosave", "questions": QUESTIONS}).json()["id"]
+    start = client.post(f"/tests/{test_id}/start", headers=seeded["student"]).json()
+    return start["attempt_id"], [q["id"] for q in start["test"]["questions"]]
+
+
+def _stored(attempt_id: int) -> dict[int, str]:
+    with SessionLocal() as db:
+        return dict(
+            db.query(models.TestAnswer.question_id, models.TestAnswer.selected_option)
+            .filter(models.TestAnswer.attempt_id == attempt_id)
+        )
+
+
+@pytest.fixture
+def buffer(tmp_path):
+    buf = AutosaveBuffer(write_behind=True, flush_interval=60, lock_path=str(tmp_path / "autosave.lock"))
+    yield buf
+    buf.stop()
+
+
+def test_default_writes_through(open_attempt):
+    attempt_id, (q1, q2, *_) = open_attempt
+    buf = AutosaveBuffer(write_behind=False)
+
+    assert buf.put(attempt_id, {q1: "A", q2: "B"}) == 0
+    assert buf.pending_answers == 0
+    assert _stored(attempt_id) == {q1: "A", q2: "B"}
+
+
+def test_put_coalesces_and_take_empties(buffer, open_attempt):
+    attempt_id, (q1, q2, *_) = open_attempt
+
+    assert buffer.put(attempt_id, {q1: "A"}) == 1
+    assert buffer.put(attempt_id, {q1: "B", q2: "C"}) == 2
+    assert buffer.pending_answers == 2
+    assert buffer.stats.saves == 2
+    assert _stored(attempt_id) == {}
+
+    assert buffer.take(attempt_id) == {q1: "B", q2: "C"}
+    assert buffer.pending_answers == 0
+    assert buffer.take(attempt_id) == {}
+
+
+def test_give_back_keeps_newer_saves(buffer, open_attempt):
+    attempt_id, (q1, q2, *_) = open_attempt
+    buffer.put(attempt_id, {q1: "A", q2: "B"})
+    taken = buffer.take(attempt_id)
+
+    buffer.put(attempt_id, {q1: "D"})  # saved while the failed submit was running
+    buffer.give_back(attempt_id, taken)
+
+    assert buffer.peek(attempt_id) == {q1: "D", q2: "B"}
+    assert buffer.pending_answers == 2
+
+
+def test_stop_flushes_buffered_answers(buffer, open_attempt):
+    attempt_id, (q1, q2, *_) = open_attempt
+    buffer.start()
+    buffer.put(attempt_id, {q1: "A", q2: "B"})
+    assert _stored(attempt_id) == {}
+
+    buffer.stop()
+
+    assert _stored(attempt_id) == {q1: "A", q2: "B"}
+    assert buffer.pending_answers == 0
+    assert buffer.stats.flushes == 1
@@ -0,0 +1,28 @@
+"""Shared cache values are plain bytes or JSON, never pickles."""
+import pickle
+from datetime import date
+
+from app.cache import Cache, MemoryBackend
+
+
+class _Boom:
+    def __reduce__(self):
+        return (exec, ("raise SystemExit('unpickled')",))
+
+
+def test_values_round_trip_as_bytes_or_json():
+    cache = Cache(MemoryBackend())
+    cache.set("ns", "body", b'{"a":1}')
+    cache.set("ns", "rows", [{"id": 1, "date": date(2026, 5, 1)}, (2, 0.5)])
+
+    assert cache.get("ns", "body") == b'{"a":1}'
+    assert cache.get("ns", "rows") == [{"id": 1, "date": "2026-05-01"}, [2, 0.5]]
+
+
+def test_foreign_entries_are_misses_not_code():
+    backend = MemoryBackend()
+    cache = Cache(backend)
+    backend.set(f"ns:{cache.version('ns')}:key", pickle.dumps(_Boom()), 60)
+
+    assert cache.get("ns", "key") is None
+    assert cache.stats.misses == 1
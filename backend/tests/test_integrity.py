@@ -0,0 +1,31 @@
+"""Orphaned rows are reported by the integrity check and only removed when asked."""
+import sqlite3
+
+from sqlalchemy import create_engine
+
+from app.database import Base
+from app.integrity import find_orphans, remove_orphans
+from app.schema import ensure_schema
+
+
+def test_orphans_are_reported_then_removed(tmp_path):
+    path = str(tmp_path / "orphans.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    conn = sqlite3.connect(path)  # foreign keys off, like databases from before they were enforced
+    conn.executescript("""
+        INSERT INTO colleges (id, name, state, city, is_partner) VALUES (1, 'Kept', 'Bihar', 'Patna', 0);
+        INSERT INTO courses (id, college_id, name) VALUES (1, 1, 'BA'), (2, 7, 'Orphan'), (3, 7, 'Orphan');
+    """)
+    conn.close()
+
+    ensure_schema(engine)  # the startup check leaves data alone
+    with engine.connect() as conn:
+        [orphans] = find_orphans(conn)
+        assert (orphans.table, orphans.column, orphans.on_delete) == ("courses", "college_id", "CASCADE")
+        assert sorted(orphans.rowids) == [2, 3]
+
+        assert [str(o) for o in remove_orphans(conn)] == [str(orphans)]
+        conn.commit()
+        assert find_orphans(conn) == []
+        assert conn.exec_driver_sql("SELECT id FROM courses").scalars().all() == [1]
@@ -0,0 +1,51 @@
+"""Leaderboard ranks: ties, best scores, top-N and forgetting deleted tests."""
+from app import leaderboard as lb
+from app.database import SessionLocal
+from conftest import QUESTIONS
+
+
+def test_ties_share_a_rank_and_the_next_rank_skips():
+    board = lb.TestLeaderboard(max_score=10)
+    for student_id, score in [(1, 5), (2, 5), (3, 3), (4, 0)]:
+        board.record(student_id, score)
+
+    assert board.top(10) == [(1, 1, 5), (1, 2, 5), (3, 3, 3), (4, 4, 0)]
+    assert board.top(3) == [(1, 1, 5), (1, 2, 5), (3, 3, 3)]
+    assert board.rank_of(2) == lb.RankInfo(rank=1, percentile=100.0, total_students=4, best_score=5)
+    assert board.rank_of(3) == lb.RankInfo(rank=3, percentile=50.0, total_students=4, best_score=3)
+    assert board.rank_of(4).rank == 4
+    assert board.rank_of(99) is None
+
+
+def test_only_a_students_best_score_counts():
+    board = lb.TestLeaderboard(max_score=10)
+    board.record(1, 7)
+    board.record(2, 4)
+    board.record(1, 2)  # a worse retake changes nothing
+    assert board.rank_of(1).best_score == 7
+    assert board.top(10) == [(1, 1, 7), (2, 2, 4)]
+
+    board.record(2, 12)  # above max_score, e.g. marks added to the test later
+    assert board.top(10) == [(1, 2, 12), (2, 1, 7)]
+    assert board.rank_of(1) == lb.RankInfo(rank=2, percentile=50.0, total_students=2, best_score=7)
+    assert len(board.best) == 2
+
+
+def test_deleted_test_is_forgotten(client, seeded):
+    admin, student = seeded["admin"], seeded["student"]
+    test_id = client.post("/tests/", headers=admin, json={"title": "Ranked", "questions": QUESTIONS}).json()["id"]
+    start = client.post(f"/tests/{test_id}/start", headers=student).json()
+    answers = [{"question_id": q["id"], "selected_option": "A"} for q in start["test"]["questions"]]
+    result = client.post(f"/tests/attempts/{start['attempt_id']}/submit", headers=student,
+                         json={"answers": answers}).json()
+    assert (result["score"], result["rank"], result["percentile"]) == (5, 1, 100.0)
+
+    db = SessionLocal()
+    try:
+        top, total = lb.leaderboard.top(db, test_id, 10)
+        assert (len(top), total) == (1, 1)
+
+        assert client.delete(f"/tests/{test_id}", headers=admin).status_code == 204
+        assert lb.leaderboard.top(db, test_id, 10) == ([], 0)
+    finally:
+        db.close()
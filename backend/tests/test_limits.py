@@ -0,0 +1,97 @@
+"""Admission, shedding and priorities of the route limiters."""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.limits import (
+    PRIORITY_ANONYMOUS,
+    PRIORITY_AUTHENTICATED,
+    PRIORITY_SUBMISSION,
+    Overloaded,
+    RouteLimiter,
+    limit_concurrency,
+    request_priority,
+    route_limiters,
+)
+from app.security import create_access_token
+
+
+def _request(authorization: str | None = None) -> Request:
+    headers = [(b"authorization", authorization.encode())] if authorization else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_waiter_times_out_with_overloaded():
+    async def scenario():
+        limiter = RouteLimiter("t", limit=1, max_waiting=4, timeout=0.05, retry_after=7)
+        await limiter.acquire()
+        with pytest.raises(Overloaded) as refused:
+            await limiter.acquire()
+        assert refused.value.retry_after == 7
+        assert (limiter.active, limiter.waiting, limiter.rejected) == (1, 0, 1)
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_evicts_a_lower_priority_waiter():
+    async def scenario():
+        limiter = RouteLimiter("t", limit=1, max_waiting=1, timeout=5)
+        await limiter.acquire()
+        anonymous = asyncio.create_task(limiter.acquire(PRIORITY_ANONYMOUS))
+        await asyncio.sleep(0)
+
+        # an equal priority is refused straight away, a higher one takes the place
+        with pytest.raises(Overloaded):
+            await limiter.acquire(PRIORITY_ANONYMOUS)
+        submission = asyncio.create_task(limiter.acquire(PRIORITY_SUBMISSION))
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded):
+            await anonymous
+
+        limiter.release()
+        await submission
+        assert (limiter.active, limiter.waiting, limiter.rejected) == (1, 0, 2)
+
+    asyncio.run(scenario())
+
+
+def test_slot_handed_to_a_waiter_that_gives_up_is_released():
+    async def scenario():
+        limiter = RouteLimiter("t", limit=1, max_waiting=4, timeout=5)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        limiter.release()  # hands the slot over...
+        waiter.cancel()  # ...as the client disconnects
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert (limiter.active, limiter.waiting) == (0, 0)
+        await asyncio.wait_for(limiter.acquire(), timeout=0.1)
+
+    asyncio.run(scenario())
+
+
+def test_only_valid_tokens_rank_as_authenticated():
+    token = create_access_token({"sub": "1", "role": "student"})
+    assert request_priority(_request(f"Bearer {token}")) == PRIORITY_AUTHENTICATED
+    assert request_priority(_request("x")) == PRIORITY_ANONYMOUS
+    assert request_priority(_request("Bearer not-a-token")) == PRIORITY_ANONYMOUS
+    assert request_priority(_request()) == PRIORITY_ANONYMOUS
+
+
+def test_shed_request_gets_503_with_retry_after(monkeypatch):
+    limiter = route_limiters["import"]
+    monkeypatch.setattr(limiter, "active", limiter.limit)
+    monkeypatch.setattr(limiter, "max_waiting", 0)
+    hold_slot = limit_concurrency("import").dependency
+
+    async def scenario():
+        with pytest.raises(HTTPException) as refused:
+            await hold_slot(_request()).__anext__()
+        assert refused.value.status_code == 503
+        assert refused.value.headers == {"Retry-After": str(limiter.retry_after)}
+
+    asyncio.run(scenario())
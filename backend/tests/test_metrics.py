@@ -0,0 +1,19 @@
+"""/metrics is for the scraper's token and admins, not the public."""
+import pytest
+
+from app import security
+
+
+@pytest.mark.parametrize("who, status", [(None, 401), ("student", 403), ("admin", 200)])
+def test_metrics_needs_an_admin(client, seeded, who, status):
+    r = client.get("/metrics", headers=seeded[who] if who else {})
+    assert r.status_code == status, r.text
+
+
+def test_metrics_accepts_the_scrape_token(client, monkeypatch):
+    monkeypatch.setattr(security, "METRICS_TOKEN", "scrape-secret")
+
+    r = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert r.status_code == 200
+    assert "# TYPE" in r.text
+    assert client.get("/metrics", headers={"Authorization": "Bearer guess"}).status_code == 401
@@ -0,0 +1,170 @@
+"""
+Exercise every API route against seeded data and enforce query budgets.
+
+Requests run in order, so later cases see the writes of earlier ones (the
+second DELETE of a test is a 404). Error paths that should give up before
+doing any work carry a tighter `max_queries` than the endpoint's budget.
+"""
+import re
+from typing import Callable, NamedTuple
+
+import pytest
+from starlette.routing import compile_path
+
+from app.query_budget import budget_of
+from app.routers import ai, auth, catalog, colleges, exams, scholarships, session_requests, students, sync, tests
+from conftest import ROWS, queries_of
+
+STUDENT_CSV = (
+    "full_name,email,phone,password,state\r\n"
+    "A,a@example.com,9000000001,pw,Bihar\r\n"
+    "B,b@example.com,9000000001,pw,Bihar\r\n"  # phone repeated in the file
+    "S,student@example.com,,pw,Bihar\r\n"  # already registered
+    "C,not-an-email,,pw,\r\n"
+)
+# enough new students that a per-row INSERT would blow the budget
+BULK_STUDENT_CSV = "full_name,email,password\r\n" + "".join(
+    f"Bulk {n},bulk{n}@example.com,pw\r\n" for n in range(100)
+)
+QUESTION_CSV = (
+    "text,option_a,option_b,option_c,option_d,correct_option,marks\r\n"
+    "Q0,a,b,c,d,A,1\r\n"  # already in the bank
+    "New,a,b,c,d,B,2\r\n"
+    "New,a,b,c,d,B,2\r\n"  # repeated in the file
+    "Bad,a,b,c,d,E,1\r\n"
+)
+# the user lookup and one existence check
+NOT_FOUND_QUERIES = 2
+
+
+class Case(NamedTuple):
+    method: str
+    path: str  # formatted with the seeded state
+    auth: str | None  # "admin", "student" or None
+    kwargs: dict | Callable[[dict], dict]
+    status: int
+    max_queries: int | None = None  # tighter than the endpoint budget
+
+
+def _answer(s: dict) -> dict:
+    question = s["open_attempt"]["test"]["questions"][0]
+    return {"json": {"answers": [{"question_id": question["id"], "selected_option": "B"}]}}
+
+
+CASES = [
+    Case("GET", "/", None, {}, 200),
+    Case("GET", "/students/ping", None, {}, 200),
+    Case("POST", "/auth/register", None,
+         {"json": {"full_name": "New", "email": "new@example.com", "password": "secret"}}, 200),
+    Case("POST", "/auth/login", None, {"data": {"username": "new@example.com", "password": "secret"}}, 200),
+    Case("GET", "/students/me", "student", {}, 200),
+    Case("PATCH", "/students/me", "student", {"json": {"district": "Patna"}}, 200),
+    Case("GET", "/students/me/dashboard", "student", {}, 200),
+    Case("POST", "/students/import", "admin", {"files": {"file": ("students.csv", STUDENT_CSV, "text/csv")}}, 200),
+    Case("POST", "/students/import", "admin",
+         {"files": {"file": ("bulk.csv", BULK_STUDENT_CSV, "text/csv")}}, 200),
+    Case("GET", "/colleges/", None, {}, 200),
+    Case("GET", "/colleges/", None, {"params": {"stream": "engineering"}}, 200),
+    Case("GET", "/colleges/recommended", "student", {}, 200),
+    Case("GET", "/colleges/recommended", "student", {"params": {"offset": 20, "limit": 20}}, 200),
+    Case("POST", "/colleges/", "admin", {"json": {"name": "New College", "state": "Bihar", "city": "Gaya",
+                                                  "courses": [{"name": "BA"}, {"name": "BSc"}]}}, 200),
+    Case("DELETE", "/colleges/1", "admin", {}, 204),
+    Case("DELETE", "/colleges/1", "admin", {}, 404, NOT_FOUND_QUERIES),
+    Case("GET", "/exams/", None, {}, 200),
+    Case("GET", "/exams/", None, {"params": {"year": 2026}}, 200),
+    Case("POST", "/exams/", "admin", {"json": {"name": "New Exam", "dates": [
+        {"year": 2026, "event_type": "exam_date", "date": "2026-07-01"}]}}, 200),
+    Case("DELETE", "/exams/1", "admin", {}, 204),
+    Case("DELETE", "/exams/1", "admin", {}, 404, NOT_FOUND_QUERIES),
+    Case("GET", "/scholarships/", None, {}, 200),
+    Case("POST", "/scholarships/", "admin", {"json": {"name": "New Scholarship"}}, 200),
+    Case("DELETE", "/scholarships/1", "admin", {}, 204),
+    Case("DELETE", "/scholarships/1", "admin", {}, 404, NOT_FOUND_QUERIES),
+    Case("GET", "/sync/", None, {}, 200),
+    Case("GET", "/sync/", None, {"params": {"since": 10, "limit": 20}}, 200),
+    Case("GET", "/sync/", None, {"params": {"since": 3 * ROWS}}, 200),
+    Case("GET", "/catalog/en", None, {}, 200),
+    Case("GET", "/catalog/hi", None, {"headers": {"Accept-Encoding": "gzip"}}, 200),
+    Case("GET", "/catalog/en/{snapshot_digest}.json", None, {}, 200),
+    Case("GET", "/catalog/en/0123456789abcdef.json", None, {}, 404),
+    Case("GET", "/tests/", "student", {}, 200),
+    Case("POST", "/tests/", "admin", {"json": {"title": "New Test", "questions": [
+        {"text": "Q", "option_a": "a", "option_b": "b", "option_c": "c", "option_d": "d",
+         "correct_option": "A", "marks": 1}]}}, 200),
+    Case("GET", "/tests/my-attempts", "student", {}, 200),
+    Case("PUT", "/tests/attempts/{open_attempt[attempt_id]}/autosave", "student", _answer, 200),
+    Case("GET", "/tests/attempts/{open_attempt[attempt_id]}/answers", "student", {}, 200),
+    Case("POST", "/tests/attempts/{open_attempt[attempt_id]}/submit", "student", _answer, 200),
+    Case("GET", "/tests/attempts/{attempt_id}/result", "student", {}, 200),
+    Case("GET", "/tests/attempts/{attempt_id}/details", "student", {}, 200),
+    Case("POST", "/tests/{test_id}/start", "student", {}, 200),
+    Case("GET", "/tests/{test_id}/leaderboard", "student", {}, 200),
+    Case("POST", "/tests/{test_id}/leaderboard/rebuild", "admin", {}, 200),
+    Case("GET", "/tests/{test_id}/attempts", "admin", {}, 200),
+    Case("GET", "/tests/{test_id}/attempts/export", "admin", {}, 200),
+    Case("POST", "/tests/{test_id}/questions/import", "admin",
+         {"files": {"file": ("questions.csv", QUESTION_CSV, "text/csv")}}, 200),
+    Case("POST", "/sessions/", "student", lambda s: {"json": {
+        "mode": "offline", "preferred_date": s["day"], "preferred_time": "Evening"}}, 200),
+    Case("GET", "/sessions/mine", "student", {}, 200),
+    Case("GET", "/sessions/", "admin", {}, 200),
+    Case("GET", "/sessions/summary", "admin", {}, 200),
+    Case("GET", "/sessions/slots", "admin", lambda s: {"params": {"day": s["day"]}}, 200),
+    Case("PUT", "/sessions/slots", "admin", lambda s: {"json": {
+        "date": s["day"], "time_band": "Morning", "capacity": 10}}, 200),
+    Case("POST", "/sessions/{request_id}/status", "admin", {"params": {"status": "approved"}}, 200),
+    Case("POST", "/sessions/allocate", "admin", lambda s: {"params": {"day": s["day"]}}, 200),
+    Case("POST", "/ai/ask", "student", {"json": {"question": "engineering scholarship Bihar"}}, 200),
+    Case("POST", "/ai/ask/stream", None, {"json": {"question": "exam dates"}}, 200),
+    Case("POST", "/ai/ask", None, {"json": {"question": "exam dates"},
+                                   "headers": {"Authorization": "Bearer expired.or.invalid"}}, 200),
+    Case("GET", "/ai/stats", "admin", {}, 200),
+    Case("DELETE", "/tests/{doomed_test_id}", "admin", {}, 204),
+    Case("DELETE", "/tests/{doomed_test_id}", "admin", {}, 404, NOT_FOUND_QUERIES),
+]
+
+ROUTERS = {
+    "/auth": auth, "/students": students, "/colleges": colleges, "/exams": exams,
+    "/scholarships": scholarships, "/tests": tests, "/ai": ai, "/sessions": session_requests,
+    "/sync": sync, "/catalog": catalog,
+}
+
+
+def route_table() -> list[tuple[re.Pattern, set, object]]:
+    table = []
+    for prefix, module in ROUTERS.items():
+        for route in module.router.routes:
+            regex, _, _ = compile_path(prefix + route.path)
+            table.append((regex, route.methods, route.endpoint))
+    return table
+
+
+def endpoint_of(method: str, path: str):
+    return next(
+        (ep for regex, methods, ep in route_table() if method in methods and regex.match(path)), None
+    )
+
+
+@pytest.mark.parametrize(
+    "case", CASES, ids=[f"{n:02d} {c.method} {c.path} {c.status}" for n, c in enumerate(CASES)]
+)
+def test_request_within_budget(client, seeded, case: Case):
+    path = case.path.format(**seeded)
+    kwargs = case.kwargs(seeded) if callable(case.kwargs) else dict(case.kwargs)
+    headers = {**(seeded[case.auth] if case.auth else {}), **kwargs.pop("headers", {})}
+
+    r = client.request(case.method, path, headers=headers, **kwargs)
+
+    # strict mode turns a request over its endpoint's budget into a 500
+    assert r.status_code == case.status, r.text[:200]
+    if case.max_queries is not None:
+        assert queries_of(r) <= case.max_queries
+
+
+def test_every_route_is_exercised_and_budgeted(seeded):
+    exercised = {endpoint_of(c.method, c.path.format(**seeded)) for c in CASES}
+    for _, _, endpoint in route_table():
+        name = f"{endpoint.__module__}.{endpoint.__name__}"
+        assert endpoint in exercised, f"{name} is not exercised"
+        assert budget_of(endpoint) is not None, f"{name} has no query budget"
@@ -0,0 +1,36 @@
+"""Creating tests through the shared question bank."""
+from app import models
+from app.database import SessionLocal, engine
+from app.question_bank import backfill_question_bank, hash_question_bank
+from app.schema import ensure_schema
+from conftest import QUESTIONS
+
+
+def test_duplicate_questions_are_rejected(client, seeded):
+    questions = [QUESTIONS[0], QUESTIONS[1], {**QUESTIONS[0], "text": "  q0 "}]
+    r = client.post("/tests/", headers=seeded["admin"], json={"title": "Dupes", "questions": questions})
+
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Question 3 is a duplicate of question 1"
+    db = SessionLocal()
+    try:
+        assert db.query(models.Test).filter_by(title="Dupes").count() == 0
+    finally:
+        db.close()
+
+
+def test_startup_links_and_hashes_questions_from_before_the_bank(client, seeded):
+    test_id = client.post("/tests/", headers=seeded["admin"], json={"title": "Legacy"}).json()["id"]
+    db = SessionLocal()
+    try:
+        question = models.TestQuestion(test_id=test_id, text="Legacy", option_a="a", option_b="b",
+                                       option_c="c", option_d="d", correct_option="A", marks=1)
+        db.add(question)
+        db.commit()
+    finally:
+        db.close()
+
+    assert ensure_schema(engine).linked_questions == 1
+    assert hash_question_bank() == 1
+    assert ensure_schema(engine).linked_questions == 0
+    assert backfill_question_bank() == (0, 0)
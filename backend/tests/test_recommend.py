@@ -0,0 +1,31 @@
+"""The recommendation index is built off the request path."""
+from app import models
+from app.database import SessionLocal
+from app.recommend import Recommender
+from conftest import wait_for_recommendations
+
+
+def _courses(stream: str | None = None) -> int:
+    db = SessionLocal()
+    try:
+        query = db.query(models.Course)
+        if stream:
+            query = query.filter(models.Course.stream == stream)
+        return query.count()
+    finally:
+        db.close()
+
+
+def test_not_ready_until_first_build(seeded, client):
+    recommender = Recommender()
+    assert recommender.index() is None  # kicks off the build, does not run it inline
+
+    assert recommender.ready.wait(10)
+    assert recommender.index().size == _courses()
+
+
+def test_endpoint_serves_from_background_index(seeded, client):
+    wait_for_recommendations()  # catch up with courses deleted by earlier tests
+    r = client.get("/colleges/recommended", headers=seeded["student"])
+    assert r.status_code == 200
+    assert r.json()["total"] == _courses("engineering")  # the student's stream
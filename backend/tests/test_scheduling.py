@@ -0,0 +1,46 @@
+"""Counselling slots: no writes on read, no overbooking under concurrent approvals."""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from app import models
+from app.database import SessionLocal
+
+
+def _slot_rows(day: date) -> int:
+    db = SessionLocal()
+    try:
+        return db.query(models.CounsellingSlot).filter(models.CounsellingSlot.date == day).count()
+    finally:
+        db.close()
+
+
+def test_listing_slots_writes_nothing(client, seeded):
+    day = date.today() + timedelta(days=40)
+    r = client.get("/sessions/slots", headers=seeded["admin"], params={"day": day.isoformat()})
+    assert r.status_code == 200
+    assert [slot["id"] for slot in r.json()] == [None, None, None]
+    assert _slot_rows(day) == 0
+
+
+def test_concurrent_approvals_do_not_overbook(client, seeded):
+    admin, student = seeded["admin"], seeded["student"]
+    day = (date.today() + timedelta(days=41)).isoformat()
+    client.put("/sessions/slots", headers=admin, json={"date": day, "time_band": "Morning", "capacity": 1})
+    request_ids = [
+        client.post("/sessions/", headers=student, json={
+            "mode": "online", "preferred_date": day, "preferred_time": "Morning",
+        }).json()["id"]
+        for _ in range(4)
+    ]
+
+    def approve(request_id: int) -> int:
+        return client.post(
+            f"/sessions/{request_id}/status", headers=admin, params={"status": "approved"}
+        ).status_code
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        statuses = sorted(pool.map(approve, request_ids))
+
+    assert statuses == [200, 409, 409, 409]
+    slots = client.get("/sessions/slots", headers=admin, params={"day": day}).json()
+    assert next(s for s in slots if s["time_band"] == "Morning")["booked"] == 1
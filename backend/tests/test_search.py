@@ -0,0 +1,49 @@
+"""Retrieval over the catalog keeps admin writes that land while the index is being built."""
+import pytest
+
+from app import models, search
+from app.catalog_events import catalog_changed
+from app.database import SessionLocal
+
+
+def _write_exam(name: str | None, exam_id: int | None = None) -> int:
+    """Create (or, with no name, delete) an exam the way the admin routes do."""
+    db = SessionLocal()
+    try:
+        if name is None:
+            db.query(models.Exam).filter(models.Exam.id == exam_id).delete()
+        else:
+            exam = models.Exam(name=name, stream="science")
+            db.add(exam)
+            db.flush()
+            exam_id = exam.id
+        catalog_changed(db, "exam", exam_id, deleted=name is None)
+        db.commit()
+    finally:
+        db.close()
+    return exam_id
+
+
+@pytest.mark.parametrize("first_build", [True, False])
+def test_write_during_build_is_searchable(seeded, monkeypatch, first_build):
+    real_build = search.build_documents
+    written = []
+
+    def build_then_write(db):
+        groups = real_build(db)  # the exams are read before the write commits
+        written.append(_write_exam("Zyxwv Olympiad"))
+        return groups
+
+    monkeypatch.setattr(search, "build_documents", build_then_write)
+    if first_build:
+        monkeypatch.setattr(search, "_index", None)
+    else:
+        monkeypatch.setattr(search, "_index", search.SearchIndex())
+        monkeypatch.setattr(search._catalog_watch, "changed_elsewhere", lambda: True)
+    index = search.get_search_index()
+    try:
+        hits = index.search("zyxwv olympiad")
+        assert [(h.document.kind, h.document.record_id) for h in hits] == [("exam", written[0])]
+    finally:
+        _write_exam(None, written[0])
+    assert index.search("zyxwv olympiad") == []
@@ -0,0 +1,18 @@
+"""A build that finishes late never rolls the manifest back."""
+import json
+
+from app.snapshots import MANIFEST_NAME, SnapshotStore
+
+
+def test_older_build_leaves_newer_manifest(tmp_path, client):
+    store = SnapshotStore(directory=str(tmp_path))
+    built = store.build()
+    version = built["en"].version
+
+    newer = {lang: {"version": version + 1, "digest": "f" * 16, "name": f"catalog-{lang}-{'f' * 16}.json",
+                    "encodings": []} for lang in built}
+    (tmp_path / MANIFEST_NAME).write_text(json.dumps(newer))
+
+    assert store.build()["en"].version == version + 1
+    assert json.loads((tmp_path / MANIFEST_NAME).read_text()) == newer
+    assert store.current("en").version == version + 1
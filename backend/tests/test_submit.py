@@ -0,0 +1,80 @@
+"""A submission the database refuses is a 503, and its autosaved answers survive for the retry."""
+import sqlite3
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+import main
+from app.autosave import autosave_buffer
+from app.database import SessionLocal
+from app.deps import get_db
+from app.grading import grading_queue
+from conftest import QUESTIONS
+
+
+def _locked_session():
+    db = SessionLocal()
+
+    def commit():
+        raise OperationalError("COMMIT", {}, sqlite3.OperationalError("database is locked"))
+
+    db.commit = commit
+    return db
+
+
+@pytest.fixture
+def buffered_attempt(client, seeded, monkeypatch):
+    """An open attempt with one answer held in the autosave buffer."""
+    monkeypatch.setattr(autosave_buffer, "write_behind", True)
+    test_id = client.post("/tests/", headers=seeded["admin"], json={"title": "Locked", "questions": QUESTIONS}).json()["id"]
+    start = client.post(f"/tests/{test_id}/start", headers=seeded["student"]).json()
+    question_id = start["test"]["questions"][0]["id"]
+    r = client.put(f"/tests/attempts/{start['attempt_id']}/autosave", headers=seeded["student"],
+                   json={"answers": [{"question_id": question_id, "selected_option": "A"}]})
+    assert r.json()["pending_answers"] == 1
+    return start["attempt_id"], {question_id: "A"}
+
+
+def _submit(client, seeded, attempt_id: int, queued: bool):
+    return client.post(f"/tests/attempts/{attempt_id}/submit", headers=seeded["student"],
+                       params={"queued": queued}, json={"answers": []})
+
+
+def test_queued_submit_with_failing_commit(client, seeded, buffered_attempt, monkeypatch):
+    attempt_id, answers = buffered_attempt
+    assert grading_queue.running
+    monkeypatch.setattr(grading_queue, "session_factory", _locked_session)
+
+    r = _submit(client, seeded, attempt_id, queued=True)
+    assert r.status_code == 503
+    assert r.headers["retry-after"] == "5"
+    assert autosave_buffer.peek(attempt_id) == answers
+
+    monkeypatch.setattr(grading_queue, "session_factory", SessionLocal)
+    r = _submit(client, seeded, attempt_id, queued=True)
+    assert r.status_code == 200
+    assert r.json()["status"] == "pending"
+    assert autosave_buffer.peek(attempt_id) == {}
+
+
+def test_inline_submit_with_failing_commit(client, seeded, buffered_attempt):
+    attempt_id, answers = buffered_attempt
+
+    def locked_db():
+        db = _locked_session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    main.app.dependency_overrides[get_db] = locked_db
+    try:
+        r = _submit(client, seeded, attempt_id, queued=False)
+    finally:
+        del main.app.dependency_overrides[get_db]
+    assert r.status_code == 503
+    assert autosave_buffer.peek(attempt_id) == answers
+
+    r = _submit(client, seeded, attempt_id, queued=False)
+    assert r.status_code == 200
+    assert r.json()["score"] == 1  # the autosaved answer was graded
@@ -0,0 +1,59 @@
+"""Expired attempts are claimed by exactly one sweep and graded from their autosaves."""
+import threading
+from datetime import timedelta
+
+from app import models
+from app.database import SessionLocal
+from app.sweeper import finalize_expired
+from conftest import QUESTIONS
+
+
+def _expired_attempt(client, seeded) -> tuple[int, int]:
+    """An attempt started two hours ago on a 30-minute test, two answers right; returns (attempt, test)."""
+    test_id = client.post("/tests/", headers=seeded["admin"], json={"title": "Expired", "questions": QUESTIONS}).json()["id"]
+    start = client.post(f"/tests/{test_id}/start", headers=seeded["student"]).json()
+    attempt_id = start["attempt_id"]
+    answers = [{"question_id": q["id"], "selected_option": option}
+               for q, option in zip(start["test"]["questions"], "ABA")]
+    client.put(f"/tests/attempts/{attempt_id}/autosave", headers=seeded["student"], json={"answers": answers})
+    with SessionLocal() as db:
+        attempt = db.get(models.TestAttempt, attempt_id)
+        attempt.started_at -= timedelta(hours=2)
+        db.commit()
+    return attempt_id, test_id
+
+
+def test_concurrent_sweeps_claim_once(client, seeded):
+    attempt_id, _ = _expired_attempt(client, seeded)
+    barrier = threading.Barrier(2)
+    finalized = []
+
+    def sweep():
+        with SessionLocal() as db:
+            barrier.wait()
+            finalized.append(finalize_expired(db))
+
+    threads = [threading.Thread(target=sweep) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(finalized) == [0, 1]
+    with SessionLocal() as db:
+        assert finalize_expired(db) == 0
+        attempt = db.get(models.TestAttempt, attempt_id)
+        assert attempt.score == 2
+        # finished at the deadline, not when the sweep ran
+        assert attempt.finished_at == attempt.started_at + timedelta(minutes=30)
+
+
+def test_submitted_attempt_is_not_swept(client, seeded):
+    attempt_id, test_id = _expired_attempt(client, seeded)
+    r = client.post(f"/tests/attempts/{attempt_id}/submit", headers=seeded["student"], json={"answers": []})
+    assert r.status_code == 200, r.text
+    with SessionLocal() as db:
+        finished_at = db.get(models.TestAttempt, attempt_id).finished_at
+
+        assert finalize_expired(db) == 0
+        assert db.get(models.TestAttempt, attempt_id).finished_at == finished_at
@@ -0,0 +1,72 @@
+"""Catalog deltas: collapsing, deletes past the page and paging by version."""
+from app import models
+from app.catalog_events import catalog_changed
+from app.database import SessionLocal
+
+
+def _version(client) -> int:
+    return client.get("/sync/", params={"since": 0}).json()["version"]
+
+
+def _sync(client, since: int, **params) -> dict:
+    r = client.get("/sync/", params={"since": since, **params})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def _rename(scholarship_id: int, name: str) -> None:
+    db = SessionLocal()
+    try:
+        db.query(models.Scholarship).filter_by(id=scholarship_id).update({"name": name})
+        catalog_changed(db, "scholarship", scholarship_id)
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_changes_to_one_record_collapse_to_its_latest_state(client, seeded):
+    since = _version(client)
+    scholarship_id = client.post("/scholarships/", headers=seeded["admin"], json={"name": "Draft"}).json()["id"]
+    _rename(scholarship_id, "Second draft")
+    _rename(scholarship_id, "Final")
+
+    page = _sync(client, since)
+    assert [(s["id"], s["name"]) for s in page["scholarships"]["upserted"]] == [(scholarship_id, "Final")]
+    assert page["scholarships"]["deleted"] == []
+    assert (page["version"], page["has_more"], page["full"]) == (since + 3, False, False)
+
+
+def test_record_deleted_after_the_page_is_reported_deleted(client, seeded):
+    since = _version(client)
+    exam_id = client.post("/exams/", headers=seeded["admin"], json={"name": "Short-lived"}).json()["id"]
+    assert client.delete(f"/exams/{exam_id}", headers=seeded["admin"]).status_code == 204
+
+    # the page holds only the upsert, but the exam is already gone
+    page = _sync(client, since, limit=1)
+    assert page["exams"] == {"upserted": [], "deleted": [exam_id]}
+    assert (page["version"], page["has_more"]) == (since + 1, True)
+
+    page = _sync(client, page["version"], limit=1)
+    assert page["exams"] == {"upserted": [], "deleted": [exam_id]}
+    assert (page["version"], page["has_more"]) == (since + 2, False)
+
+
+def test_pages_follow_the_returned_version(client, seeded):
+    since = _version(client)
+    ids = [
+        client.post("/scholarships/", headers=seeded["admin"], json={"name": f"Paged {n}"}).json()["id"]
+        for n in range(3)
+    ]
+
+    seen, pages, version = [], [], since
+    while True:
+        page = _sync(client, version, limit=2)
+        seen += [s["id"] for s in page["scholarships"]["upserted"]]
+        pages.append(page["has_more"])
+        version = page["version"]
+        if not page["has_more"]:
+            break
+    assert seen == ids
+    assert pages == [True, False]
+    assert version == since + 3
+    assert _sync(client, version)["scholarships"] == {"upserted": [], "deleted": []}
@@ -7,15 +7,24 @@ function AdminSessions({ token }) {
   const [items, setItems] = useState([]);
   const [msg, setMsg] = useState("");
   const [loading, setLoading] = useState(false);
+  const [statusFilter, setStatusFilter] = useState("");
+  const [nextCursor, setNextCursor] = useState(null);
 
   const authHeader = { headers: { Authorization: `Bearer ${token}` } };
 
-  const load = async () => {
+  const load = async (cursor = null) => {
     setLoading(true);
     setMsg("");
     try {
-      const res = await axios.get(`${API_BASE}/sessions`, authHeader);
-      setItems(res.data);
+      const params = {};
+      if (statusFilter) params.status = statusFilter;
+      if (cursor) params.cursor = cursor;
+      const res = await axios.get(`${API_BASE}/sessions`, {
+        ...authHeader,
+        params,
+      });
+      setItems((prev) => (cursor ? [...prev, ...res.data] : res.data));
+      setNextCursor(res.headers["x-next-cursor"] || null);
     } catch (err) {
       const detail =
         err.response?.data?.detail || "Failed to load session requests";
@@ -28,7 +37,7 @@ function AdminSessions({ token }) {
   useEffect(() => {
     load();
     // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, []);
+  }, [statusFilter]);
 
   const updateStatus = async (id, status) => {
     try {
@@ -48,6 +57,19 @@ function AdminSessions({ token }) {
   return (
     <div style={{ marginTop: 16 }}>
       <h3>Counselling session requests</h3>
+      <div style={{ marginBottom: 8 }}>
+        <label>Status: </label>
+        <select
+          value={statusFilter}
+          onChange={(e) => setStatusFilter(e.target.value)}
+        >
+          <option value="">All</option>
+          <option value="pending">Pending</option>
+          <option value="approved">Approved</option>
+          <option value="rejected">Rejected</option>
+          <option value="done">Done</option>
+        </select>
+      </div>
       {loading && <p>Loading...</p>}
       {msg && <p className="error-text">{msg}</p>}
       {items.length === 0 && !loading && <p>No requests yet.</p>}
@@ -57,7 +79,7 @@ function AdminSessions({ token }) {
           <table className="data-table">
             <thead>
               <tr>
-                <th>Student ID</th>
+                <th>Student</th>
                 <th>Date / time</th>
                 <th>Mode</th>
                 <th>Note</th>
@@ -68,7 +90,7 @@ function AdminSessions({ token }) {
             <tbody>
               {items.map((r) => (
                 <tr key={r.id}>
-                  <td>{r.student_id || "-"}</td>
+                  <td>{r.student_name || r.student_id || "-"}</td>
                   <td>
                     {r.preferred_date} {r.preferred_time || ""}
                   </td>
@@ -100,6 +122,15 @@ function AdminSessions({ token }) {
           </table>
         </div>
       )}
+      {nextCursor && !loading && (
+        <button
+          onClick={() => load(nextCursor)}
+          className="btn-secondary"
+          style={{ marginTop: 8 }}
+        >
+          Load more
+        </button>
+      )}
     </div>
   );
 }
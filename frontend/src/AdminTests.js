@@ -21,6 +21,8 @@ function AdminTests({ token }) {
   const [message, setMessage] = useState("");
   const [selectedTestId, setSelectedTestId] = useState("");
   const [results, setResults] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingResults, setLoadingResults] = useState(false);
 
   const authHeader = { headers: { Authorization: `Bearer ${token}` } };
 
@@ -77,20 +79,25 @@ function AdminTests({ token }) {
     }
   };
 
-  const loadResults = async () => {
+  const loadResults = async (cursor = null) => {
     if (!selectedTestId) return;
     setMessage("");
+    setLoadingResults(true);
     try {
       const res = await axios.get(
         `${API_BASE}/tests/${selectedTestId}/attempts`,
-        authHeader
+        { ...authHeader, params: cursor ? { cursor } : {} }
       );
-      setResults(res.data);
+      setResults((prev) => (cursor ? [...prev, ...res.data] : res.data));
+      setNextCursor(res.headers["x-next-cursor"] || null);
     } catch (err) {
       const detail =
         err.response?.data?.detail || "Failed to load results";
       setMessage(detail);
-      setResults([]);
+      if (!cursor) setResults([]);
+      setNextCursor(null);
+    } finally {
+      setLoadingResults(false);
     }
   };
 
@@ -247,7 +254,7 @@ function AdminTests({ token }) {
               style={{ maxWidth: 120 }}
             />
           </div>
-          <button type="button" onClick={loadResults}>
+          <button type="button" onClick={() => loadResults()}>
             Load results
           </button>
         </div>
@@ -288,6 +295,16 @@ function AdminTests({ token }) {
             </table>
           </div>
         )}
+        {nextCursor && !loadingResults && (
+          <button
+            type="button"
+            onClick={() => loadResults(nextCursor)}
+            className="btn-secondary"
+            style={{ marginTop: 8 }}
+          >
+            Load more
+          </button>
+        )}
 
         {results.length === 0 && selectedTestId && (
           <p style={{ marginTop: 8 }}>No attempts found for this test yet.</p>
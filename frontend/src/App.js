@@ -661,7 +661,7 @@ function Dashboard({
         </div>
       </div>
 
-      <AskGyandarshak />
+      <AskGyandarshak token={token} />
     </div>
   );
 }
@@ -1,9 +1,8 @@
 import React, { useState } from "react";
-import axios from "axios";
 
 const API_BASE = "http://127.0.0.1:8000";
 
-function AskGyandarshak() {
+function AskGyandarshak({ token }) {
   const [question, setQuestion] = useState("");
   const [answer, setAnswer] = useState("");
   const [loading, setLoading] = useState(false);
@@ -14,12 +13,44 @@ function AskGyandarshak() {
     setLoading(true);
     setAnswer("");
     try {
-      const res = await axios.post(`${API_BASE}/ai/ask`, { question });
-      setAnswer(res.data.answer);
+      // answer arrives as server-sent events so text shows up as it is generated
+      const res = await fetch(`${API_BASE}/ai/ask/stream`, {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+          // logged-in students get answers ranked for their state and stream
+          ...(token ? { Authorization: `Bearer ${token}` } : {}),
+        },
+        body: JSON.stringify({ question }),
+      });
+      if (!res.ok) {
+        const data = await res.json().catch(() => ({}));
+        throw new Error(data.detail || "Error contacting assistant");
+      }
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split("\n\n");
+        buffer = events.pop();
+        for (const raw of events) {
+          const lines = raw.split("\n");
+          const event = lines.find((l) => l.startsWith("event: "));
+          const data = lines.find((l) => l.startsWith("data: "));
+          if (!data) continue;
+          const payload = JSON.parse(data.slice(6));
+          if (!event) {
+            setAnswer((prev) => prev + payload.text);
+          } else if (event === "event: error") {
+            throw new Error(payload.detail);
+          }
+        }
+      }
     } catch (err) {
-      const detail =
-        err.response?.data?.detail || "Error contacting assistant";
-      setAnswer(detail);
+      setAnswer(err.message || "Error contacting assistant");
     } finally {
       setLoading(false);
     }
@@ -56,6 +87,7 @@ function AskGyandarshak() {
             padding: 8,
             borderRadius: 8,
             fontSize: 14,
+            whiteSpace: "pre-line",
           }}
         >
           {answer}